@@ -10,6 +10,8 @@ from typing import Any, Dict
 
 from alithia.agents.arxrec.arxrec_agent import ArxrecAgent
 from alithia.config.loader import load_config
+from alithia.core.email_delivery import SMTPSender
+from alithia.core.email_outbox import get_email_outbox
 from alithia.core.researcher.profile import ResearcherProfile
 
 from .state import ArxrecConfig
@@ -29,10 +31,23 @@ Examples:
   
   # Run with configuration file
   python -m alithia.agents.arxrec --config config.json
+
+  # Retry delivery of emails left in the outbox by earlier runs
+  python -m alithia.agents.arxrec --config config.json --drain-outbox
         """,
     )
     # Optional arguments
     parser.add_argument("-c", "--config", type=str, help="Configuration file path (JSON)")
+    parser.add_argument(
+        "--refresh-llm-cache",
+        action="store_true",
+        help="Regenerate TLDRs and affiliations instead of reusing cached LLM responses",
+    )
+    parser.add_argument(
+        "--drain-outbox",
+        action="store_true",
+        help="Only deliver the emails waiting in the outbox, without running the agent",
+    )
 
     return parser
 
@@ -57,12 +72,56 @@ def create_arxrec_config(config_dict: Dict[str, Any]) -> ArxrecConfig:
         max_papers=arxrec_settings.get("max_papers", 50),
         send_empty=arxrec_settings.get("send_empty", False),
         ignore_patterns=arxrec_settings.get("ignore_patterns", []),
+        prefetch_workers=arxrec_settings.get("prefetch_workers", 4),
+        prefetch_interval=arxrec_settings.get("prefetch_interval", 3.0),
+        llm_concurrency=arxrec_settings.get("llm_concurrency", 4),
+        llm_rpm=arxrec_settings.get("llm_rpm"),
+        llm_tpm=arxrec_settings.get("llm_tpm"),
+        llm_max_retries=arxrec_settings.get("llm_max_retries", 3),
+        paper_timeout=arxrec_settings.get("paper_timeout", 300.0),
+        combined_extraction=arxrec_settings.get("combined_extraction", True),
+        llm_cache=arxrec_settings.get("llm_cache", True),
+        refresh_llm_cache=arxrec_settings.get("refresh_llm_cache", False),
+        affiliation_index=arxrec_settings.get("affiliation_index", True),
+        affiliation_max_age_days=arxrec_settings.get("affiliation_max_age_days", 180.0),
+        batch_mode=arxrec_settings.get("batch_mode", False),
+        batch_deadline=arxrec_settings.get("batch_deadline", 7200.0),
+        batch_poll_interval=arxrec_settings.get("batch_poll_interval", 30.0),
+        code_url_deadline=arxrec_settings.get("code_url_deadline", 60.0),
+        email_max_per_connection=arxrec_settings.get("email_max_per_connection", 100),
+        email_min_interval=arxrec_settings.get("email_min_interval", 0.0),
+        email_outbox_max_attempts=arxrec_settings.get("email_outbox_max_attempts", 8),
+        email_outbox_backoff=arxrec_settings.get("email_outbox_backoff", 300.0),
         debug=config_dict.get("debug", False),
     )
 
     return arxrec_config
 
 
+def drain_outbox(config: ArxrecConfig) -> int:
+    """
+    Deliver the emails waiting in the outbox.
+
+    Args:
+        config: ArxrecConfig with the email settings
+
+    Returns:
+        Process exit code, non-zero if emails are still waiting
+    """
+    outbox = get_email_outbox(config.email_outbox_max_attempts, config.email_outbox_backoff)
+    sender = SMTPSender.from_connection(
+        config.user_profile.email_notification,
+        max_messages_per_connection=config.email_max_per_connection,
+        min_interval=config.email_min_interval,
+    )
+    report = outbox.drain(sender)
+    remaining = len(outbox.pending())
+    logger.info(f"Delivered {report.sent} emails from the outbox, {remaining} still waiting")
+    for entry in outbox.dead():
+        logger.warning(f"Undeliverable email to {entry.receiver} ({entry.last_error}) in {outbox.path}/dead")
+    return 1 if remaining else 0
+
+
 def main():
     """Main entry point."""
     parser = create_argument_parser()
@@ -70,6 +129,8 @@ def main():
 
     # Build configuration
     config_dict = load_config(args.config)
+    if args.refresh_llm_cache:
+        config_dict.setdefault("arxrec", {})["refresh_llm_cache"] = True
 
     # Create ArxrecConfig
     try:
@@ -78,6 +139,9 @@ def main():
         logger.error(f"Failed to create ArxrecConfig: {e}")
         sys.exit(1)
 
+    if args.drain_outbox:
+        sys.exit(drain_outbox(config))
+
     # Create and run agent
     agent = ArxrecAgent()
 
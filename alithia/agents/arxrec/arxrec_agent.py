@@ -7,6 +7,9 @@ from typing import Any, Dict
 
 from langgraph.graph import StateGraph
 
+from alithia.core.source_prefetcher import release_prefetcher
+from alithia.core.tex_cache import prune_tex_cache
+
 from .nodes import (
     communication_node,
     content_generation_node,
@@ -101,6 +104,13 @@ class ArxrecAgent:
         except Exception as e:
             logger.error(f"Workflow failed: {str(e)}")
             return {"success": False, "error": str(e), "errors": initial_state.error_log}
+        finally:
+            # Paths that end before content generation leave the prefetcher running
+            release_prefetcher(initial_state.run_id)
+            try:
+                prune_tex_cache()
+            except OSError as e:
+                logger.warning(f"Failed to prune the TeX source cache: {e}")
 
     def get_workflow_info(self) -> Dict[str, Any]:
         """
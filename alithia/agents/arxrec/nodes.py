@@ -3,18 +3,40 @@ Agent nodes for the research agent workflow.
 """
 
 import logging
-from typing import List
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
+from alithia.core.affiliation_index import SOURCE_CONFIDENCE_SCALE, AffiliationIndex, get_affiliation_index
 from alithia.core.arxiv_client import get_arxiv_papers
-from alithia.core.arxiv_paper_utils import extract_affiliations, generate_tldr, get_code_url
-from alithia.core.email_utils import construct_email_content, send_email
+from alithia.core.arxiv_paper_utils import (
+    build_affiliation_messages,
+    build_insights_messages,
+    build_tldr_messages,
+    count_declared_affiliations,
+    extract_affiliations,
+    generate_tldr,
+    generate_tldr_and_affiliations,
+    get_llm_lang,
+    parse_paper_affiliations,
+)
+from alithia.core.code_link_extractor import find_code_url
+from alithia.core.code_url_resolver import get_code_url_resolver
+from alithia.core.email_delivery import OutgoingEmail, SMTPSender
+from alithia.core.email_outbox import get_email_outbox
+from alithia.core.email_utils import construct_email_content
+from alithia.core.llm_batch import BatchJobRunner
+from alithia.core.llm_cache import CachedLLM, LLMResponseCache
+from alithia.core.llm_executor import LLMExecutor
 from alithia.core.llm_utils import get_llm
-from alithia.core.paper import ScoredPaper
+from alithia.core.paper import ArxivPaper, ScoredPaper
 from alithia.core.researcher import ResearcherProfile
+from alithia.core.source_prefetcher import SourcePrefetcher, get_prefetcher, register_prefetcher, release_prefetcher
 from alithia.core.zotero_client import filter_corpus, get_zotero_corpus
 
 from .recommender import rerank_papers
-from .state import AgentState
+from .state import AgentState, ArxrecConfig
 
 logger = logging.getLogger(__name__)
 
@@ -148,7 +170,199 @@ def relevance_assessment_node(state: AgentState) -> dict:
         scored_papers = scored_papers[: state.config.max_papers]
         logger.info(f"Limited to {len(scored_papers)} papers")
 
-    return {"scored_papers": scored_papers, "current_step": "relevance_assessment_complete"}
+    # Start downloading sources so they are ready before content generation needs them
+    update = {"scored_papers": scored_papers, "current_step": "relevance_assessment_complete"}
+    if state.config and state.config.prefetch_workers > 0 and scored_papers:
+        prefetcher = SourcePrefetcher(
+            max_workers=state.config.prefetch_workers, min_interval=state.config.prefetch_interval
+        )
+        register_prefetcher(state.run_id, prefetcher)
+        prefetcher.submit([sp.paper for sp in scored_papers])
+
+    return update
+
+
+def _enrich_paper(
+    paper: ArxivPaper,
+    llm: Any,
+    prefetcher: Optional[SourcePrefetcher],
+    combined: bool = True,
+    affiliation_index: Optional[AffiliationIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Generate the TLDR and affiliations of a single paper and find code links in its abstract and source.
+
+    The paper itself is not modified, apart from loading and releasing its TeX,
+    so results can be applied back in a deterministic order.
+
+    Args:
+        paper: Paper to enrich
+        llm: LLM client instance
+        prefetcher: Optional source prefetcher to wait on
+        combined: Extract TLDR and affiliations with a single structured LLM call
+        affiliation_index: Optional author to affiliation index to answer from and learn into
+
+    Returns:
+        Dictionary of paper fields to update, plus the time spent waiting for the source
+        and how the affiliations were obtained
+    """
+    fields: Dict[str, Any] = {}
+    # Whether the source declares one affiliation per author
+    per_author = False
+
+    # Known authors need neither the parser nor the LLM
+    if affiliation_index is not None and not paper.affiliations:
+        known = affiliation_index.lookup(paper.authors)
+        if known:
+            fields["affiliations"] = known
+            fields["affiliation_source"] = "index"
+
+    # Wait for the prefetched source so TLDR and affiliations both see the TeX
+    if prefetcher is not None:
+        wait_start = time.perf_counter()
+        prefetcher.wait(paper)
+        fields["source_wait"] = time.perf_counter() - wait_start
+
+    try:
+        # Affiliations declared with LaTeX macros need no LLM call at all
+        if not paper.affiliations and "affiliations" not in fields:
+            parsed = parse_paper_affiliations(paper)
+            if parsed:
+                fields["affiliations"] = parsed
+                fields["affiliation_source"] = "parser"
+                per_author = count_declared_affiliations(paper) == len(paper.authors)
+
+        # One structured call for both TLDR and affiliations, falling back to separate calls
+        if combined and not paper.tldr and not paper.affiliations and "affiliations" not in fields:
+            insights = generate_tldr_and_affiliations(paper, llm)
+            if insights is not None:
+                fields["tldr"] = insights.tldr
+                fields["affiliations"] = insights.affiliations
+                fields["affiliation_source"] = "llm"
+        if not paper.tldr and "tldr" not in fields:
+            fields["tldr"] = generate_tldr(paper, llm)
+        if not paper.affiliations and "affiliations" not in fields:
+            fields["affiliations"] = extract_affiliations(paper, llm)
+            fields["affiliation_source"] = "llm"
+        # Code links in the abstract or source need no network lookup
+        if not paper.code_url:
+            code_url = find_code_url(paper)
+            if code_url:
+                fields["code_url"] = code_url
+    finally:
+        # Sources stay in the on-disk cache; drop the in-memory copy
+        paper.release_tex()
+
+    # Index answers are not re-learned, so stale entries age out and get re-extracted
+    source = fields.get("affiliation_source")
+    if affiliation_index is not None and source in ("parser", "llm") and fields.get("affiliations"):
+        try:
+            # The parser returns affiliations in declaration order, the LLM is asked for author order
+            affiliation_index.learn(
+                paper.authors,
+                fields["affiliations"],
+                confidence_scale=SOURCE_CONFIDENCE_SCALE[source],
+                author_order=source == "llm",
+                per_author=per_author,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to update affiliation index for {paper.arxiv_id}: {e}")
+    return fields
+
+
+def _batch_requests(
+    paper: ArxivPaper,
+    lang: str,
+    prefetcher: Optional[SourcePrefetcher],
+    combined: bool = True,
+    affiliation_index: Optional[AffiliationIndex] = None,
+) -> List[List[Dict[str, str]]]:
+    """
+    Build the LLM requests that _enrich_paper will make for a paper.
+
+    Mirrors the decisions of _enrich_paper, so that answering these requests
+    ahead of time lets it run from the response cache.
+
+    Args:
+        paper: Paper to enrich
+        lang: Output language of the LLM
+        prefetcher: Optional source prefetcher to wait on
+        combined: Extract TLDR and affiliations with a single structured LLM call
+        affiliation_index: Optional author to affiliation index
+
+    Returns:
+        List of chat messages, one entry per request
+    """
+    if prefetcher is not None:
+        prefetcher.wait(paper)
+    try:
+        needs_affiliations = (
+            not paper.affiliations
+            and not (affiliation_index is not None and affiliation_index.lookup(paper.authors))
+            and not parse_paper_affiliations(paper)
+        )
+        if combined and not paper.tldr and needs_affiliations:
+            return [build_insights_messages(paper, lang)]
+        requests = []
+        if not paper.tldr:
+            requests.append(build_tldr_messages(paper, lang))
+        if needs_affiliations:
+            messages = build_affiliation_messages(paper)
+            if messages is not None:
+                requests.append(messages)
+        return requests
+    finally:
+        paper.release_tex()
+
+
+def _prefill_from_batch(
+    papers: List[ArxivPaper],
+    llm: CachedLLM,
+    runner: BatchJobRunner,
+    executor: LLMExecutor,
+    prefetcher: Optional[SourcePrefetcher],
+    config: ArxrecConfig,
+    affiliation_index: Optional[AffiliationIndex] = None,
+) -> Dict[str, Any]:
+    """
+    Answer the content generation requests of all papers with one Batch job.
+
+    Results are stored in the response cache of ``llm``, so the regular
+    per-paper processing afterwards is served from the cache and only makes
+    synchronous calls for requests the batch did not answer in time.
+
+    Args:
+        papers: Papers to enrich
+        llm: Cached LLM client used for the regular processing
+        runner: Batch job runner
+        executor: Executor used to prepare requests concurrently
+        prefetcher: Optional source prefetcher to wait on
+        config: Arxrec configuration
+        affiliation_index: Optional author to affiliation index
+
+    Returns:
+        Batch statistics
+    """
+    lang = get_llm_lang(llm)
+
+    def plan(paper: ArxivPaper) -> List[List[Dict[str, str]]]:
+        return _batch_requests(
+            paper, lang, prefetcher, combined=config.combined_extraction, affiliation_index=affiliation_index
+        )
+
+    requests: Dict[str, List[Dict[str, str]]] = {}
+    for paper, (planned, error) in zip(papers, executor.map(plan, papers)):
+        if error is not None:
+            logger.warning(f"Failed to prepare batch requests for {paper.arxiv_id}: {error}")
+            continue
+        for i, messages in enumerate(planned):
+            if llm.peek(messages) is None:
+                requests[f"{paper.arxiv_id}-{i}"] = messages
+
+    results = runner.run(requests, deadline=config.batch_deadline)
+    for custom_id, response in results.items():
+        llm.store(requests[custom_id], response)
+    return dict(runner.stats)
 
 
 def content_generation_node(state: AgentState) -> dict:
@@ -171,35 +385,113 @@ def content_generation_node(state: AgentState) -> dict:
         state.add_error("No profile available for content generation")
         return {"current_step": "content_generation_error"}
 
+    config = state.config
+    prefetcher = get_prefetcher(state.run_id)
+    executor = LLMExecutor(
+        max_concurrency=config.llm_concurrency,
+        rpm=config.llm_rpm,
+        tpm=config.llm_tpm,
+        max_retries=config.llm_max_retries,
+    )
     try:
-        llm = get_llm(state.config.user_profile.llm)
-
-        # Generate TLDR and enrich paper data
-        for i, scored_paper in enumerate(state.scored_papers):
+        conn = config.user_profile.llm
+        llm = get_llm(conn, use_cache=config.llm_cache, refresh=config.refresh_llm_cache)
+        if config.batch_mode and not isinstance(llm, CachedLLM):
+            # Batch results are handed over through a response cache, kept in memory when caching is off
+            llm = CachedLLM(
+                llm, LLMResponseCache(path=":memory:"), model=conn.model_name, base_url=conn.openai_api_base
+            )
+        llm = executor.wrap(llm)
+
+        affiliation_index = get_affiliation_index(config.affiliation_max_age_days) if config.affiliation_index else None
+
+        batch_stats: Dict[str, Any] = {}
+        if config.batch_mode:
+            try:
+                runner = BatchJobRunner.from_connection(conn, poll_interval=config.batch_poll_interval)
+                batch_stats = _prefill_from_batch(
+                    [sp.paper for sp in state.scored_papers],
+                    llm,
+                    runner,
+                    executor,
+                    prefetcher,
+                    config,
+                    affiliation_index=affiliation_index,
+                )
+            except Exception as e:
+                logger.warning(f"Batch job failed, falling back to synchronous LLM calls: {e}")
+
+        def enrich(scored_paper: ScoredPaper) -> Dict[str, Any]:
+            return _enrich_paper(
+                scored_paper.paper,
+                llm,
+                prefetcher,
+                combined=config.combined_extraction,
+                affiliation_index=affiliation_index,
+            )
+
+        # Generate TLDR and enrich paper data concurrently, applying results in ranking order
+        logger.info(f"Processing {len(state.scored_papers)} papers with concurrency {executor.max_concurrency}...")
+        results = executor.map(enrich, state.scored_papers, timeout=config.paper_timeout)
+        source_wait = 0.0
+        code_url_offline = 0
+        affiliation_sources: Dict[str, int] = {}
+        for scored_paper, (fields, error) in zip(state.scored_papers, results):
             paper = scored_paper.paper
-            logger.info(f"Processing paper {i+1}/{len(state.scored_papers)}: {paper.title[:50]}...")
-
-            # Generate TLDR
-            if not paper.tldr:
-                paper.tldr = generate_tldr(paper, llm)
-
-            # Extract affiliations
-            if not paper.affiliations:
-                paper.affiliations = extract_affiliations(paper, llm)
-
-            # Get code URL
-            if not paper.code_url:
-                paper.code_url = get_code_url(paper)
+            if error is not None:
+                logger.warning(f"Failed to enrich paper {paper.arxiv_id}: {error}")
+                state.add_error(f"Content generation failed for {paper.arxiv_id}: {error}")
+                continue
+            source_wait += fields.pop("source_wait", 0.0)
+            source = fields.pop("affiliation_source", None)
+            if source is not None:
+                affiliation_sources[source] = affiliation_sources.get(source, 0) + 1
+            code_url_offline += "code_url" in fields
+            for key, value in fields.items():
+                setattr(paper, key, value)
+
+        # Look up the remaining code URLs remotely, concurrently and within an overall deadline
+        resolver = get_code_url_resolver()
+        code_urls = resolver.resolve_many(
+            [sp.paper.arxiv_id for sp in state.scored_papers if not sp.paper.code_url],
+            deadline=config.code_url_deadline,
+        )
+        for scored_paper in state.scored_papers:
+            if scored_paper.paper.arxiv_id in code_urls:
+                scored_paper.paper.code_url = code_urls[scored_paper.paper.arxiv_id]
 
         # Construct email content
         email_content = construct_email_content(state.scored_papers)
 
         logger.info("Content generation complete")
-        return {"email_content": email_content, "current_step": "content_generation_complete"}
+        metrics = dict(state.performance_metrics)
+        if prefetcher is not None:
+            metrics["source_prefetch_wait_seconds"] = source_wait
+        for source, count in affiliation_sources.items():
+            metrics[f"affiliations_from_{source}"] = count
+        if config.batch_mode:
+            metrics["batch_requests"] = batch_stats.get("submitted", 0)
+            metrics["batch_completed"] = batch_stats.get("completed", 0)
+        metrics["code_url_offline"] = code_url_offline
+        metrics["code_url_cache_hits"] = resolver.stats["cache_hits"]
+        metrics["code_url_timeouts"] = resolver.stats["timeouts"]
+        metrics["llm_calls"] = executor.stats["calls"]
+        metrics["llm_retries"] = executor.stats["retries"]
+        metrics["llm_throttle_seconds"] = executor.stats["throttle_seconds"]
+        if isinstance(llm, CachedLLM):
+            metrics["llm_cache_hits"] = llm.stats["hits"]
+            metrics["llm_cache_misses"] = llm.stats["misses"]
+        return {
+            "email_content": email_content,
+            "performance_metrics": metrics,
+            "current_step": "content_generation_complete",
+        }
 
     except Exception as e:
         state.add_error(f"Content generation failed: {str(e)}")
         return {"current_step": "content_generation_error"}
+    finally:
+        release_prefetcher(state.run_id)
 
 
 def communication_node(state: AgentState) -> dict:
@@ -230,29 +522,56 @@ def communication_node(state: AgentState) -> dict:
         else:
             logger.info("No papers found but SEND_EMPTY=True, sending empty email")
 
+    html_content = (
+        state.email_content
+        if isinstance(state.email_content, str)
+        else state.email_content.html_content if state.email_content else ""
+    )
+    email_config = state.config.user_profile.email_notification
+    receivers = [r.strip() for r in email_config.receiver.split(",") if r.strip()]
+    subject = f"Daily arXiv {datetime.now().strftime('%Y/%m/%d')}"
+
+    # The run is done once the digest is durably spooled; delivery failures are retried from the outbox
     try:
-        # Send email
-        success = send_email(
-            sender=state.config.user_profile.email_notification.sender,
-            receiver=state.config.user_profile.email_notification.receiver,
-            password=state.config.user_profile.email_notification.sender_password,
-            smtp_server=state.config.user_profile.email_notification.smtp_server,
-            smtp_port=state.config.user_profile.email_notification.smtp_port,
-            html_content=(
-                state.email_content
-                if isinstance(state.email_content, str)
-                else state.email_content.html_content if state.email_content else ""
-            ),
+        outbox = get_email_outbox(state.config.email_outbox_max_attempts, state.config.email_outbox_backoff)
+        spooled = outbox.spool(
+            OutgoingEmail(receiver=receiver, subject=subject, html_content=html_content) for receiver in receivers
         )
+    except OSError as e:
+        logger.error(f"Failed to spool email: {str(e)}")
+        state.add_error(f"Failed to spool email: {str(e)}")
+        return {"current_step": "communication_error"}
 
-        if success:
+    metrics = dict(state.performance_metrics)
+    metrics["emails_spooled"] = len(spooled)
+    try:
+        # One connection delivers a separate message to every receiver, plus any earlier deferred emails
+        sender = SMTPSender.from_connection(
+            email_config,
+            max_messages_per_connection=state.config.email_max_per_connection,
+            min_interval=state.config.email_min_interval,
+        )
+        report = outbox.drain(sender)
+    except Exception as e:
+        logger.warning(f"Email delivery deferred: {str(e)}")
+        state.add_error(f"Email delivery deferred: {str(e)}")
+    else:
+        metrics.update(
+            {
+                "emails_sent": report.sent,
+                "emails_failed": report.failed,
+                "email_reconnects": report.reconnects,
+                "email_rate_limited": report.rate_limited,
+                "email_delivery_seconds": report.elapsed_seconds,
+                "emails_per_second": report.messages_per_second,
+            }
+        )
+        for error in set(report.failures.values()):
+            state.add_error(f"Email delivery deferred: {error}")
+        if report.sent and not report.failed:
             logger.info("Email sent successfully")
-            return {"current_step": "workflow_complete"}
-        else:
-            state.add_error("Email delivery failed")
-            return {"current_step": "communication_error"}
 
-    except Exception as e:
-        logger.error(f"Email delivery failed: {str(e)}")
-        state.add_error(f"Email delivery failed: {str(e)}")
-        return {"current_step": "communication_error"}
+    metrics["emails_pending"] = len(outbox.pending())
+    if metrics["emails_pending"]:
+        logger.warning(f"{metrics['emails_pending']} emails wait in the outbox; retry with --drain-outbox")
+    return {"current_step": "workflow_complete", "performance_metrics": metrics}
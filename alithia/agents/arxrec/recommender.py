@@ -9,6 +9,12 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 
 from ...core.paper import ArxivPaper, ScoredPaper
+from ...core.similarity import as_float32_matrix
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
 
 
 def rerank_papers(
@@ -48,23 +54,17 @@ def rerank_papers(
     paper_texts = [paper.summary for paper in papers]
     paper_embeddings = encoder.encode(paper_texts)
 
-    # Calculate similarity scores
-    similarities = encoder.similarity(paper_embeddings, corpus_embeddings)
-
-    # Calculate weighted scores
-    scores = (similarities * time_decay_weight).sum(axis=1) * 10
-
-    # Create scored papers
-    scored_papers = []
-    for paper, score in zip(papers, scores):
-        scored_paper = ScoredPaper(
-            paper=paper,
-            score=float(score),
-            relevance_factors={"corpus_similarity": float(score), "corpus_size": len(corpus)},
+    # Weighted cosine similarity; folding the weights into the corpus first avoids the papers x corpus matrix
+    paper_embeddings = _normalize_rows(as_float32_matrix(paper_embeddings))
+    corpus_embeddings = _normalize_rows(as_float32_matrix(corpus_embeddings))
+    scores = paper_embeddings @ (corpus_embeddings.T @ time_decay_weight.astype(np.float32)) * 10
+
+    # Create scored papers, highest score first
+    return [
+        ScoredPaper(
+            paper=papers[i],
+            score=float(scores[i]),
+            relevance_factors={"corpus_similarity": float(scores[i]), "corpus_size": len(corpus)},
         )
-        scored_papers.append(scored_paper)
-
-    # Sort by score (highest first)
-    scored_papers.sort(key=lambda x: x.score, reverse=True)
-
-    return scored_papers
+        for i in np.argsort(-scores, kind="stable")
+    ]
@@ -2,6 +2,7 @@
 Agent state management for the Alithia research agent.
 """
 
+import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -23,6 +24,42 @@ class ArxrecConfig(BaseModel):
     send_empty: bool = False
     ignore_patterns: List[str] = Field(default_factory=list)
 
+    # Source prefetching (0 workers disables it)
+    prefetch_workers: int = 4
+    prefetch_interval: float = 3.0
+
+    # LLM execution (None disables the corresponding limit)
+    llm_concurrency: int = 4
+    llm_rpm: Optional[int] = None
+    llm_tpm: Optional[int] = None
+    llm_max_retries: int = 3
+    paper_timeout: Optional[float] = 300.0
+    combined_extraction: bool = True
+
+    # Persistent LLM response cache
+    llm_cache: bool = True
+    refresh_llm_cache: bool = False
+
+    # Persistent author to affiliation index
+    affiliation_index: bool = True
+    affiliation_max_age_days: float = 180.0
+
+    # Submit LLM requests as an OpenAI Batch job, falling back to synchronous calls after the deadline
+    batch_mode: bool = False
+    batch_deadline: Optional[float] = 7200.0
+    batch_poll_interval: float = 30.0
+
+    # Overall deadline for resolving the code URLs of all papers
+    code_url_deadline: Optional[float] = 60.0
+
+    # Messages sent over one SMTP connection before reconnecting, and minimum seconds between messages
+    email_max_per_connection: int = 100
+    email_min_interval: float = 0.0
+
+    # Delivery attempts of a spooled email before it is moved aside, and base seconds between attempts
+    email_outbox_max_attempts: int = 8
+    email_outbox_backoff: float = 300.0
+
     debug: bool = False
 
 
@@ -43,6 +80,8 @@ class AgentState(BaseModel):
     email_content: Optional[EmailContent] = None
 
     # System State
+    # Identifies the run, e.g. for resources kept outside the state such as the source prefetcher
+    run_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
     current_step: str = "initializing"
     error_log: List[str] = Field(default_factory=list)
     performance_metrics: Dict[str, float] = Field(default_factory=dict)
@@ -19,6 +19,9 @@ app = typer.Typer(help="AlithiaLens - Deep Paper Interaction Agent")
 def interact_with_paper(
     paper_id: str = typer.Argument(..., help="The ArXiv ID, DOI, or PDF path of the paper to analyze."),
     debug: bool = typer.Option(False, "--debug", help="Enable debug mode for more verbose output."),
+    stream: bool = typer.Option(
+        True, "--stream/--no-stream", help="Print answers token by token as they are generated."
+    ),
 ):
     """
     Starts an interactive session to ask questions and analyze a specific research paper.
@@ -31,6 +34,8 @@ def interact_with_paper(
         "initial_query": initial_query,
         "debug": debug,
     }
+    if stream:
+        config["on_token"] = lambda token: typer.echo(token, nl=False)
 
     agent = LensAgent()
     # The 'run' method will handle the interactive loop based on the graph design.
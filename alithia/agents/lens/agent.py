@@ -68,6 +68,8 @@ class LensAgent:
             debug_mode=config.get("debug", False),
             # Pass initial user input if provided
             user_input=config.get("initial_query"),
+            # Stream answer tokens to the caller if requested
+            on_token=config.get("on_token"),
         )
 
         try:
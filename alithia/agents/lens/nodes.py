@@ -2,21 +2,32 @@
 Nodes for the AlithiaLens agent workflow.
 """
 
+import hashlib
 import logging
 import os
-from typing import Literal, Optional
-
-from alithia.core.embedding import EmbeddingService
+import threading
+import time
+from typing import Dict, List, Literal, Optional
+
+from alithia.core.cascade_ranker import CascadeRanker
+from alithia.core.embedding import configured_output_dim, get_embedding_service
+from alithia.core.ingest_ledger import content_hash, get_ingest_ledger
+from alithia.core.llm_streaming import TimedStream, stream_completion
 from alithia.core.llm_utils import get_llm
+from alithia.core.local_vector_store import LocalVectorStore
 from alithia.core.pdf_processor import PDFProcessor
 from alithia.core.researcher.connected import ZoteroConnection
 from alithia.core.table_store import SupabaseTableStore
-from alithia.core.vector_store import PineconeVectorStore
+from alithia.core.token_budget import count_tokens, fit_sections
+from alithia.core.vector_store import create_vector_store
 
 from .state import AgentState
 
 logger = logging.getLogger(__name__)
 
+# Token budget for question plus retrieved context in Lens answers
+MAX_CONTEXT_TOKENS = 6000
+
 
 def get_user_input_node(state: AgentState) -> dict:
     """
@@ -73,51 +84,92 @@ def load_paper_node(state: AgentState) -> dict:
         raise ValueError("Lens currently expects a local PDF path for 'load'.")
 
     # Initialize services
-    pdf = PDFProcessor()
-    embed = EmbeddingService()
+    embed = get_embedding_service(output_dim=configured_output_dim())
 
     # Vector store and table store configs from env
     index_name = os.getenv("PINECONE_INDEX", "alithia-lens")
     namespace = os.getenv("PINECONE_NAMESPACE", None)
-    vector = PineconeVectorStore(index_name=index_name, namespace=namespace)
-
-    table = SupabaseTableStore()
+    vector = create_vector_store(index_name=index_name, namespace=namespace, dimension=embed.output_dim)
+
+    try:
+        table: Optional[SupabaseTableStore] = SupabaseTableStore()
+    except RuntimeError:
+        # Offline runs on the local vector store need no table store; Pinecone deployments keep requiring it
+        if not isinstance(vector, LocalVectorStore):
+            raise
+        logger.warning("Supabase is not configured, document and chunk rows are not stored")
+        table = None
     doc_table = os.getenv("SUPABASE_DOC_TABLE", "lens_documents")
     chunk_table = os.getenv("SUPABASE_CHUNK_TABLE", "lens_chunks")
 
     # Derive a document id
     doc_id = os.path.splitext(os.path.basename(pdf_path))[0]
 
-    # Parse PDF into chunks
-    chunks = pdf.process(pdf_path)
-
-    # Embed and upsert vectors
-    texts = [c["text"] for c in chunks]
-    embeddings = embed.embed_texts(texts)
-    vector.upsert_chunks(doc_id=doc_id, chunks=chunks, embeddings=embeddings)
-
-    # Upsert table metadata
-    table.upsert_document(
-        table=doc_table,
-        doc={
-            "id": doc_id,
-            "source_path": pdf_path,
-            "num_chunks": len(chunks),
-        },
-    )
-    table.upsert_chunks(
-        table=chunk_table,
-        chunks=[
-            {
-                "id": f"{doc_id}:{c['id']}",
-                "doc_id": doc_id,
-                "page": c.get("page"),
-                "offset": c.get("offset"),
-                "text": c.get("text"),
+    # Questions about the paper need the reranker; load it while the user reads the summary
+    threading.Thread(target=embed.warmup, kwargs={"embedder": False}, daemon=True).start()
+
+    # Ledger entries are keyed by the identity of each store, so switching or moving stores writes everything again
+    ledger = get_ingest_ledger()
+    model_key = f"{embed.embedding_model_name}@{embed.output_dim}"
+    vector_key = vector.store_id
+    table_key = f"{table.store_id}/{chunk_table}" if table is not None else None
+    files_key = f"files:{vector_key}|{table_key}"
+
+    # Skip parsing altogether when this exact file was already ingested into these stores with the same model
+    with open(pdf_path, "rb") as f:
+        file_hash = content_hash(hashlib.file_digest(f, "sha1").hexdigest(), model_key)
+    if ledger.diff(files_key, {doc_id: file_hash}).is_empty:
+        recorded = ledger.ids(vector_key, doc_id)
+        if recorded and vector.existing_ids(recorded) == set(recorded):
+            logger.info(f"{doc_id} is already ingested and unchanged, skipping")
+            return {
+                "current_paper": {"id": doc_id, "title": os.path.basename(pdf_path)},
+                "last_node": "load_paper",
             }
-            for c in chunks
-        ],
+        logger.warning(f"{doc_id} is recorded as ingested but missing from {vector_key}, ingesting again")
+
+    # Parse PDF into chunks
+    chunks = PDFProcessor().process(pdf_path)
+    rows = {
+        f"{doc_id}:{c['id']}": {
+            "id": f"{doc_id}:{c['id']}",
+            "doc_id": doc_id,
+            "page": c.get("page"),
+            "offset": c.get("offset"),
+            "text": c.get("text"),
+        }
+        for c in chunks
+    }
+
+    # Embed and upsert only new or changed chunks, and drop chunks no longer in the document
+    vector_hashes = {chunk_id: content_hash(row, model_key) for chunk_id, row in rows.items()}
+    diff = ledger.diff(vector_key, vector_hashes, group=doc_id, verify=vector.existing_ids)
+    logger.info(
+        f"{doc_id}: {len(diff.changed)} new or changed chunks, {len(diff.unchanged)} unchanged, "
+        f"{len(diff.removed)} removed"
     )
+    changed = set(diff.changed)
+    changed_chunks = [c for c in chunks if f"{doc_id}:{c['id']}" in changed]
+    if changed_chunks:
+        embeddings = embed.embed_texts([c["text"] for c in changed_chunks])
+        vector.upsert_chunks(doc_id=doc_id, chunks=changed_chunks, embeddings=embeddings)
+    if diff.removed:
+        vector.delete(diff.removed)
+    ledger.record(vector_key, {i: vector_hashes[i] for i in diff.changed}, group=doc_id, removed=diff.removed)
+
+    # Same for the chunk rows, which do not depend on the embedding model
+    if table is not None:
+        table_hashes = {chunk_id: content_hash(row) for chunk_id, row in rows.items()}
+        table_diff = ledger.diff(table_key, table_hashes, group=doc_id)
+        if table_diff.changed:
+            table.upsert_rows(chunk_table, [rows[i] for i in table_diff.changed])
+        if table_diff.removed:
+            table.delete_rows(chunk_table, table_diff.removed)
+        table.upsert_document(table=doc_table, doc={"id": doc_id, "source_path": pdf_path, "num_chunks": len(chunks)})
+        ledger.record(
+            table_key, {i: table_hashes[i] for i in table_diff.changed}, group=doc_id, removed=table_diff.removed
+        )
+    ledger.record(files_key, {doc_id: file_hash})
 
     return {
         "current_paper": {"id": doc_id, "title": os.path.basename(pdf_path)},
@@ -125,13 +177,47 @@ def load_paper_node(state: AgentState) -> dict:
     }
 
 
+def _answer_messages(query: str, context_block: str) -> List[Dict[str, str]]:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are AlithiaLens, a precise research assistant. "
+                "Answer with citations to page numbers when possible."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"Question: {query}\n\nContext from the paper (chunked):\n{context_block}\n\n"
+                "Provide a concise, accurate answer grounded in the context. If uncertain, say you are unsure."
+            ),
+        },
+    ]
+
+
+def stream_answer(llm, messages: List[Dict[str, str]]) -> TimedStream:
+    """
+    Stream an answer token by token.
+
+    Args:
+        llm: LLM client instance
+        messages: Chat messages of the question
+
+    Returns:
+        TimedStream yielding the answer text; its ``ttft`` and ``total`` are set while it is consumed
+    """
+    return TimedStream(stream_completion(llm, messages))
+
+
 def process_query_node(state: AgentState) -> dict:
     """
     Answer a user's question using hybrid retrieval:
     - Encode query with sentence-transformers
     - Retrieve from Pinecone by vector similarity
     - Rerank with CrossEncoder
-    - Generate final answer with cogents LLM using top contexts
+    - Generate final answer with cogents LLM using top contexts, streamed to
+      ``on_token`` when the state provides one
     """
     logger.info(">>> Executing Node: process_query <<<")
     query = state.get("user_input")
@@ -141,21 +227,27 @@ def process_query_node(state: AgentState) -> dict:
         return {"last_response": "No paper loaded yet.", "last_node": "process_query"}
 
     # Init services
-    embed = EmbeddingService()
+    embed = get_embedding_service(output_dim=configured_output_dim())
     index_name = os.getenv("PINECONE_INDEX", "alithia-lens")
     namespace = os.getenv("PINECONE_NAMESPACE", None)
-    vector = PineconeVectorStore(index_name=index_name, namespace=namespace)
+    vector = create_vector_store(index_name=index_name, namespace=namespace, dimension=embed.output_dim)
 
     # Encode and retrieve
     qvec = embed.embed_texts([query])[0]
-    retrieved = vector.query(query_embedding=qvec, top_k=20, filter={"doc_id": {"$eq": doc_id}})
-
-    # Rerank
-    reranked = embed.rerank(query, retrieved, top_k=8)
-
-    # Compose context
-    [r.get("text", "") for r in reranked]
-    context_block = "\n\n".join([f"[p{r.get('page')}] {r.get('text')}" for r in reranked])
+    matches = vector.query(query_embedding=qvec, top_k=20, filter={"doc_id": {"$eq": doc_id}})
+    # Flatten chunk metadata (text, page) next to the id and score
+    retrieved = [dict(m.get("metadata") or {}, id=m.get("id"), score=m.get("score")) for m in matches]
+
+    # Rerank, cross-encoding only as deep as needed to settle the top 8
+    cascade = CascadeRanker(embed)
+    reranked = cascade.rerank(query, retrieved, top_k=8, score_key="score")
+
+    # Compose context, trimming the lowest-ranked chunks first to stay within the prompt budget
+    chunks = fit_sections(
+        {str(i): f"[p{r.get('page')}] {r.get('text')}" for i, r in enumerate(reranked)},
+        MAX_CONTEXT_TOKENS - count_tokens(query or ""),
+    )
+    context_block = "\n\n".join([c for c in chunks.values() if c])
 
     # Generate with LLM (cogents)
     # Reuse profile if available; otherwise create a minimal temporary profile-like obj
@@ -169,18 +261,22 @@ def process_query_node(state: AgentState) -> dict:
                 zotero_key="",
             ),
         )
-    llm = get_llm(profile)
-    answer = llm.generate(
-        messages=[
-            {
-                "role": "system",
-                "content": "You are AlithiaLens, a precise research assistant. Answer with citations to page numbers when possible.",
-            },
-            {
-                "role": "user",
-                "content": f"Question: {query}\n\nContext from the paper (chunked):\n{context_block}\n\nProvide a concise, accurate answer grounded in the context. If uncertain, say you are unsure.",
-            },
-        ]
-    )
-
-    return {"last_response": str(answer).strip(), "last_node": "process_query"}
+    llm = get_llm(profile.llm)
+    messages = _answer_messages(query, context_block)
+    metrics = dict(state.get("performance_metrics") or {})
+    metrics["rerank_candidates"] = len(retrieved)
+    metrics["rerank_depth"] = cascade.last_depth or 0
+    on_token = state.get("on_token")
+    if on_token is None:
+        start = time.perf_counter()
+        answer = str(llm.generate(messages=messages))
+        metrics["answer_generation_seconds"] = time.perf_counter() - start
+    else:
+        stream = stream_answer(llm, messages)
+        for token in stream:
+            on_token(token)
+        answer = stream.text
+        metrics["answer_ttft_seconds"] = stream.ttft or 0.0
+        metrics["answer_generation_seconds"] = stream.total or 0.0
+
+    return {"last_response": answer.strip(), "performance_metrics": metrics, "last_node": "process_query"}
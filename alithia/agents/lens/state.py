@@ -3,7 +3,7 @@ Agent state management for the Alithia research agent.
 """
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -34,6 +34,9 @@ class AgentState(BaseModel):
     error_log: List[str] = Field(default_factory=list)
     performance_metrics: Dict[str, float] = Field(default_factory=dict)
 
+    # Receives answer tokens as they are generated; answers are generated in one piece when unset
+    on_token: Optional[Callable[[str], None]] = Field(default=None, exclude=True)
+
     # Debug State
     debug_mode: bool = False
 
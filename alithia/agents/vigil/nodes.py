@@ -4,21 +4,29 @@ Nodes for the AlithiaVigil agent workflow.
 
 import logging
 import os
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 import feedparser
 
+from alithia.core.cascade_ranker import CascadeRanker
 from alithia.core.email_utils import construct_email_content, send_email
-from alithia.core.embedding import EmbeddingService
+from alithia.core.embedding import configured_output_dim, get_embedding_service
+from alithia.core.ingest_ledger import content_hash, get_ingest_ledger
 from alithia.core.paper import ArxivPaper, ScoredPaper
+from alithia.core.similarity import top_k_similarity
 from alithia.core.table_store import SupabaseTableStore
-from alithia.core.vector_store import PineconeVectorStore
+from alithia.core.vector_store import create_vector_store
 
 from .state import AgentState
 
 logger = logging.getLogger(__name__)
 
 
+def _retention_seconds() -> float:
+    # Items that left the feeds are kept this long, then pruned from the stores
+    return float(os.getenv("VIGIL_RETENTION_DAYS", "30")) * 86400
+
+
 def _fetch_arxiv_by_topics(topics: List[str]) -> List[ArxivPaper]:
     results: List[ArxivPaper] = []
     for topic in topics:
@@ -67,8 +75,24 @@ def scan_sources_node(state: AgentState) -> dict:
                 "source": "arxiv",
             }
         )
-    if rows:
-        supa.upsert_rows(doc_table, rows)
+    # Only rows that are new or changed since they were last stored are written
+    ledger = get_ingest_ledger()
+    table_key = f"{supa.store_id}/{doc_table}"
+    hashes = {str(row["id"]): content_hash(row) for row in rows}
+    diff = ledger.diff(table_key, hashes)
+    changed = set(diff.changed)
+    if changed:
+        supa.upsert_rows(doc_table, [row for row in rows if str(row["id"]) in changed])
+    # Recording unchanged rows too marks them as still in the feed
+    ledger.record(table_key, hashes)
+    expired = ledger.expired(table_key, _retention_seconds())
+    if expired:
+        supa.delete_rows(doc_table, expired)
+        ledger.record(table_key, {}, removed=expired)
+    logger.info(
+        f"Stored {len(changed)} new or changed items, skipped {len(diff.unchanged)} unchanged, "
+        f"pruned {len(expired)} expired"
+    )
 
     return {"discovered_papers": papers, "current_step": "scan_complete"}
 
@@ -87,23 +111,24 @@ def filter_results_node(state: AgentState) -> dict:
     topics = state.config.topics or []
     query_text = "; ".join(topics)
 
-    embed = EmbeddingService()
+    embed = get_embedding_service(output_dim=configured_output_dim())
 
     # Encode papers and query
     paper_texts = [f"{p.title}\n\n{p.summary}" for p in papers]
     paper_emb = embed.embed_texts(paper_texts)
     query_emb = embed.embed_texts([query_text])[0]
 
-    # Persist embeddings in Pinecone for Vigil
+    # Persist embeddings in the vector store for Vigil, skipping papers stored unchanged by earlier runs
     index_name = os.getenv("PINECONE_INDEX", "alithia-research")
     namespace = os.getenv("PINECONE_VIGIL_NAMESPACE", "vigil")
-    vector = PineconeVectorStore(index_name=index_name, namespace=namespace)
-    docs_for_upsert = []
-    for p, text in zip(papers, paper_texts):
+    model_key = f"{embed.embedding_model_name}@{embed.output_dim}"
+    docs_by_id: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+    for i, (p, text) in enumerate(zip(papers, paper_texts)):
         pid = p.arxiv_id or (p.title[:120] if p.title else None)
         if not pid:
             continue
-        docs_for_upsert.append(
+        docs_by_id[pid] = (
+            i,
             {
                 "id": pid,
                 "text": text,
@@ -111,25 +136,38 @@ def filter_results_node(state: AgentState) -> dict:
                 "arxiv_id": p.arxiv_id,
                 "pdf_url": p.pdf_url,
                 "source": "arxiv",
-            }
+            },
         )
-    if docs_for_upsert:
-        vector.upsert_documents(docs_for_upsert, paper_emb, id_key="id", text_key="text")
-
-    # Similarity and basic score
-    sims = (paper_emb @ query_emb.reshape(-1, 1)).reshape(-1)
-    scored = [
-        ScoredPaper(paper=p, score=float(s * 10.0), relevance_factors={"topic_similarity": float(s)})
-        for p, s in zip(papers, sims)
+    vector = create_vector_store(index_name=index_name, namespace=namespace, dimension=embed.output_dim)
+    ledger = get_ingest_ledger()
+    vector_key = vector.store_id
+    hashes = {pid: content_hash(doc, model_key) for pid, (_, doc) in docs_by_id.items()}
+    diff = ledger.diff(vector_key, hashes, verify=vector.existing_ids)
+    if diff.changed:
+        rows = [docs_by_id[pid][0] for pid in diff.changed]
+        vector.upsert_documents([docs_by_id[pid][1] for pid in diff.changed], paper_emb[rows], id_key="id")
+    ledger.record(vector_key, hashes)
+    expired = ledger.expired(vector_key, _retention_seconds())
+    if expired:
+        vector.delete(expired)
+        ledger.record(vector_key, {}, removed=expired)
+
+    # Similarity and basic score of the top N
+    sims, top = top_k_similarity(query_emb, paper_emb, k=50)
+    top_candidates = [
+        {"text": paper_texts[i], "paper": papers[i], "base_score": float(s * 10.0)} for i, s in zip(top[0], sims[0])
     ]
 
     # Rerank top N with CrossEncoder for better fidelity
-    scored.sort(key=lambda x: x.score, reverse=True)
-    top_candidates = [
-        {"text": f"{sp.paper.title}\n\n{sp.paper.summary}", "paper": sp.paper, "base_score": sp.score}
-        for sp in scored[:50]
-    ]
-    reranked = embed.rerank(query_text, top_candidates, top_k=min(20, len(top_candidates)))
+    # Cross-encode only as deep as needed to settle the top 20
+    cascade = CascadeRanker(embed)
+    reranked = cascade.rerank(query_text, top_candidates, top_k=min(20, len(top_candidates)), score_key="base_score")
+    metrics = dict(state.get("performance_metrics") or {})
+    metrics["rerank_candidates"] = len(top_candidates)
+    metrics["rerank_depth"] = cascade.last_depth or 0
+    metrics["vectors_upserted"] = len(diff.changed)
+    metrics["vectors_unchanged"] = len(diff.unchanged)
+    metrics["vectors_pruned"] = len(expired)
 
     # Map back to ScoredPaper
     final_scored: List[ScoredPaper] = []
@@ -147,7 +185,7 @@ def filter_results_node(state: AgentState) -> dict:
             )
         )
 
-    return {"scored_papers": final_scored, "current_step": "filter_complete"}
+    return {"scored_papers": final_scored, "current_step": "filter_complete", "performance_metrics": metrics}
 
 
 def send_alert_node(state: AgentState) -> dict:
@@ -0,0 +1,192 @@
+"""
+Persistent author to affiliation index learned from extracted affiliations.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# Confidence of a mapping learned from one paper, by how the authors were matched to affiliations
+SINGLE_AFFILIATION_CONFIDENCE = 0.9
+POSITIONAL_CONFIDENCE = 0.5
+
+# Confidence scale by extraction source; the parser stays below the LLM while its lists may be incomplete
+SOURCE_CONFIDENCE_SCALE = {"llm": 0.8, "parser": 0.7}
+
+
+def normalize_author(name: str) -> str:
+    """Normalize an author name for lookups (case and whitespace insensitive)."""
+    return re.sub(r"\s+", " ", name).strip().lower()
+
+
+class AffiliationIndex:
+    """
+    SQLite-backed author to affiliation index.
+
+    Each entry stores the author's most likely affiliation, a confidence in
+    [0, 1], how many papers confirmed it and when it was last confirmed. Only
+    entries confirmed by at least ``min_sightings`` papers with at least
+    ``min_confidence`` are served. Seeing the same affiliation again raises
+    the confidence; a conflicting one drops it below ``min_confidence`` and
+    resets the confirmations, so ambiguous names (two people, or someone who
+    moved) stop being served until one affiliation is confirmed again. The
+    entry switches to the new affiliation once the old one is weaker than the
+    new evidence. Entries older than ``max_age_days`` are treated as missing,
+    so their papers are extracted again and the entries refreshed.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_age_days: float = 180.0,
+        min_confidence: float = 0.7,
+        min_sightings: int = 2,
+    ) -> None:
+        self.path = path
+        self.max_age_days = max_age_days
+        self.min_confidence = min_confidence
+        self.min_sightings = min_sightings
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or os.path.join(get_cache_dir("affiliations"), "authors.sqlite3")
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS authors ("
+                "author TEXT PRIMARY KEY, affiliation TEXT NOT NULL, confidence REAL NOT NULL, "
+                "last_seen REAL NOT NULL, sightings INTEGER NOT NULL DEFAULT 1)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(authors)")]
+            if "sightings" not in columns:
+                # Indexes created before confirmations were counted
+                conn.execute("ALTER TABLE authors ADD COLUMN sightings INTEGER NOT NULL DEFAULT 1")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def lookup(self, authors: Sequence[str]) -> Optional[List[str]]:
+        """
+        Answer the affiliations of a paper from the index.
+
+        Args:
+            authors: Author names in paper order
+
+        Returns:
+            Deduplicated affiliations in author order, or None unless every author
+            has a fresh entry with sufficient confidence
+        """
+        keys = [normalize_author(a) for a in authors if a.strip()]
+        if not keys:
+            return None
+        oldest = time.time() - self.max_age_days * 86400
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT author, affiliation, confidence, last_seen, sightings FROM authors "
+                f"WHERE author IN ({','.join('?' * len(keys))})",
+                keys,
+            ).fetchall()
+        entries = {row[0]: row[1:] for row in rows}
+
+        affiliations: List[str] = []
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None or entry[1] < self.min_confidence or entry[2] < oldest or entry[3] < self.min_sightings:
+                return None
+            if entry[0] not in affiliations:
+                affiliations.append(entry[0])
+        return affiliations
+
+    def learn(
+        self,
+        authors: Sequence[str],
+        affiliations: Sequence[str],
+        confidence_scale: float = 1.0,
+        author_order: bool = False,
+        per_author: bool = False,
+    ) -> int:
+        """
+        Record the affiliations extracted for a paper.
+
+        Authors can only be matched when a single affiliation is known to cover
+        every author (the paper has one author, or the source declares one
+        affiliation per author) or, for affiliations known to be in author
+        order, when there is exactly one affiliation per author (matched by
+        position); other papers are ignored. A single affiliation alone is not
+        enough, as it may be a partial list or merged duplicates.
+
+        Args:
+            authors: Author names in paper order
+            affiliations: Extracted affiliations
+            confidence_scale: Factor applied to the confidence, e.g. below 1 for LLM extractions
+            author_order: Whether ``affiliations`` follow the author order, rather than e.g. the
+                declaration order of LaTeX affiliation macros
+            per_author: Whether the source declares an affiliation for each author, e.g. one
+                ``\\affiliation`` macro per author
+
+        Returns:
+            Number of authors updated
+        """
+        authors = [a for a in authors if a.strip()]
+        if not authors or not affiliations:
+            return 0
+        if len(affiliations) == 1 and (len(authors) == 1 or per_author):
+            pairs = [(a, affiliations[0]) for a in authors]
+            confidence = SINGLE_AFFILIATION_CONFIDENCE
+        elif author_order and len(affiliations) == len(authors):
+            pairs = list(zip(authors, affiliations))
+            confidence = POSITIONAL_CONFIDENCE
+        else:
+            return 0
+        confidence *= confidence_scale
+
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            for author, affiliation in pairs:
+                key = normalize_author(author)
+                row = conn.execute(
+                    "SELECT affiliation, confidence, sightings FROM authors WHERE author = ?", (key,)
+                ).fetchone()
+                # Conflicting evidence never leaves an entry servable without further confirmation
+                unconfirmed = self.min_confidence / 2
+                if row is None:
+                    entry = (affiliation, confidence, 1)
+                elif row[0] == affiliation:
+                    entry = (affiliation, row[1] + (1 - row[1]) * confidence, row[2] + 1)
+                elif row[1] < confidence:
+                    entry = (affiliation, min(confidence, unconfirmed), 1)
+                else:
+                    entry = (row[0], min(row[1] / 2, unconfirmed), 0)
+                conn.execute(
+                    "INSERT OR REPLACE INTO authors (author, affiliation, confidence, sightings, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, *entry, now),
+                )
+            conn.commit()
+        return len(pairs)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM authors")
+            conn.commit()
+
+
+@lru_cache(maxsize=None)
+def get_affiliation_index(max_age_days: float = 180.0) -> AffiliationIndex:
+    """Get the process-wide affiliation index stored in the Alithia cache directory."""
+    return AffiliationIndex(max_age_days=max_age_days)
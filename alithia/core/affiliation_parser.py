@@ -0,0 +1,205 @@
+"""
+Rule-based extraction of author affiliations from LaTeX author blocks.
+
+Covers the affiliation macros of the common arXiv templates: revtex/ACM
+(``\\affiliation``, ``\\institution``), LNCS (``\\institute``), authblk
+(``\\affil``), IEEEtran (``\\IEEEauthorblockA``), ICML (``\\icmlaffiliation``),
+elsarticle (``\\address``) and NeurIPS-style ``\\author`` blocks with
+line-separated affiliations.
+"""
+
+import re
+from typing import Iterator, List, Optional
+
+# Macros whose (last) braced argument is an affiliation
+_AFFILIATION_MACROS = ["affiliation", "affil", "institute", "IEEEauthorblockA", "icmlaffiliation", "address"]
+
+# Keywords marking a top-level institution, most specific first
+_TOP_LEVEL_PATTERNS = [
+    re.compile(r"\b(Universit\w*|Univ\.|College|Academy|Polytechnic|École|Ecole|ETH|EPFL|MIT|KAIST)\b", re.I),
+    re.compile(r"\b(Inc\.?|Ltd\.?|LLC|Corp\.?|Corporation|GmbH|Company|Co\.)(?=\W|$)", re.I),
+    re.compile(
+        r"\b(Google|Microsoft|Meta|Amazon|Apple|NVIDIA|IBM|Alibaba|Tencent|Baidu|ByteDance|Huawei|OpenAI|DeepMind"
+        r"|Anthropic|Samsung|Intel|Adobe|Salesforce)\b"
+    ),
+    re.compile(
+        r"\b(Institut\w*|Laborator\w*|Labs?|Research|Center|Centre|Hospital|Foundation|Observatory|Council)\b", re.I
+    ),
+]
+
+# Sub-units that are never the top-level institution on their own
+_SUB_UNIT_PATTERN = re.compile(r"^\s*(Department|Dept\.?|School|Faculty|Division|Chair|Group|Program)\b", re.I)
+
+_EMAIL_PATTERN = re.compile(r"\S+@\S+")
+
+# Superscript markers linking authors to affiliations, e.g. ``$^{1,2}$`` or ``\textsuperscript{a}``
+_MARKER_PATTERN = re.compile(r"\$\s*\^\s*\{?([^${}]*)\}?\s*\$|\\textsuperscript\{([^}]*)\}")
+
+# Boundaries between affiliations inside a NeurIPS-style \author block
+_AUTHOR_SEPARATOR_PATTERN = re.compile(
+    r"\\\\|\\newline\b|\\(?:And|AND|and|quad|qquad)\b|\$\s*\^[^$]*\$|\\textsuperscript\{[^}]*\}"
+)
+
+
+def _braced_args(text: str, macro: str) -> Iterator[str]:
+    """Yield the last braced argument of every occurrence of ``\\macro``, skipping optional ``[...]`` arguments."""
+    for match in re.finditer(r"\\" + macro + r"(?![A-Za-z])", text):
+        pos = match.end()
+        args: List[str] = []
+        while pos < len(text):
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos < len(text) and text[pos] == "[":
+                end = text.find("]", pos)
+                if end == -1:
+                    break
+                pos = end + 1
+                continue
+            if pos >= len(text) or text[pos] != "{":
+                break
+            depth = 0
+            start = pos
+            for i in range(pos, len(text)):
+                if text[i] == "{":
+                    depth += 1
+                elif text[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        args.append(text[start + 1 : i])
+                        pos = i + 1
+                        break
+            else:
+                break
+        if args:
+            yield args[-1]
+
+
+def _drop_args(text: str, macros: List[str]) -> str:
+    """Remove the braced arguments of the given macros."""
+    for macro in macros:
+        for arg in list(_braced_args(text, macro)):
+            text = text.replace(arg, "")
+    return text
+
+
+def _clean(text: str) -> str:
+    """Strip LaTeX markup from an affiliation, turning line breaks into commas."""
+    text = _drop_args(text, ["thanks", "footnote", "email", "url", "href", "texttt", "orcid", "textsuperscript"])
+    text = re.sub(r"\$[^$]*\$", "", text)
+    text = re.sub(r"\\\\|\\newline|\\and\b|\\AND\b|\n", ",", text)
+    text = re.sub(r"\\[A-Za-z]+\*?", " ", text)
+    text = re.sub(r"[{}~^]", " ", text)
+    text = _EMAIL_PATTERN.sub("", text)
+    return re.sub(r"\s+", " ", text).strip(" ,;")
+
+
+def normalize_affiliation(text: str) -> Optional[str]:
+    """
+    Reduce a (multi-level) affiliation to its top-level institution.
+
+    For example ``Department of Computer Science, Tsinghua University, Beijing``
+    becomes ``Tsinghua University``.
+
+    Args:
+        text: Raw affiliation text, possibly with LaTeX markup
+
+    Returns:
+        Top-level institution or None if none can be identified
+    """
+    parts = [p.strip(" .;") for p in _clean(text).split(",")]
+    parts = [p for p in parts if p and not p.isdigit()]
+    for pattern in _TOP_LEVEL_PATTERNS:
+        for part in parts:
+            if pattern.search(part) and not _SUB_UNIT_PATTERN.match(part):
+                return part
+    return None
+
+
+def _macro_candidates(author_block: str) -> List[str]:
+    """Raw affiliations declared with affiliation macros, in declaration order."""
+    candidates: List[str] = []
+    # ACM: \affiliation{\institution{...}\city{...}} names the institution explicitly
+    candidates.extend(_braced_args(author_block, "institution"))
+    for macro in _AFFILIATION_MACROS:
+        for arg in _braced_args(author_block, macro):
+            if macro == "affiliation" and "\\institution" in arg:
+                continue
+            if macro == "institute":
+                candidates.extend(re.split(r"\\and\b", arg))
+            else:
+                candidates.append(arg)
+    return [c for c in candidates if _clean(c)]
+
+
+def parse_declared_affiliations(author_block: Optional[str]) -> List[str]:
+    """
+    Extract the institution of every affiliation macro of a LaTeX author block.
+
+    Args:
+        author_block: Author information region of a paper
+
+    Returns:
+        One institution per declaration, in declaration order and not deduplicated;
+        empty if there are no affiliation macros or any of them cannot be reduced
+        to an institution
+    """
+    if not author_block:
+        return []
+    institutions: List[str] = []
+    for candidate in _macro_candidates(author_block):
+        institution = normalize_affiliation(candidate)
+        if institution is None:
+            # Dropping it would leave a partial list; return nothing so callers fall back to the LLM
+            return []
+        institutions.append(institution)
+    return institutions
+
+
+def parse_affiliations(author_block: Optional[str]) -> List[str]:
+    """
+    Extract top-level institutions from a LaTeX author block.
+
+    Args:
+        author_block: Author information region of a paper
+
+    Returns:
+        Deduplicated institutions in order of appearance; empty if nothing is found
+        or if any affiliation cannot be reduced to an institution
+    """
+    if not author_block:
+        return []
+    if not _macro_candidates(author_block):
+        return _parse_author_lines(author_block)
+
+    affiliations: List[str] = []
+    for institution in parse_declared_affiliations(author_block):
+        if institution not in affiliations:
+            affiliations.append(institution)
+    return affiliations
+
+
+def _parse_author_lines(author_block: str) -> List[str]:
+    """
+    Extract institutions from NeurIPS/ICLR-style ``\\author{...}`` blocks.
+
+    Affiliations are lines after the author names, or runs of text after
+    superscript markers (``$^1$University of Washington \\quad $^2$...``).
+    When fewer institutions are found than there are distinct markers, the
+    block was not fully understood and nothing is returned, so callers fall
+    back to the LLM rather than keep a partial list.
+    """
+    affiliations: List[str] = []
+    markers = set()
+    for arg in _braced_args(author_block, "author"):
+        arg = _drop_args(arg, ["thanks", "footnote", "email", "url", "href", "texttt", "orcid"])
+        for match in _MARKER_PATTERN.finditer(arg):
+            labels = (match.group(1) or match.group(2) or "").split(",")
+            # Symbols such as * or \dagger mark notes like equal contribution, not affiliations
+            markers.update(label.strip() for label in labels if re.fullmatch(r"\s*\w+\s*", label))
+        for piece in _AUTHOR_SEPARATOR_PATTERN.split(arg):
+            institution = normalize_affiliation(piece)
+            if institution and institution not in affiliations:
+                affiliations.append(institution)
+    if len(affiliations) < len(markers):
+        return []
+    return affiliations
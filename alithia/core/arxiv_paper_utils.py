@@ -7,18 +7,24 @@ import re
 import tarfile
 from contextlib import ExitStack
 from tempfile import TemporaryDirectory
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
 from urllib.error import HTTPError
 
-import requests
-import tiktoken
 from cogents.common.llm import BaseLLMClient
-from requests.adapters import HTTPAdapter, Retry
+from pydantic import BaseModel, Field, ValidationError
 
+from .affiliation_parser import parse_affiliations, parse_declared_affiliations
+from .code_link_extractor import find_code_url
+from .code_url_resolver import get_code_url_resolver
 from .paper import ArxivPaper
+from .tex_cache import LazyTex
+from .token_budget import count_tokens, fit_sections, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Prompt budget for TLDR and affiliation extraction, in gpt-4o tokens
+MAX_PROMPT_TOKENS = 4000
+
 
 def extract_tex_content(paper: ArxivPaper) -> Optional[Dict[str, str]]:
     """
@@ -121,45 +127,123 @@ def extract_tex_content(paper: ArxivPaper) -> Optional[Dict[str, str]]:
     return file_contents
 
 
-def generate_tldr(paper: ArxivPaper, llm: BaseLLMClient) -> str:
+def load_tex(paper: ArxivPaper) -> Optional[Mapping[str, Optional[str]]]:
     """
-    Generate TLDR summary for a paper.
+    Get the LaTeX content of a paper, downloading the source only when it is not cached yet.
+
+    Extracted content is spilled to the source cache and attached to ``paper.tex``
+    as a LazyTex handle, so it is only held in memory while being read.
+
+    Args:
+        paper: ArxivPaper instance
+
+    Returns:
+        Mapping with extracted LaTeX content or None if extraction fails
+    """
+    if paper.tex is not None:
+        return paper.tex
+
+    tex = LazyTex.open(paper.arxiv_id) if paper.arxiv_id else None
+    if tex is None:
+        contents = extract_tex_content(paper)
+        if contents is None:
+            return None
+        if paper.arxiv_id:
+            try:
+                tex = LazyTex.spill(paper.arxiv_id, contents)
+            except OSError as e:
+                logger.warning(f"Failed to cache source of {paper.arxiv_id}: {e}")
+                tex = contents
+        else:
+            tex = contents
+    paper.tex = tex
+    return tex
+
+
+def _tex_body(tex_content: Mapping[str, Optional[str]]) -> str:
+    content = tex_content.get("all")
+    if content is None:
+        content = "\n".join(v for v in tex_content.values() if v)
+    return content
+
+
+def _extract_intro_conclusion(content: str) -> Tuple[str, str]:
+    introduction = ""
+    conclusion = ""
+    # remove cite
+    content = re.sub(r"~?\\cite.?\{.*?\}", "", content)
+    # remove figure
+    content = re.sub(r"\\begin\{figure\}.*?\\end\{figure\}", "", content, flags=re.DOTALL)
+    # remove table
+    content = re.sub(r"\\begin\{table\}.*?\\end\{table\}", "", content, flags=re.DOTALL)
+    # find introduction and conclusion
+    # end word can be \section or \end{document} or \bibliography or \appendix
+    match = re.search(
+        r"\\section\{Introduction\}.*?(\\section|\\end\{document\}|\\bibliography|\\appendix|$)",
+        content,
+        flags=re.DOTALL,
+    )
+    if match:
+        introduction = match.group(0)
+    match = re.search(
+        r"\\section\{Conclusion\}.*?(\\section|\\end\{document\}|\\bibliography|\\appendix|$)",
+        content,
+        flags=re.DOTALL,
+    )
+    if match:
+        conclusion = match.group(0)
+    return introduction, conclusion
+
+
+def get_llm_lang(llm: BaseLLMClient) -> str:
+    """Get the output language configured on an LLM client, defaulting to English."""
+    lang = getattr(llm, "lang", "English")
+    if hasattr(lang, "__call__"):  # If it's a Mock or callable, use default
+        lang = "English"
+    return lang
+
+
+def extract_author_block(paper: ArxivPaper) -> Optional[str]:
+    """
+    Find the LaTeX region holding author and affiliation information.
+
+    Args:
+        paper: ArxivPaper to analyze
+
+    Returns:
+        Author information region or None if no source or region is found
+    """
+    # Use tex content from paper.tex or the source cache, downloading it if necessary
+    tex_content = load_tex(paper)
+    if tex_content is None:
+        return None
+
+    content = _tex_body(tex_content)
+    possible_regions = [r"\\author.*?\\maketitle", r"\\begin{document}.*?\\begin{abstract}"]
+    matches = [re.search(p, content, flags=re.DOTALL) for p in possible_regions]
+    match = next((m for m in matches if m), None)
+    if match is None:
+        logger.debug(f"Failed to extract affiliations of {paper.arxiv_id}: No author information found.")
+        return None
+    return match.group(0)
+
+
+def build_tldr_messages(paper: ArxivPaper, lang: str = "English") -> List[Dict[str, str]]:
+    """
+    Build the chat messages asking for the TLDR of a paper.
 
     Args:
         paper: ArxivPaper to summarize
-        llm: LLM instance for generation
+        lang: Language of the summary
 
     Returns:
-        TLDR summary string
+        Chat messages
     """
     introduction = ""
     conclusion = ""
-    if paper.tex is not None:
-        content = paper.tex.get("all")
-        if content is None:
-            content = "\n".join(paper.tex.values())
-        # remove cite
-        content = re.sub(r"~?\\cite.?\{.*?\}", "", content)
-        # remove figure
-        content = re.sub(r"\\begin\{figure\}.*?\\end\{figure\}", "", content, flags=re.DOTALL)
-        # remove table
-        content = re.sub(r"\\begin\{table\}.*?\\end\{table\}", "", content, flags=re.DOTALL)
-        # find introduction and conclusion
-        # end word can be \section or \end{document} or \bibliography or \appendix
-        match = re.search(
-            r"\\section\{Introduction\}.*?(\\section|\\end\{document\}|\\bibliography|\\appendix|$)",
-            content,
-            flags=re.DOTALL,
-        )
-        if match:
-            introduction = match.group(0)
-        match = re.search(
-            r"\\section\{Conclusion\}.*?(\\section|\\end\{document\}|\\bibliography|\\appendix|$)",
-            content,
-            flags=re.DOTALL,
-        )
-        if match:
-            conclusion = match.group(0)
+    tex_content = load_tex(paper)
+    if tex_content is not None:
+        introduction, conclusion = _extract_intro_conclusion(_tex_body(tex_content))
 
     prompt = """Given the title, abstract, introduction and the conclusion (if any) of a paper in latex format, generate a one-sentence TLDR summary in __LANG__:
     
@@ -168,38 +252,115 @@ def generate_tldr(paper: ArxivPaper, llm: BaseLLMClient) -> str:
     __INTRODUCTION__
     __CONCLUSION__
     """
-    # Get language from LLM or default to English
-    lang = getattr(llm, "lang", "English")
-    if hasattr(lang, "__call__"):  # If it's a Mock or callable, use default
-        lang = "English"
     prompt = prompt.replace("__LANG__", lang)
-    prompt = prompt.replace("__TITLE__", paper.title)
-    prompt = prompt.replace("__ABSTRACT__", paper.summary)
-    prompt = prompt.replace("__INTRODUCTION__", introduction)
-    prompt = prompt.replace("__CONCLUSION__", conclusion)
-
-    # use gpt-4o tokenizer for estimation
-    enc = tiktoken.encoding_for_model("gpt-4o")
-    prompt_tokens = enc.encode(prompt)
-    prompt_tokens = prompt_tokens[:4000]  # truncate to 4000 tokens
-    prompt = enc.decode(prompt_tokens)
-
-    tldr = llm.chat_completion(
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an assistant who perfectly summarizes scientific paper, and gives the core idea of the paper to the user.",
-            },
-            {"role": "user", "content": prompt},
-        ]
+
+    # fit paper parts into the token budget, trimming the conclusion first, then the introduction
+    sections = fit_sections(
+        {
+            "__TITLE__": paper.title,
+            "__ABSTRACT__": paper.summary,
+            "__INTRODUCTION__": introduction,
+            "__CONCLUSION__": conclusion,
+        },
+        MAX_PROMPT_TOKENS - count_tokens(prompt),
     )
-    return tldr
+    for placeholder, text in sections.items():
+        prompt = prompt.replace(placeholder, text)
+
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an assistant who perfectly summarizes scientific paper, and gives the core idea of the paper "
+                "to the user."
+            ),
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_tldr(paper: ArxivPaper, llm: BaseLLMClient) -> str:
+    """
+    Generate TLDR summary for a paper.
+
+    Args:
+        paper: ArxivPaper to summarize
+        llm: LLM instance for generation
+
+    Returns:
+        TLDR summary string
+    """
+    return llm.chat_completion(messages=build_tldr_messages(paper, get_llm_lang(llm)))
+
+
+def parse_paper_affiliations(paper: ArxivPaper) -> List[str]:
+    """
+    Extract author affiliations from the LaTeX affiliation macros, without an LLM.
+
+    Args:
+        paper: ArxivPaper to analyze
+
+    Returns:
+        List of top-level affiliations, empty if none could be parsed
+    """
+    return parse_affiliations(extract_author_block(paper))
+
+
+def count_declared_affiliations(paper: ArxivPaper) -> int:
+    """
+    Count the affiliations a paper declares with LaTeX macros, without an LLM.
+
+    Args:
+        paper: ArxivPaper to analyze
+
+    Returns:
+        Number of affiliation declarations, 0 if any could not be parsed
+    """
+    return len(parse_declared_affiliations(extract_author_block(paper)))
+
+
+def build_affiliation_messages(paper: ArxivPaper) -> Optional[List[Dict[str, str]]]:
+    """
+    Build the chat messages asking for the affiliations of a paper's authors.
+
+    Args:
+        paper: ArxivPaper to analyze
+
+    Returns:
+        Chat messages or None if the paper has no author information
+    """
+    information_region = extract_author_block(paper)
+    if information_region is None:
+        return None
+    prompt = (
+        "Given the author information of a paper in latex format, extract the affiliations of the authors in a "
+        "python list format, which is sorted by the author order. If there is no affiliation found, return an empty "
+        "list '[]'. Following is the author information:\n"
+    )
+    prompt += truncate_to_tokens(information_region, MAX_PROMPT_TOKENS - count_tokens(prompt))
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an assistant who perfectly extracts affiliations of authors from the author information of a "
+                "paper. You should return a python list of affiliations sorted by the author order, like "
+                "['TsingHua University','Peking University']. If an affiliation is consisted of multi-level "
+                "affiliations, like 'Department of Computer Science, TsingHua University', you should return the "
+                "top-level affiliation 'TsingHua University' only. Do not contain duplicated affiliations. If there is "
+                "no affiliation found, you should return an empty list [ ]. You should only return the final list of "
+                "affiliations, and do not return any intermediate results."
+            ),
+        },
+        {"role": "user", "content": prompt},
+    ]
 
 
 def extract_affiliations(paper: ArxivPaper, llm) -> Optional[List[str]]:
     """
     Extract author affiliations from paper.
 
+    The rule-based parser is tried first; the LLM is only asked when it finds nothing.
+
     Args:
         paper: ArxivPaper to analyze
         llm: LLM instance for extraction
@@ -207,47 +368,17 @@ def extract_affiliations(paper: ArxivPaper, llm) -> Optional[List[str]]:
     Returns:
         List of affiliations or None if extraction fails
     """
-    # First try to get tex content from paper.tex, then fall back to extract_tex_content
-    tex_content = paper.tex
-    if tex_content is None:
-        tex_content = extract_tex_content(paper)
-        # If we got content from extract_tex_content, store it in paper.tex for future use
-        if tex_content is not None:
-            paper.tex = tex_content
-
-    if tex_content is not None:
-        content = tex_content.get("all")
-        if content is None:
-            content = "\n".join(tex_content.values())
-        # search for affiliations
-        possible_regions = [r"\\author.*?\\maketitle", r"\\begin{document}.*?\\begin{abstract}"]
-        matches = [re.search(p, content, flags=re.DOTALL) for p in possible_regions]
-        match = next((m for m in matches if m), None)
-        if match:
-            information_region = match.group(0)
-        else:
-            logger.debug(f"Failed to extract affiliations of {paper.arxiv_id}: No author information found.")
-            return None
-        prompt = f"Given the author information of a paper in latex format, extract the affiliations of the authors in a python list format, which is sorted by the author order. If there is no affiliation found, return an empty list '[]'. Following is the author information:\n{information_region}"
-        # use gpt-4o tokenizer for estimation
-        enc = tiktoken.encoding_for_model("gpt-4o")
-        prompt_tokens = enc.encode(prompt)
-        prompt_tokens = prompt_tokens[:4000]  # truncate to 4000 tokens
-        prompt = enc.decode(prompt_tokens)
-        affiliations = llm.chat_completion(
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an assistant who perfectly extracts affiliations of authors from the author information of a paper. You should return a python list of affiliations sorted by the author order, like ['TsingHua University','Peking University']. If an affiliation is consisted of multi-level affiliations, like 'Department of Computer Science, TsingHua University', you should return the top-level affiliation 'TsingHua University' only. Do not contain duplicated affiliations. If there is no affiliation found, you should return an empty list [ ]. You should only return the final list of affiliations, and do not return any intermediate results.",
-                },
-                {"role": "user", "content": prompt},
-            ]
-        )
+    parsed = parse_paper_affiliations(paper)
+    if parsed:
+        return parsed
+    messages = build_affiliation_messages(paper)
+    if messages is not None:
+        affiliations = llm.chat_completion(messages=messages)
 
         try:
             affiliations = re.search(r"\[.*?\]", affiliations, flags=re.DOTALL).group(0)
             affiliations = eval(affiliations)
-            affiliations = list(set(affiliations))
+            affiliations = list(dict.fromkeys(affiliations))
             affiliations = [str(a) for a in affiliations]
         except Exception as e:
             logger.debug(f"Failed to extract affiliations of {paper.arxiv_id}: {e}")
@@ -255,34 +386,117 @@ def extract_affiliations(paper: ArxivPaper, llm) -> Optional[List[str]]:
         return affiliations
 
 
-def get_code_url(paper: ArxivPaper) -> Optional[str]:
+class PaperInsights(BaseModel):
+    """Structured result of the combined TLDR and affiliation extraction."""
+
+    tldr: str = Field(min_length=1)
+    affiliations: List[str] = Field(default_factory=list)
+
+
+def build_insights_messages(paper: ArxivPaper, lang: str = "English") -> List[Dict[str, str]]:
     """
-    Find code repository URL for a paper.
+    Build the chat messages asking for the TLDR and affiliations of a paper as one JSON object.
 
     Args:
-        paper: ArxivPaper to search for
+        paper: ArxivPaper to analyze
+        lang: Language of the summary
 
     Returns:
-        Code repository URL or None if not found
+        Chat messages
     """
-    s = requests.Session()
-    retries = Retry(total=5, backoff_factor=0.1)
-    s.mount("https://", HTTPAdapter(max_retries=retries))
-    try:
-        paper_list = s.get(f"https://paperswithcode.com/api/v1/papers/?arxiv_id={paper.arxiv_id}").json()
-    except Exception as e:
-        logger.debug(f"Error when searching {paper.arxiv_id}: {e}")
-        return None
+    introduction = ""
+    conclusion = ""
+    tex_content = load_tex(paper)
+    if tex_content is not None:
+        introduction, conclusion = _extract_intro_conclusion(_tex_body(tex_content))
+    author_block = extract_author_block(paper) or ""
 
-    if paper_list.get("count", 0) == 0:
-        return None
-    paper_id = paper_list["results"][0]["id"]
+    prompt = (
+        "Given the title, abstract, author information, introduction and the conclusion (if any) of a paper "
+        "in latex format, return a JSON object with two keys:\n"
+        '    "tldr": a one-sentence TLDR summary of the paper in __LANG__;\n'
+        '    "affiliations": a list of the top-level affiliations of the authors sorted by the author order, '
+        "without duplicates. For a multi-level affiliation like 'Department of Computer Science, TsingHua University', "
+        "only keep 'TsingHua University'. Use an empty list if no affiliation is found.\n"
+        "    Only return the JSON object.\n"
+        "\n"
+        "    \\title{__TITLE__}\n"
+        "    \\begin{abstract}__ABSTRACT__\\end{abstract}\n"
+        "    __AUTHORS__\n"
+        "    __INTRODUCTION__\n"
+        "    __CONCLUSION__\n"
+        "    "
+    )
+    prompt = prompt.replace("__LANG__", lang)
+
+    # the author block is kept ahead of the paper body, which is trimmed from the conclusion backwards
+    sections = fit_sections(
+        {
+            "__TITLE__": paper.title,
+            "__ABSTRACT__": paper.summary,
+            "__AUTHORS__": author_block,
+            "__INTRODUCTION__": introduction,
+            "__CONCLUSION__": conclusion,
+        },
+        MAX_PROMPT_TOKENS - count_tokens(prompt),
+    )
+    for placeholder, text in sections.items():
+        prompt = prompt.replace(placeholder, text)
+
+    return [
+        {
+            "role": "system",
+            "content": (
+                "You are an assistant who perfectly summarizes scientific papers and extracts the affiliations of "
+                "their authors. You always answer with a single valid JSON object."
+            ),
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def generate_tldr_and_affiliations(paper: ArxivPaper, llm: BaseLLMClient) -> Optional[PaperInsights]:
+    """
+    Generate the TLDR and extract affiliations of a paper with a single LLM call.
+
+    The model is asked for a JSON object which is validated against PaperInsights.
+    Callers should fall back to ``generate_tldr`` and ``extract_affiliations``
+    when None is returned.
+
+    Args:
+        paper: ArxivPaper to analyze
+        llm: LLM instance for generation
+
+    Returns:
+        PaperInsights or None if the response could not be parsed
+    """
+    response = llm.chat_completion(messages=build_insights_messages(paper, get_llm_lang(llm)))
 
     try:
-        repo_list = s.get(f"https://paperswithcode.com/api/v1/papers/{paper_id}/repositories/").json()
-    except Exception as e:
-        logger.debug(f"Error when searching {paper.arxiv_id}: {e}")
+        match = re.search(r"\{.*\}", str(response), flags=re.DOTALL)
+        insights = PaperInsights.model_validate_json(match.group(0))
+    except (AttributeError, ValidationError) as e:
+        logger.debug(f"Failed to parse combined extraction of {paper.arxiv_id}: {e}")
         return None
-    if repo_list.get("count", 0) == 0:
-        return None
-    return repo_list["results"][0]["url"]
+
+    # deduplicate while preserving the author order; without author information any affiliation is a guess
+    has_authors = bool(extract_author_block(paper))
+    affiliations = [a.strip() for a in insights.affiliations if a.strip()] if has_authors else []
+    insights.affiliations = list(dict.fromkeys(affiliations))
+    return insights
+
+
+def get_code_url(paper: ArxivPaper) -> Optional[str]:
+    """
+    Find code repository URL for a paper.
+
+    Links in the abstract and cached LaTeX source are used when present; the
+    paperswithcode lookup is only a fallback.
+
+    Args:
+        paper: ArxivPaper to search for
+
+    Returns:
+        Code repository URL or None if not found
+    """
+    return find_code_url(paper) or get_code_url_resolver().resolve(paper.arxiv_id)
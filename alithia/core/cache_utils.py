@@ -0,0 +1,38 @@
+"""
+Helpers for locating Alithia's on-disk caches.
+"""
+
+import os
+import re
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    Get (and create) a directory under the Alithia cache root.
+
+    The root defaults to ``~/.cache/alithia`` and can be overridden with the
+    ``ALITHIA_CACHE_DIR`` environment variable.
+
+    Args:
+        *parts: Sub-directory components below the cache root
+
+    Returns:
+        Absolute path of the cache directory
+    """
+    root = os.environ.get("ALITHIA_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "alithia")
+    path = os.path.abspath(os.path.join(root, *parts))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def safe_filename(key: str) -> str:
+    """
+    Turn an identifier such as an old-style arXiv id (``hep-th/9901001``) into a file name.
+
+    Args:
+        key: Identifier to convert
+
+    Returns:
+        File-system safe name
+    """
+    return re.sub(r"[^A-Za-z0-9._-]", "_", key)
@@ -0,0 +1,101 @@
+"""
+Adaptive-depth cascade reranking: cross-encode bi-encoder hits in rounds and stop once the top k is settled.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .embedding import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class CascadeRanker:
+    """
+    Rerank bi-encoder hits with a cross-encoder, only as deep as needed.
+
+    Candidates are cross-encoded in rounds, in bi-encoder order. After each
+    round a linear fit of cross-encoder on bi-encoder scores predicts how well
+    the best remaining candidate could score, padded by the fit's largest
+    residual plus ``margin`` standard deviations of the cross-encoder scores.
+    Once the k-th best cross-encoder score so far beats that bound, the
+    remaining candidates cannot plausibly enter the top k and the cascade
+    stops. Easy queries (a clear bi-encoder gap, or cross-encoder scores that
+    agree with the bi-encoder) stop early; hard ones go to full depth.
+    """
+
+    def __init__(
+        self,
+        service: EmbeddingService,
+        round_size: int = 8,
+        min_depth: Optional[int] = None,
+        margin: float = 0.5,
+    ) -> None:
+        self.service = service
+        self.round_size = max(1, round_size)
+        self.min_depth = min_depth
+        self.margin = margin
+        self.history: List[Dict[str, int]] = []
+
+    def _settled(self, bi: np.ndarray, cross: np.ndarray, depth: int, top_k: int) -> bool:
+        if depth >= len(bi):
+            return True
+        if depth < max(top_k, self.min_depth or self.round_size, 3):
+            return False
+        x, y = bi[:depth], cross[:depth]
+        if np.ptp(x) <= 0:
+            return False
+        slope, intercept = np.polyfit(x, y, 1)
+        if slope < 0:
+            # The bi-encoder order says nothing about cross-encoder scores here
+            return False
+        residual = float(np.max(np.abs(y - (slope * x + intercept))))
+        bound = slope * bi[depth] + intercept + residual + self.margin * float(np.std(y))
+        kth_best = np.partition(y, len(y) - top_k)[len(y) - top_k]
+        return bool(kth_best >= bound)
+
+    def rerank(
+        self, query: str, candidates: List[Dict[str, Any]], top_k: int = 8, score_key: str = "score"
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank candidates, cross-encoding only as many as needed to settle the top k.
+
+        Args:
+            query: Query text
+            candidates: Candidates with a ``text`` and a bi-encoder score
+            top_k: Number of results to return
+            score_key: Key of the bi-encoder score in each candidate
+
+        Returns:
+            Top candidates by cross-encoder score, with ``rerank_score`` added
+        """
+        if not candidates or top_k <= 0:
+            return []
+        order = sorted(range(len(candidates)), key=lambda i: -float(candidates[i].get(score_key) or 0.0))
+        ordered = [candidates[i] for i in order]
+        bi = np.array([float(c.get(score_key) or 0.0) for c in ordered], dtype=np.float64)
+        texts = [c.get("text", "") for c in ordered]
+        top_k = min(top_k, len(ordered))
+
+        cross = np.empty(0, dtype=np.float64)
+        depth = 0
+        while depth < len(ordered):
+            # The first round covers the top k so there is something to settle
+            step = max(self.round_size, top_k - depth) if depth == 0 else self.round_size
+            batch = texts[depth : depth + step]
+            cross = np.concatenate([cross, self.service.score_pairs(query, batch).astype(np.float64)])
+            depth += len(batch)
+            if self._settled(bi, cross, depth, top_k):
+                break
+
+        self.history.append({"candidates": len(ordered), "depth": depth})
+        logger.debug(f"Cascade rerank scored {depth}/{len(ordered)} candidates")
+        top = np.argsort(-cross, kind="stable")[:top_k]
+        return [dict(ordered[i], rerank_score=float(cross[i])) for i in top]
+
+    @property
+    def last_depth(self) -> Optional[int]:
+        """Number of candidates cross-encoded by the last rerank."""
+        return self.history[-1]["depth"] if self.history else None
@@ -0,0 +1,139 @@
+"""
+Offline extraction of code repository links from paper abstracts and LaTeX sources.
+"""
+
+import re
+from typing import Dict, List, Mapping, Optional
+
+from pydantic import BaseModel
+
+from .paper import ArxivPaper
+from .tex_cache import LazyTex
+
+_URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?(github\.com|gitlab\.com|huggingface\.co|bitbucket\.org|codeberg\.org)"
+    r"/[^\s{}<>\"'\\|^`]+",
+    re.I,
+)
+
+# Wording before a link that marks it as the paper's own code
+_CODE_CONTEXT_PATTERN = re.compile(
+    r"\b(our|code|codes|implementation|available|released?|open[- ]sourced?|project page|repository)\b", re.I
+)
+
+# Widely cited framework repositories that are never a paper's own code
+_FRAMEWORK_REPOS = {
+    "github.com/pytorch/pytorch",
+    "github.com/tensorflow/tensorflow",
+    "github.com/huggingface/transformers",
+    "github.com/huggingface/diffusers",
+    "github.com/google/jax",
+    "github.com/scikit-learn/scikit-learn",
+}
+
+_HOST_WEIGHTS = {"github.com": 3.0, "gitlab.com": 3.0, "huggingface.co": 2.0, "bitbucket.org": 2.0, "codeberg.org": 2.0}
+
+# Characters before a link to consider when scoring its context, cut at the previous sentence
+_CONTEXT_WINDOW = 100
+
+
+class CodeLinkCandidate(BaseModel):
+    """Repository link found in a paper, with the score used for ranking."""
+
+    url: str
+    score: float
+    position: int
+
+
+def _unescape_tex(text: str) -> str:
+    text = re.sub(r"\\([_#%&~$])", r"\1", text)
+    return text.replace("\\textasciitilde{}", "~").replace("\\string", "")
+
+
+def _normalize(host: str, url: str) -> Optional[str]:
+    path = re.sub(r"^(?:https?://)?(?:www\.)?[^/]+/", "", url).rstrip(".,;:)]}")
+    parts = [p for p in path.split("/") if p]
+    if host == "huggingface.co":
+        # Spaces, datasets and models all live under owner/name, spaces and datasets with a prefix
+        depth = 3 if parts and parts[0] in ("spaces", "datasets") else 2
+    elif host == "gitlab.com":
+        if "-" in parts:
+            parts = parts[: parts.index("-")]
+        depth = len(parts)
+    else:
+        depth = 2
+    if len(parts) < depth or depth < 2:
+        return None
+    repo = "/".join(parts[:depth])
+    repo = re.sub(r"\.git$", "", repo)
+    return f"https://{host}/{repo}"
+
+
+def extract_code_links(text: str, source_weight: float = 0.0) -> List[CodeLinkCandidate]:
+    """
+    Find repository links in a text and score them.
+
+    Args:
+        text: Abstract or LaTeX source to scan
+        source_weight: Score bonus for links from this text (e.g. the abstract)
+
+    Returns:
+        Candidates in order of appearance, one per repository
+    """
+    if not text:
+        return []
+    text = _unescape_tex(text)
+    candidates: Dict[str, CodeLinkCandidate] = {}
+    for match in _URL_PATTERN.finditer(text):
+        host = match.group(1).lower()
+        url = _normalize(host, match.group(0))
+        if url is None or url.split("://", 1)[1].lower() in _FRAMEWORK_REPOS:
+            continue
+        context = re.split(r"\.\s|\n\s*\n", text[max(0, match.start() - _CONTEXT_WINDOW) : match.start()])[-1]
+        score = _HOST_WEIGHTS.get(host, 1.0) + source_weight
+        if _CODE_CONTEXT_PATTERN.search(context):
+            score += 2.0
+        if url in candidates:
+            # Repeated mentions are more likely the paper's own repository
+            candidates[url].score = max(candidates[url].score, score) + 0.5
+        else:
+            candidates[url] = CodeLinkCandidate(url=url, score=score, position=match.start())
+    return list(candidates.values())
+
+
+def find_code_url(paper: ArxivPaper, tex: Optional[Mapping[str, Optional[str]]] = None) -> Optional[str]:
+    """
+    Find the code repository of a paper from its abstract and LaTeX source, without network access.
+
+    Links in the abstract are always accepted. Links in the source are only
+    accepted with code-related wording around them, since sources also link
+    to the code of related work.
+
+    Args:
+        paper: ArxivPaper to search
+        tex: Extracted LaTeX content; defaults to ``paper.tex`` or the on-disk source cache
+
+    Returns:
+        Best ranked repository URL or None if no link qualifies
+    """
+    candidates = extract_code_links(paper.summary or "", source_weight=3.0)
+
+    if tex is None:
+        tex = paper.tex if paper.tex is not None else (LazyTex.open(paper.arxiv_id) if paper.arxiv_id else None)
+    if tex is not None:
+        try:
+            source = tex.get("all") or ""
+        finally:
+            if isinstance(tex, LazyTex) and tex is not paper.tex:
+                tex.release()
+        known = {c.url for c in candidates}
+        for candidate in extract_code_links(source):
+            if candidate.url in known:
+                next(c for c in candidates if c.url == candidate.url).score += 1.0
+            elif candidate.score >= _HOST_WEIGHTS.get(candidate.url.split("/")[2], 1.0) + 2.0:
+                candidates.append(candidate)
+
+    if not candidates:
+        return None
+    best = max(candidates, key=lambda c: (c.score, -c.position))
+    return best.url
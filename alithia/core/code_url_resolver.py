@@ -0,0 +1,177 @@
+"""
+Resolution of paper code repositories through the paperswithcode API.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+PAPERSWITHCODE_API = "https://paperswithcode.com/api/v1"
+
+# Sentinel distinguishing "no cached result" from a cached negative result
+_MISSING = object()
+
+
+class CodeURLResolver:
+    """
+    Concurrent, cached lookup of code repository URLs by arxiv_id.
+
+    All requests share one pooled session with short timeouts and a single
+    retry, so a failing host cannot stall a paper for long. Found URLs and
+    confirmed absences are cached with separate TTLs; lookup errors are not
+    cached.
+    """
+
+    def __init__(
+        self,
+        base_url: str = PAPERSWITHCODE_API,
+        max_workers: int = 8,
+        request_timeout: float = 10.0,
+        positive_ttl_seconds: float = 30 * 86400,
+        negative_ttl_seconds: float = 3 * 86400,
+        cache_path: Optional[str] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.request_timeout = request_timeout
+        self.positive_ttl_seconds = positive_ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.cache_path = cache_path
+        self.stats: Dict[str, int] = {"cache_hits": 0, "lookups": 0, "errors": 0, "timeouts": 0}
+
+        self.session = requests.Session()
+        retries = Retry(total=1, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.cache_path or os.path.join(get_cache_dir("code_urls"), "code_urls.sqlite3")
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS code_urls (arxiv_id TEXT PRIMARY KEY, url TEXT, checked_at REAL NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _record(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _cached(self, arxiv_id: str) -> object:
+        # Cached URL, None for a cached absence, or _MISSING if nothing fresh is cached
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT url, checked_at FROM code_urls WHERE arxiv_id = ?", (arxiv_id,)).fetchone()
+        if row is None:
+            return _MISSING
+        url, checked_at = row
+        ttl = self.positive_ttl_seconds if url else self.negative_ttl_seconds
+        return url if time.time() - checked_at <= ttl else _MISSING
+
+    def _store(self, arxiv_id: str, url: Optional[str]) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO code_urls (arxiv_id, url, checked_at) VALUES (?, ?, ?)",
+                (arxiv_id, url, time.time()),
+            )
+            conn.commit()
+
+    def _get_json(self, path: str) -> dict:
+        response = self.session.get(f"{self.base_url}{path}", timeout=self.request_timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _lookup(self, arxiv_id: str) -> Optional[str]:
+        self._record("lookups")
+        paper_list = self._get_json(f"/papers/?arxiv_id={arxiv_id}")
+        if paper_list.get("count", 0) == 0:
+            return None
+        paper_id = paper_list["results"][0]["id"]
+        repo_list = self._get_json(f"/papers/{paper_id}/repositories/")
+        if repo_list.get("count", 0) == 0:
+            return None
+        return repo_list["results"][0]["url"]
+
+    def resolve(self, arxiv_id: str) -> Optional[str]:
+        """
+        Find the code repository URL of a paper.
+
+        Args:
+            arxiv_id: ArXiv ID of the paper
+
+        Returns:
+            Code repository URL or None if not found or the lookup failed
+        """
+        try:
+            cached = self._cached(arxiv_id)
+        except sqlite3.Error as e:
+            logger.warning(f"Code URL cache lookup failed: {e}")
+            cached = _MISSING
+        if cached is not _MISSING:
+            self._record("cache_hits")
+            return cached
+
+        try:
+            url = self._lookup(arxiv_id)
+        except Exception as e:
+            self._record("errors")
+            logger.debug(f"Error when searching {arxiv_id}: {e}")
+            return None
+        try:
+            self._store(arxiv_id, url)
+        except sqlite3.Error as e:
+            logger.warning(f"Code URL cache store failed: {e}")
+        return url
+
+    def resolve_many(self, arxiv_ids: Iterable[str], deadline: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Find the code repository URLs of many papers concurrently.
+
+        Args:
+            arxiv_ids: ArXiv IDs of the papers
+            deadline: Seconds to wait for all lookups, None to wait until they finish
+
+        Returns:
+            Mapping of arxiv_id to URL (or None) for the papers resolved before the deadline
+        """
+        arxiv_ids = list(dict.fromkeys(a for a in arxiv_ids if a))
+        if not arxiv_ids:
+            return {}
+        pool = ThreadPoolExecutor(max_workers=min(self.max_workers, len(arxiv_ids)), thread_name_prefix="code-url")
+        try:
+            futures = {pool.submit(self.resolve, arxiv_id): arxiv_id for arxiv_id in arxiv_ids}
+            done, pending = wait(futures, timeout=deadline)
+        finally:
+            # Lookups still running after the deadline are abandoned; their request timeouts bound them
+            pool.shutdown(wait=False, cancel_futures=True)
+        if pending:
+            with self._lock:
+                self.stats["timeouts"] += len(pending)
+            logger.warning(f"Code URL lookup of {len(pending)} papers did not finish in {deadline}s")
+        return {futures[f]: f.result() for f in done}
+
+
+@lru_cache(maxsize=1)
+def get_code_url_resolver() -> CodeURLResolver:
+    """Get the process-wide code URL resolver."""
+    return CodeURLResolver()
@@ -0,0 +1,272 @@
+"""
+Delivery of email digests over a persistent SMTP connection.
+"""
+
+import logging
+import smtplib
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .email_utils import build_email_message
+from .researcher import EmailConnection
+
+logger = logging.getLogger(__name__)
+
+# Reply codes with which servers signal that the client is sending too fast
+_RATE_LIMIT_CODES = {421, 450, 451, 452}
+
+
+class OutgoingEmail(BaseModel):
+    """A single message waiting for delivery."""
+
+    id: Optional[str] = None
+    receiver: str
+    subject: str
+    html_content: str
+
+
+class DeliveryReport(BaseModel):
+    """Outcome and throughput of a delivery run."""
+
+    sent: int = 0
+    failed: int = 0
+    reconnects: int = 0
+    rate_limited: int = 0
+    elapsed_seconds: float = 0.0
+    failures: Dict[str, str] = Field(default_factory=dict)
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.sent / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def _reply_code(error: smtplib.SMTPException) -> Optional[int]:
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code
+    if isinstance(error, smtplib.SMTPRecipientsRefused) and error.recipients:
+        return next(iter(error.recipients.values()))[0]
+    return None
+
+
+class SMTPSender:
+    """
+    Queue of outgoing emails delivered over one authenticated SMTP connection.
+
+    The connection is opened on the first message and reused until the queue
+    is drained or ``max_messages_per_connection`` is reached. Temporary
+    failures (4xx replies, dropped connections) are retried with exponential
+    backoff after reconnecting when needed; permanent failures (5xx replies)
+    are recorded and the remaining messages are still sent.
+    """
+
+    def __init__(
+        self,
+        smtp_server: str,
+        smtp_port: int,
+        sender: str,
+        password: str,
+        security: str = "auto",
+        max_messages_per_connection: int = 100,
+        min_interval: float = 0.0,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        timeout: float = 30.0,
+    ) -> None:
+        if security not in ("auto", "starttls", "ssl", "none"):
+            raise ValueError(f"Unknown SMTP security mode: {security}")
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.sender = sender
+        self.password = password
+        self.security = security
+        self.max_messages_per_connection = max(1, max_messages_per_connection)
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._server: Optional[smtplib.SMTP] = None
+        self._sent_on_connection = 0
+        self._last_sent: Optional[float] = None
+        self._queue: Deque[OutgoingEmail] = deque()
+
+    @classmethod
+    def from_connection(cls, conn: EmailConnection, **kwargs) -> "SMTPSender":
+        """
+        Create a sender from an email connection.
+
+        Args:
+            conn: EmailConnection instance
+            **kwargs: Extra SMTPSender options
+
+        Returns:
+            SMTPSender instance
+
+        Raises:
+            ValueError: If the sender, password, SMTP server or port is not configured
+        """
+        if not conn.sender or not conn.sender_password or not conn.smtp_server or not conn.smtp_port:
+            raise ValueError("Email configuration is not set correctly")
+        return cls(conn.smtp_server, conn.smtp_port, conn.sender, conn.sender_password, **kwargs)
+
+    def _open(self) -> smtplib.SMTP:
+        if self.security == "ssl":
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=self.timeout)
+            server.ehlo()
+            return server
+        server = None
+        try:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+            server.ehlo()
+            if self.security in ("auto", "starttls"):
+                server.starttls()
+                server.ehlo()
+        except Exception as e:
+            if server is not None:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+            if self.security != "auto":
+                raise
+            # Ports such as 465 expect TLS from the first byte
+            try:
+                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=self.timeout)
+                server.ehlo()
+            except Exception as ssl_error:
+                raise smtplib.SMTPConnectError(
+                    -1, f"Failed to connect to SMTP server: {e} (TLS) and {ssl_error} (SSL)"
+                ) from ssl_error
+        return server
+
+    def connect(self) -> None:
+        """Open and authenticate the connection if it is not open yet."""
+        if self._server is not None:
+            return
+        server = self._open()
+        try:
+            if self.password:
+                server.login(self.sender, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._sent_on_connection = 0
+
+    def close(self) -> None:
+        """Close the connection, ignoring errors from servers that already dropped it."""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server = None
+
+    def __enter__(self) -> "SMTPSender":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def enqueue(self, email: OutgoingEmail) -> None:
+        """
+        Add an email to the delivery queue.
+
+        Args:
+            email: Email to send
+        """
+        self._queue.append(email)
+
+    def _pace(self) -> None:
+        if self.min_interval > 0 and self._last_sent is not None:
+            delay = self._last_sent + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _deliver(self, email: OutgoingEmail, report: DeliveryReport) -> None:
+        msg = build_email_message(self.sender, email.receiver, email.subject, email.html_content).as_string()
+        attempt = 0
+        while True:
+            if self._server is not None and self._sent_on_connection >= self.max_messages_per_connection:
+                self.close()
+            if self._server is None:
+                if report.sent or report.failed or attempt:
+                    report.reconnects += 1
+                self.connect()
+            self._pace()
+            try:
+                self._server.sendmail(self.sender, [email.receiver], msg)
+                self._sent_on_connection += 1
+                self._last_sent = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                code = _reply_code(e)
+                if code is not None and code >= 500:
+                    raise
+                if code in _RATE_LIMIT_CODES:
+                    report.rate_limited += 1
+                # smtplib closes the socket on 421; other replies leave it usable
+                if code is None or code == 421:
+                    self._server = None
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"Temporary SMTP failure for {email.receiver} ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def send_all(self) -> DeliveryReport:
+        """
+        Send all queued emails over the shared connection.
+
+        Returns:
+            DeliveryReport with counts, failures by email id (or receiver) and throughput
+        """
+        report = DeliveryReport()
+        start = time.perf_counter()
+        try:
+            while self._queue:
+                email = self._queue.popleft()
+                try:
+                    self._deliver(email, report)
+                    report.sent += 1
+                except (smtplib.SMTPException, OSError) as e:
+                    report.failed += 1
+                    report.failures[email.id or email.receiver] = str(e)
+                    logger.error(f"Failed to send email to {email.receiver}: {e}")
+                    if isinstance(e, (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError)):
+                        # Every remaining message would fail the same way
+                        for remaining in self._queue:
+                            report.failed += 1
+                            report.failures[remaining.id or remaining.receiver] = str(e)
+                        self._queue.clear()
+        finally:
+            self.close()
+            report.elapsed_seconds = time.perf_counter() - start
+        logger.info(
+            f"Delivered {report.sent}/{report.sent + report.failed} emails in {report.elapsed_seconds:.2f}s "
+            f"({report.messages_per_second:.1f} msg/s, {report.reconnects} reconnects, "
+            f"{report.rate_limited} rate limited)"
+        )
+        return report
+
+    def send(self, emails: List[OutgoingEmail]) -> DeliveryReport:
+        """
+        Queue emails and send them all.
+
+        Args:
+            emails: Emails to send
+
+        Returns:
+            DeliveryReport of the run
+        """
+        for email in emails:
+            self.enqueue(email)
+        return self.send_all()
@@ -0,0 +1,204 @@
+"""
+Durable on-disk outbox decoupling digest generation from SMTP delivery.
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from .cache_utils import get_cache_dir
+from .email_delivery import DeliveryReport, OutgoingEmail, SMTPSender
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEntry(BaseModel):
+    """A spooled email with its delivery attempts."""
+
+    id: str
+    receiver: str
+    subject: str
+    html_content: str
+    created_at: float = Field(default_factory=time.time)
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    last_error: Optional[str] = None
+
+
+class EmailOutbox:
+    """
+    Spool of finished emails, one JSON file per message.
+
+    Entries live in ``pending/`` until delivered, when they are removed. A
+    drain claims due entries by moving them to ``sending/``, so concurrent
+    drains never send the same entry. The claim time is part of the claimed
+    file's name, so it is set atomically with the claim; entries left there by
+    a crashed drain are returned to ``pending/`` ``stale_seconds`` after it. Entries that fail
+    ``max_attempts`` times are moved to ``dead/`` for inspection.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_attempts: int = 8,
+        backoff_seconds: float = 300.0,
+        max_backoff_seconds: float = 6 * 3600,
+        stale_seconds: float = 3600.0,
+    ) -> None:
+        self.path = path or get_cache_dir("outbox")
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.stale_seconds = stale_seconds
+        for name in ("pending", "sending", "dead"):
+            os.makedirs(os.path.join(self.path, name), exist_ok=True)
+
+    def _file(self, state: str, entry_id: str) -> str:
+        return os.path.join(self.path, state, f"{entry_id}.json")
+
+    def _write(self, state: str, entry: OutboxEntry) -> None:
+        # Write then rename, so a crash never leaves a truncated entry behind
+        target = self._file(state, entry.id)
+        tmp = f"{target}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(entry.model_dump_json())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+
+    def _read(self, file_path: str) -> Optional[OutboxEntry]:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return OutboxEntry(**json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable outbox entry {file_path}: {e}")
+            return None
+
+    def _list(self, state: str) -> List[OutboxEntry]:
+        directory = os.path.join(self.path, state)
+        entries = [
+            self._read(os.path.join(directory, name))
+            for name in sorted(os.listdir(directory))
+            if name.endswith(".json")
+        ]
+        return [e for e in entries if e is not None]
+
+    def spool(self, emails: Iterable[OutgoingEmail]) -> List[str]:
+        """
+        Durably store emails for delivery.
+
+        Args:
+            emails: Emails to deliver
+
+        Returns:
+            IDs of the spooled entries
+        """
+        ids = []
+        for email in emails:
+            # Time-ordered names keep delivery in spooling order
+            entry_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+            entry = OutboxEntry(
+                id=entry_id, receiver=email.receiver, subject=email.subject, html_content=email.html_content
+            )
+            self._write("pending", entry)
+            ids.append(entry_id)
+        return ids
+
+    def pending(self) -> List[OutboxEntry]:
+        """Get all entries waiting for delivery, in spooling order."""
+        return self._list("pending")
+
+    def dead(self) -> List[OutboxEntry]:
+        """Get all entries that exhausted their delivery attempts."""
+        return self._list("dead")
+
+    def _recover_stale(self, now: float) -> None:
+        directory = os.path.join(self.path, "sending")
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            file_path = os.path.join(directory, name)
+            entry_id, _, claimed_ns = name[: -len(".json")].partition("@")
+            try:
+                # Claims from before claim times were recorded in the name fall back to the mtime
+                claimed_at = int(claimed_ns) / 1e9 if claimed_ns else os.path.getmtime(file_path)
+                if now - claimed_at > self.stale_seconds:
+                    os.replace(file_path, self._file("pending", entry_id))
+            except (OSError, ValueError):
+                continue
+
+    def _claim(self, entry: OutboxEntry) -> Optional[str]:
+        # The rename both claims the entry and records when, so recovery never sees an old claim time
+        claimed = os.path.join(self.path, "sending", f"{entry.id}@{time.time_ns()}.json")
+        try:
+            os.replace(self._file("pending", entry.id), claimed)
+            return claimed
+        except FileNotFoundError:
+            return None
+
+    def drain(self, sender: SMTPSender, limit: Optional[int] = None) -> DeliveryReport:
+        """
+        Send the due entries over one connection.
+
+        Delivered entries are removed; failed ones are rescheduled with
+        exponential backoff or moved to ``dead/`` after the last attempt.
+
+        Args:
+            sender: SMTPSender used for delivery
+            limit: Maximum number of entries to send, None for all due entries
+
+        Returns:
+            DeliveryReport of the drain
+        """
+        now = time.time()
+        self._recover_stale(now)
+        claimed = {}
+        claimed_files = {}
+        for entry in self.pending():
+            if limit is not None and len(claimed) >= limit:
+                break
+            claimed_file = self._claim(entry) if entry.next_attempt_at <= now else None
+            if claimed_file is not None:
+                claimed[entry.id] = entry
+                claimed_files[entry.id] = claimed_file
+                sender.enqueue(
+                    OutgoingEmail(
+                        id=entry.id, receiver=entry.receiver, subject=entry.subject, html_content=entry.html_content
+                    )
+                )
+        if not claimed:
+            return DeliveryReport()
+
+        try:
+            report = sender.send_all()
+        except Exception as e:
+            # Reschedule everything claimed rather than leaving it to the stale-claim recovery
+            report = DeliveryReport(failed=len(claimed), failures={entry_id: str(e) for entry_id in claimed})
+        for entry_id, entry in claimed.items():
+            error = report.failures.get(entry_id)
+            if error is None:
+                os.remove(claimed_files[entry_id])
+                continue
+            entry.attempts += 1
+            entry.last_error = error
+            if entry.attempts >= self.max_attempts:
+                logger.error(f"Giving up on email to {entry.receiver} after {entry.attempts} attempts: {error}")
+                self._write("dead", entry)
+            else:
+                delay = min(self.backoff_seconds * 2 ** (entry.attempts - 1), self.max_backoff_seconds)
+                entry.next_attempt_at = time.time() + delay
+                self._write("pending", entry)
+            os.remove(claimed_files[entry_id])
+        return report
+
+
+@lru_cache(maxsize=None)
+def get_email_outbox(max_attempts: int = 8, backoff_seconds: float = 300.0) -> EmailOutbox:
+    """Get the process-wide outbox stored in the Alithia cache directory."""
+    return EmailOutbox(max_attempts=max_attempts, backoff_seconds=backoff_seconds)
@@ -2,13 +2,19 @@
 Email construction and delivery utilities.
 """
 
+import hashlib
+import json
 import math
 import smtplib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from email.header import Header
 from email.mime.text import MIMEText
 from email.utils import formataddr, parseaddr
-from typing import List
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
 
 from .paper import EmailContent, ScoredPaper
 
@@ -79,6 +85,98 @@ def get_stars_html(score: float) -> str:
         return '<div class="star-wrapper">' + full_star * full_star_num + half_star * half_star_num + "</div>"
 
 
+PAPER_TEMPLATE = """
+    <table border="0" cellpadding="0" cellspacing="0" width="100%"
+        style="font-family: Arial, sans-serif; border: 1px solid #ddd; border-radius: 8px; padding: 16px;
+        background-color: #f9f9f9;">
+    <tr>
+        <td style="font-size: 20px; font-weight: bold; color: #333;">
+            {title}
+        </td>
+    </tr>
+    <tr>
+        <td style="font-size: 14px; color: #666; padding: 8px 0;">
+            {authors}
+            <br>
+            <i>{affiliations}</i>
+        </td>
+    </tr>
+    <tr>
+        <td style="font-size: 14px; color: #333; padding: 8px 0;">
+            <strong>Relevance:</strong> {stars}
+        </td>
+    </tr>
+    <tr>
+        <td style="font-size: 14px; color: #333; padding: 8px 0;">
+            <strong>arXiv ID:</strong> {arxiv_id}
+        </td>
+    </tr>
+    <tr>
+        <td style="font-size: 14px; color: #333; padding: 8px 0;">
+            <strong>TLDR:</strong> {tldr}
+        </td>
+    </tr>
+    <tr>
+        <td style="padding: 8px 0;">
+            <a href="{pdf_url}" style="display: inline-block; text-decoration: none; font-size: 14px; font-weight: bold;
+                color: #fff; background-color: #d9534f; padding: 8px 16px; border-radius: 4px;">PDF</a>
+            {code_link}
+        </td>
+    </tr>
+    </table>
+    """
+
+CODE_LINK_TEMPLATE = (
+    '<a href="{code_url}" style="display: inline-block; text-decoration: none; font-size: 14px; font-weight: bold; '
+    'color: #fff; background-color: #5bc0de; padding: 8px 16px; border-radius: 4px; margin-left: 8px;">Code</a>'
+)
+
+
+class CompiledTemplate:
+    """
+    ``str.format`` template parsed once into literal parts and field names.
+
+    Rendering only joins strings, without re-parsing the template.
+    """
+
+    def __init__(self, template: str) -> None:
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        ]
+
+    def render(self, **values: Any) -> str:
+        """
+        Render the template.
+
+        Args:
+            **values: Values of the template fields
+
+        Returns:
+            Rendered text
+        """
+        out = []
+        for literal, field in self._parts:
+            out.append(literal)
+            if field is not None:
+                out.append(str(values[field]))
+        return "".join(out)
+
+
+_EMAIL = CompiledTemplate(EMAIL_TEMPLATE)
+_PAPER = CompiledTemplate(PAPER_TEMPLATE)
+_CODE_LINK = CompiledTemplate(CODE_LINK_TEMPLATE)
+
+
+def _score_bucket(score: float) -> int:
+    # Scores in the same bucket render the same stars (mirrors get_stars_html)
+    low, high = 6, 8
+    if score <= low:
+        return 0
+    if score >= high:
+        return -1
+    return math.ceil((score - low) / ((high - low) / 10))
+
+
 def create_paper_html(paper: ScoredPaper) -> str:
     """
     Create HTML block for a single paper.
@@ -110,51 +208,105 @@ def create_paper_html(paper: ScoredPaper) -> str:
     # Code link
     code_link = ""
     if paper.paper.code_url:
-        code_link = f'<a href="{paper.paper.code_url}" style="display: inline-block; text-decoration: none; font-size: 14px; font-weight: bold; color: #fff; background-color: #5bc0de; padding: 8px 16px; border-radius: 4px; margin-left: 8px;">Code</a>'
+        code_link = _CODE_LINK.render(code_url=paper.paper.code_url)
 
-    return f"""
-    <table border="0" cellpadding="0" cellspacing="0" width="100%" style="font-family: Arial, sans-serif; border: 1px solid #ddd; border-radius: 8px; padding: 16px; background-color: #f9f9f9;">
-    <tr>
-        <td style="font-size: 20px; font-weight: bold; color: #333;">
-            {paper.paper.title}
-        </td>
-    </tr>
-    <tr>
-        <td style="font-size: 14px; color: #666; padding: 8px 0;">
-            {authors_str}
-            <br>
-            <i>{affiliations_str}</i>
-        </td>
-    </tr>
-    <tr>
-        <td style="font-size: 14px; color: #333; padding: 8px 0;">
-            <strong>Relevance:</strong> {stars_html}
-        </td>
-    </tr>
-    <tr>
-        <td style="font-size: 14px; color: #333; padding: 8px 0;">
-            <strong>arXiv ID:</strong> {paper.paper.arxiv_id}
-        </td>
-    </tr>
-    <tr>
-        <td style="font-size: 14px; color: #333; padding: 8px 0;">
-            <strong>TLDR:</strong> {paper.paper.tldr or 'No summary available'}
-        </td>
-    </tr>
-    <tr>
-        <td style="padding: 8px 0;">
-            <a href="{paper.paper.pdf_url}" style="display: inline-block; text-decoration: none; font-size: 14px; font-weight: bold; color: #fff; background-color: #d9534f; padding: 8px 16px; border-radius: 4px;">PDF</a>
-            {code_link}
-        </td>
-    </tr>
-    </table>
+    return _PAPER.render(
+        title=paper.paper.title,
+        authors=authors_str,
+        affiliations=affiliations_str,
+        stars=stars_html,
+        arxiv_id=paper.paper.arxiv_id,
+        tldr=paper.paper.tldr or "No summary available",
+        pdf_url=paper.paper.pdf_url,
+        code_link=code_link,
+    )
+
+
+class EmailRenderer:
+    """
+    Digest renderer caching the HTML fragment of each paper.
+
+    Fragments are keyed by arxiv_id, score bucket and a hash of everything the
+    fragment shows (title, authors, TLDR, affiliations and links), so digests sharing papers, e.g.
+    for the members of a lab, render each paper once and are assembled by
+    joining cached fragments.
     """
 
+    def __init__(self, max_fragments: int = 4096) -> None:
+        self.max_fragments = max_fragments
+        self._fragments: "OrderedDict[Tuple[str, int, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def fragment_key(paper: ScoredPaper) -> Tuple[str, int, str]:
+        """
+        Get the cache key of a paper's fragment.
+
+        Args:
+            paper: ScoredPaper to render
+
+        Returns:
+            Tuple of arxiv_id, score bucket and content hash
+        """
+        p = paper.paper
+        content = [p.title, p.authors, p.tldr, p.affiliations, p.code_url, p.pdf_url]
+        digest = hashlib.sha1(json.dumps(content, ensure_ascii=False).encode("utf-8")).hexdigest()
+        return p.arxiv_id, _score_bucket(paper.score), digest
+
+    def render_paper(self, paper: ScoredPaper) -> str:
+        """
+        Render the HTML block of a paper, reusing a cached fragment when possible.
+
+        Args:
+            paper: ScoredPaper to render
+
+        Returns:
+            HTML string for the paper
+        """
+        key = self.fragment_key(paper)
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                self.stats["hits"] += 1
+                return fragment
+        fragment = create_paper_html(paper)
+        with self._lock:
+            self.stats["misses"] += 1
+            if self.max_fragments > 0:
+                self._fragments[key] = fragment
+                if len(self._fragments) > self.max_fragments:
+                    self._fragments.popitem(last=False)
+        return fragment
+
+    def render_digest(self, papers: List[ScoredPaper]) -> str:
+        """
+        Render the complete email HTML for a list of papers.
+
+        Args:
+            papers: Scored papers in display order
+
+        Returns:
+            HTML document
+        """
+        if not papers:
+            return _EMAIL.render(content=create_empty_email_html())
+        return _EMAIL.render(content="<br>".join(self.render_paper(p) for p in papers))
+
+
+@lru_cache(maxsize=1)
+def get_email_renderer() -> EmailRenderer:
+    """Get the process-wide email renderer."""
+    return EmailRenderer()
+
 
 def create_empty_email_html() -> str:
     """Create HTML for empty email (no papers found)."""
     return """
-    <table border="0" cellpadding="0" cellspacing="0" width="100%" style="font-family: Arial, sans-serif; border: 1px solid #ddd; border-radius: 8px; padding: 16px; background-color: #f9f9f9;">
+    <table border="0" cellpadding="0" cellspacing="0" width="100%"
+        style="font-family: Arial, sans-serif; border: 1px solid #ddd; border-radius: 8px; padding: 16px;
+        background-color: #f9f9f9;">
     <tr>
         <td style="font-size: 20px; font-weight: bold; color: #333;">
             No Papers Today. Take a Rest!
@@ -175,22 +327,42 @@ def construct_email_content(papers: List[ScoredPaper]) -> EmailContent:
         EmailContent object or string content
     """
 
+    renderer = get_email_renderer()
     if not papers:
-        content = create_empty_email_html()
-        return EmailContent(
-            subject="Daily arXiv - No Papers Today", html_content=EMAIL_TEMPLATE.format(content=content), papers=[]
-        )
+        return EmailContent(subject="Daily arXiv - No Papers Today", html_content=renderer.render_digest([]), papers=[])
     else:
-        paper_blocks = [create_paper_html(paper) for paper in papers]
-        content = "<br>".join(paper_blocks)
-
         return EmailContent(
             subject=f"Daily arXiv - {len(papers)} Papers",
-            html_content=EMAIL_TEMPLATE.format(content=content),
+            html_content=renderer.render_digest(papers),
             papers=papers,
         )
 
 
+def _format_addr(s: str) -> str:
+    name, addr = parseaddr(s)
+    return formataddr((Header(name, "utf-8").encode(), addr))
+
+
+def build_email_message(sender: str, receiver: str, subject: str, html_content: str) -> MIMEText:
+    """
+    Build an HTML email message.
+
+    Args:
+        sender: Sender email address
+        receiver: Receiver email address
+        subject: Subject line
+        html_content: HTML body
+
+    Returns:
+        MIME message ready to send
+    """
+    msg = MIMEText(html_content, "html", "utf-8")
+    msg["From"] = _format_addr(f"Github Action <{sender}>")
+    msg["To"] = _format_addr(f"You <{receiver}>")
+    msg["Subject"] = Header(subject, "utf-8").encode()
+    return msg
+
+
 def send_email(sender: str, receiver: str, password: str, smtp_server: str, smtp_port: int, html_content: str) -> bool:
     """
     Send email via SMTP.
@@ -209,16 +381,8 @@ def send_email(sender: str, receiver: str, password: str, smtp_server: str, smtp
     if sender == "" or receiver == "" or password == "" or smtp_server == "" or smtp_port == 0:
         raise Exception("Email configuration is not set correctly")
 
-    def _format_addr(s):
-        name, addr = parseaddr(s)
-        return formataddr((Header(name, "utf-8").encode(), addr))
-
-    msg = MIMEText(html_content, "html", "utf-8")
-    msg["From"] = _format_addr(f"Github Action <{sender}>")
-    msg["To"] = _format_addr(f"You <{receiver}>")
-
     today = datetime.now().strftime("%Y/%m/%d")
-    msg["Subject"] = Header(f"Daily arXiv {today}", "utf-8").encode()
+    msg = build_email_message(sender, receiver, f"Daily arXiv {today}", html_content)
 
     server = None
     try:
@@ -1,31 +1,269 @@
-from typing import Any, Dict, List
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 
 import numpy as np
-from sentence_transformers import CrossEncoder, SentenceTransformer
+
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .rerank_cache import RerankScoreCache, get_rerank_score_cache
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on characters per cross-encoder token, used to cut long texts before tokenizing them
+_MAX_CHARS_PER_TOKEN = 8
 
 
 class EmbeddingService:
+    """
+    Sentence embedder and cross-encoder reranker, each loaded on first use.
+
+    Callers that only embed never pay for the reranker, and either model can
+    be unloaded independently to free memory. ``warmup()`` loads models ahead
+    of time, off the critical path.
+
+    Embeddings are reused from ``embedding_cache``, so only unseen texts are
+    encoded. With ``output_dim`` set, embeddings are truncated to their first
+    ``output_dim`` dimensions and re-normalized, which preserves quality for
+    Matryoshka-trained models such as mxbai-embed-large-v1. Reranking scores candidates in batches, cuts texts to the
+    cross-encoder's window before tokenizing them, and reuses scores from
+    ``score_cache``.
+    """
+
     def __init__(
         self,
         embedding_model_name: str = "mixedbread-ai/mxbai-embed-large-v1",
         reranker_model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        rerank_batch_size: int = 32,
+        rerank_max_tokens: int = 512,
+        score_cache: Optional[RerankScoreCache] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        output_dim: Optional[int] = None,
     ) -> None:
-        self.embedder = SentenceTransformer(embedding_model_name)
-        self.reranker = CrossEncoder(reranker_model_name)
+        self.embedding_model_name = embedding_model_name
+        self.reranker_model_name = reranker_model_name
+        self.rerank_batch_size = max(1, rerank_batch_size)
+        self.rerank_max_tokens = rerank_max_tokens
+        self.score_cache = score_cache
+        self.embedding_cache = embedding_cache
+        self.output_dim = output_dim
+        self.load_seconds: Dict[str, float] = {}
+        self.rerank_stats: Dict[str, int] = {"cache_hits": 0, "scored": 0}
+        self._embedder = None
+        self._reranker = None
+        self._embedder_lock = threading.Lock()
+        self._reranker_lock = threading.Lock()
+
+    @property
+    def embedder(self) -> Any:
+        if self._embedder is None:
+            with self._embedder_lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    start = time.perf_counter()
+                    self._embedder = SentenceTransformer(self.embedding_model_name)
+                    self.load_seconds["embedder"] = time.perf_counter() - start
+                    logger.info(f"Loaded embedder {self.embedding_model_name} in {self.load_seconds['embedder']:.1f}s")
+        return self._embedder
+
+    @embedder.setter
+    def embedder(self, model: Any) -> None:
+        self._embedder = model
+
+    @property
+    def reranker(self) -> Any:
+        if self._reranker is None:
+            with self._reranker_lock:
+                if self._reranker is None:
+                    from sentence_transformers import CrossEncoder
+
+                    start = time.perf_counter()
+                    model = CrossEncoder(self.reranker_model_name)
+                    # Pairs are truncated to this window when tokenized, which also bounds batch padding
+                    attr = "max_seq_length" if hasattr(model, "max_seq_length") else "max_length"
+                    window = getattr(model, attr, None)
+                    if isinstance(window, int):
+                        window = min(window, self.rerank_max_tokens)
+                    setattr(model, attr, window if isinstance(window, int) else self.rerank_max_tokens)
+                    self._reranker = model
+                    self.load_seconds["reranker"] = time.perf_counter() - start
+                    logger.info(f"Loaded reranker {self.reranker_model_name} in {self.load_seconds['reranker']:.1f}s")
+        return self._reranker
+
+    @reranker.setter
+    def reranker(self, model: Any) -> None:
+        self._reranker = model
+
+    def is_loaded(self, model: str) -> bool:
+        """
+        Check whether a model is loaded.
+
+        Args:
+            model: "embedder" or "reranker"
+
+        Returns:
+            True if the model is in memory
+        """
+        return getattr(self, f"_{model}") is not None
+
+    def warmup(self, embedder: bool = True, reranker: bool = True) -> Dict[str, float]:
+        """
+        Load models ahead of their first use.
+
+        Args:
+            embedder: Load the embedder
+            reranker: Load the reranker
+
+        Returns:
+            Load time in seconds of each model loaded by this service
+        """
+        if embedder:
+            self.embedder
+        if reranker:
+            self.reranker
+        return dict(self.load_seconds)
 
-    def embed_texts(self, texts: List[str]) -> np.ndarray:
-        embeddings = self.embedder.encode(
-            texts, normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+    def unload(self, embedder: bool = True, reranker: bool = True) -> None:
+        """
+        Release models; they are loaded again on next use.
+
+        Args:
+            embedder: Release the embedder
+            reranker: Release the reranker
+        """
+        if embedder:
+            with self._embedder_lock:
+                self._embedder = None
+        if reranker:
+            with self._reranker_lock:
+                self._reranker = None
+
+    def _encode(self, texts: List[str], normalize: bool) -> np.ndarray:
+        return self.embedder.encode(
+            texts, normalize_embeddings=normalize, convert_to_numpy=True, show_progress_bar=False
         )
-        return embeddings
+
+    def _truncate(self, vectors: np.ndarray, normalize: bool) -> np.ndarray:
+        if self.output_dim is None or vectors.ndim != 2 or vectors.shape[1] <= self.output_dim:
+            return vectors
+        vectors = np.ascontiguousarray(vectors[:, : self.output_dim], dtype=np.float32)
+        if normalize:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+    def embed_texts(self, texts: List[str], normalize: bool = True) -> np.ndarray:
+        """
+        Embed texts, encoding only those not found in the embedding cache.
+
+        Full-size embeddings are cached, so services with different
+        ``output_dim`` share cache entries.
+
+        Args:
+            texts: Texts to embed
+            normalize: Normalize embeddings to unit length
+
+        Returns:
+            Matrix with one embedding per text, in input order
+        """
+        return self._truncate(self._embed_full(texts, normalize), normalize)
+
+    def _embed_full(self, texts: List[str], normalize: bool) -> np.ndarray:
+        if self.embedding_cache is None or not texts:
+            return self._encode(texts, normalize)
+        cached = self.embedding_cache.get_many(self.embedding_model_name, normalize, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        fresh: Dict[str, np.ndarray] = {}
+        if missing:
+            vectors = self._encode(missing, normalize)
+            self.embedding_cache.put_many(self.embedding_model_name, normalize, missing, vectors)
+            fresh = dict(zip(missing, vectors))
+        rows = [v if v is not None else fresh[t] for t, v in zip(texts, cached)]
+        return np.stack(rows).astype(np.float32, copy=False)
+
+    def score_pairs(self, query: str, texts: List[str]) -> np.ndarray:
+        """
+        Score texts against a query with the cross-encoder, reusing cached scores.
+
+        Args:
+            query: Query text
+            texts: Candidate texts
+
+        Returns:
+            Relevance score of each text, in input order
+        """
+        if not texts:
+            return np.zeros(0, dtype=np.float32)
+        # Scores depend on the truncation window as well as the model
+        key = f"{self.reranker_model_name}@{self.rerank_max_tokens}" if self.score_cache is not None else None
+
+        cached: List[Optional[float]] = [None] * len(texts)
+        if key is not None:
+            try:
+                cached = self.score_cache.get_many(key, query, texts)
+            except sqlite3.Error as e:
+                logger.warning(f"Rerank score cache lookup failed: {e}")
+        scores = np.array([np.nan if s is None else s for s in cached], dtype=np.float32)
+        missing = [i for i, s in enumerate(cached) if s is None]
+        self.rerank_stats["cache_hits"] += len(texts) - len(missing)
+        if not missing:
+            return scores
+
+        max_chars = self.rerank_max_tokens * _MAX_CHARS_PER_TOKEN
+        pairs = [(query, texts[i][:max_chars]) for i in missing]
+        fresh = np.asarray(
+            self.reranker.predict(pairs, batch_size=self.rerank_batch_size, show_progress_bar=False), dtype=np.float32
+        ).reshape(-1)
+        scores[missing] = fresh
+        self.rerank_stats["scored"] += len(missing)
+        if key is not None:
+            try:
+                self.score_cache.set_many(key, query, [texts[i] for i in missing], fresh.tolist())
+            except sqlite3.Error as e:
+                logger.warning(f"Rerank score cache store failed: {e}")
+        return scores
 
     def rerank(self, query: str, candidates: List[Dict[str, Any]], top_k: int = 8) -> List[Dict[str, Any]]:
-        if not candidates:
+        if not candidates or top_k <= 0:
             return []
-        pairs = [(query, c.get("text", "")) for c in candidates]
-        scores = self.reranker.predict(pairs)
-        ranked = sorted(zip(candidates, scores), key=lambda x: float(x[1]), reverse=True)
-        return [dict(item[0], rerank_score=float(item[1])) for item in ranked[:top_k]]
+        scores = self.score_pairs(query, [c.get("text", "") for c in candidates])
+        if top_k < len(scores):
+            # Partition out the top k, then order only those
+            top = np.sort(np.argpartition(-scores, top_k - 1)[:top_k])
+        else:
+            top = np.arange(len(scores))
+        order = top[np.argsort(-scores[top], kind="stable")]
+        return [dict(candidates[i], rerank_score=float(scores[i])) for i in order]
+
+
+def configured_output_dim() -> Optional[int]:
+    """
+    Get the embedding dimension set by the ``EMBEDDING_DIM`` environment variable, None for full size.
+
+    Vector stores hold one dimension, so changing it requires a new Pinecone
+    index (or local store) and re-ingesting the documents.
+    """
+    value = os.getenv("EMBEDDING_DIM")
+    return int(value) if value else None
+
+
+@lru_cache(maxsize=None)
+def get_embedding_service(
+    embedding_model_name: str = "mixedbread-ai/mxbai-embed-large-v1",
+    reranker_model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+    output_dim: Optional[int] = None,
+) -> EmbeddingService:
+    """Get the process-wide embedding service, so models are loaded at most once per process."""
+    return EmbeddingService(
+        embedding_model_name,
+        reranker_model_name,
+        score_cache=get_rerank_score_cache(),
+        embedding_cache=get_embedding_cache(),
+        output_dim=output_dim,
+    )
 
 
 def cosine_similarity_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
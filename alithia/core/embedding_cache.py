@@ -0,0 +1,302 @@
+"""
+Two-tier cache of text embeddings: an in-memory LRU over a persistent memory-mapped store.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache_utils import get_cache_dir, safe_filename
+
+logger = logging.getLogger(__name__)
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _select_rows(conn: sqlite3.Connection, keys: Sequence[str]) -> Dict[str, int]:
+    found: Dict[str, int] = {}
+    # Stay well below SQLite's bound-parameter limit
+    for i in range(0, len(keys), 500):
+        chunk = keys[i : i + 500]
+        rows = conn.execute(f"SELECT key, row FROM rows WHERE key IN ({','.join('?' * len(chunk))})", tuple(chunk))
+        found.update(rows.fetchall())
+    return found
+
+
+class _VectorFile:
+    """
+    Append-only float32 matrix file with an SQLite index of row numbers.
+
+    Writers are serialized by an SQLite write transaction, so several
+    processes can share one store; readers map the file read-only. Once the
+    store holds more than ``max_entries`` vectors, the least recently used
+    ones are dropped by rewriting the kept rows into a new file generation,
+    so readers holding the old mapping never see renumbered rows.
+    """
+
+    def __init__(self, directory: str, max_entries: Optional[int] = None) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.sqlite3")
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._mmap: Optional[np.memmap] = None
+        self._mapped_generation: Optional[int] = None
+        self.dim: Optional[int] = None
+
+    def _vectors_path(self, generation: int) -> str:
+        return os.path.join(self.directory, "vectors.f32" if generation == 0 else f"vectors.{generation}.f32")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.index_path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rows (key TEXT PRIMARY KEY, row INTEGER NOT NULL, "
+                "used_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [r[1] for r in conn.execute("PRAGMA table_info(rows)")]
+            if "used_at" not in columns:
+                conn.execute("ALTER TABLE rows ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.commit()
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            self.dim = row[0] if row else None
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _generation(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        return row[0] if row else 0
+
+    def _matrix(self, generation: int, min_rows: int) -> np.ndarray:
+        # Remap when rows were appended or the store was compacted since the file was last mapped
+        if self._mmap is None or self._mapped_generation != generation or self._mmap.shape[0] < min_rows:
+            path = self._vectors_path(generation)
+            rows = os.path.getsize(path) // (4 * self.dim)
+            self._mmap = np.memmap(path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+            self._mapped_generation = generation
+        return self._mmap
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        conn = self._connect()
+        if self.dim is None or not keys:
+            return {}
+        # Read rows and generation from one snapshot
+        conn.execute("BEGIN")
+        try:
+            generation = self._generation(conn)
+            found = _select_rows(conn, keys)
+        finally:
+            conn.commit()
+        if not found:
+            return {}
+        matrix = self._matrix(generation, max(found.values()) + 1)
+        vectors = {key: np.array(matrix[row]) for key, row in found.items()}
+        self._touch(conn, list(found))
+        return vectors
+
+    def _touch(self, conn: sqlite3.Connection, keys: List[str]) -> None:
+        # Recency only decides what compaction keeps, so refresh it at most hourly per key
+        now = time.time()
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                conn.execute(
+                    f"UPDATE rows SET used_at = ? WHERE used_at < ? AND key IN ({','.join('?' * len(chunk))})",
+                    (now, now - 3600, *chunk),
+                )
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.debug(f"Failed to update embedding cache recency: {e}")
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        conn = self._connect()
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        conn.execute("BEGIN IMMEDIATE")
+        old_path = None
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO meta (name, value) VALUES ('dim', ?)", (vectors.shape[1],))
+                self.dim = vectors.shape[1]
+            elif row[0] != vectors.shape[1]:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store ({row[0]})")
+            else:
+                self.dim = row[0]
+            generation = self._generation(conn)
+            path = self._vectors_path(generation)
+            (count,) = conn.execute("SELECT COUNT(*) FROM rows").fetchone()
+            existing = _select_rows(conn, keys)
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in existing]
+            if new:
+                # Rows are written before they are indexed, so readers never see an unwritten row
+                mode = "r+b" if os.path.exists(path) else "wb"
+                with open(path, mode) as f:
+                    f.seek(count * 4 * self.dim)
+                    f.write(np.stack([v for _, v in new]).tobytes())
+                now = time.time()
+                conn.executemany(
+                    "INSERT INTO rows (key, row, used_at) VALUES (?, ?, ?)",
+                    [(k, count + i, now) for i, (k, _) in enumerate(new)],
+                )
+                if self.max_entries is not None and count + len(new) > self.max_entries:
+                    old_path = self._compact(conn, generation)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        if old_path is not None:
+            try:
+                os.remove(old_path)
+            except OSError as e:
+                logger.debug(f"Failed to remove compacted embedding file {old_path}: {e}")
+
+    def _compact(self, conn: sqlite3.Connection, generation: int) -> str:
+        """Keep the most recently used rows in a new file generation; returns the old file to remove."""
+        # Leave headroom so that the store is not compacted again on every write
+        keep = int(self.max_entries * 0.8)
+        kept = conn.execute("SELECT key, row FROM rows ORDER BY used_at DESC, row DESC LIMIT ?", (keep,)).fetchall()
+        old_path = self._vectors_path(generation)
+        new_path = self._vectors_path(generation + 1)
+        rows = os.path.getsize(old_path) // (4 * self.dim)
+        matrix = np.memmap(old_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        try:
+            with open(new_path, "wb") as f:
+                f.write(np.ascontiguousarray(matrix[[r for _, r in kept]]).tobytes())
+            conn.execute(
+                "DELETE FROM rows WHERE key NOT IN (SELECT key FROM rows ORDER BY used_at DESC, row DESC LIMIT ?)",
+                (keep,),
+            )
+            conn.executemany("UPDATE rows SET row = ? WHERE key = ?", [(i, k) for i, (k, _) in enumerate(kept)])
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('generation', ?)", (generation + 1,))
+        except BaseException:
+            if os.path.exists(new_path):
+                os.remove(new_path)
+            raise
+        logger.info(f"Compacted embedding cache {self.directory} from {rows} to {len(kept)} vectors")
+        return old_path
+
+    def close(self) -> None:
+        self._mmap = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class EmbeddingCache:
+    """
+    Text embeddings keyed by (model, normalization flag, sha1(text)).
+
+    Recently used vectors are kept in an in-memory LRU; vectors are persisted
+    in one memory-mapped file per (model, normalization) under the Alithia
+    cache directory, so later runs and other processes reuse them. Each file
+    keeps at most ``max_entries`` vectors, dropping the least recently used.
+    """
+
+    def __init__(self, path: Optional[str] = None, memory_entries: int = 20000, max_entries: int = 200000) -> None:
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._memory: "OrderedDict[Tuple[str, bool, str], np.ndarray]" = OrderedDict()
+        self._stores: Dict[Tuple[str, bool], _VectorFile] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, model: str, normalize: bool) -> _VectorFile:
+        store = self._stores.get((model, normalize))
+        if store is None:
+            name = safe_filename(f"{model}-{'norm' if normalize else 'raw'}")
+            directory = os.path.join(self.path, name) if self.path else get_cache_dir("embeddings", name)
+            os.makedirs(directory, exist_ok=True)
+            store = self._stores[(model, normalize)] = _VectorFile(directory, max_entries=self.max_entries)
+        return store
+
+    def _remember(self, key: Tuple[str, bool, str], vector: np.ndarray) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model: str, normalize: bool, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up the embeddings of texts.
+
+        Args:
+            model: Embedding model name
+            normalize: Whether the embeddings are normalized
+            texts: Texts to look up
+
+        Returns:
+            Cached vector or None for each text, in input order
+        """
+        hashes = [_text_key(t) for t in texts]
+        results: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for h in hashes:
+                vector = self._memory.get((model, normalize, h))
+                if vector is not None:
+                    self._memory.move_to_end((model, normalize, h))
+                    results[h] = vector
+            self.stats["memory_hits"] += sum(1 for h in hashes if h in results)
+
+            missing = list(dict.fromkeys(h for h in hashes if h not in results))
+            if missing:
+                try:
+                    on_disk = self._store(model, normalize).get_many(missing)
+                except (sqlite3.Error, OSError, ValueError) as e:
+                    logger.warning(f"Embedding cache lookup failed: {e}")
+                    on_disk = {}
+                for h, vector in on_disk.items():
+                    self._remember((model, normalize, h), vector)
+                results.update(on_disk)
+                self.stats["disk_hits"] += sum(1 for h in hashes if h in on_disk)
+            self.stats["misses"] += sum(1 for h in hashes if h not in results)
+        return [results.get(h) for h in hashes]
+
+    def put_many(self, model: str, normalize: bool, texts: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Store the embeddings of texts.
+
+        Args:
+            model: Embedding model name
+            normalize: Whether the embeddings are normalized
+            texts: Embedded texts
+            vectors: Matrix with one row per text
+        """
+        if not len(texts):
+            return
+        hashes = [_text_key(t) for t in texts]
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for h, vector in zip(hashes, vectors):
+                self._remember((model, normalize, h), vector)
+            unique = dict(zip(hashes, vectors))
+            try:
+                self._store(model, normalize).put_many(list(unique), np.stack(list(unique.values())))
+            except (sqlite3.Error, OSError, ValueError) as e:
+                logger.warning(f"Embedding cache store failed: {e}")
+
+    def clear_memory(self) -> None:
+        """Drop the in-memory tier; persisted vectors are kept."""
+        with self._lock:
+            self._memory.clear()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache stored in the Alithia cache directory."""
+    return EmbeddingCache()
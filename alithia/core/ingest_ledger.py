@@ -0,0 +1,202 @@
+"""
+Ledger of content hashes of items written to external stores, used to write only what changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from pydantic import BaseModel, Field
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(*parts: Any) -> str:
+    """
+    Hash the content of an item for change detection.
+
+    Args:
+        *parts: JSON-serializable parts of the item, e.g. the stored row and the embedding model
+
+    Returns:
+        Hex SHA-1 digest of the canonical JSON encoding of the parts
+    """
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class LedgerDiff(BaseModel):
+    """Items to write and to delete to bring a store up to date."""
+
+    changed: List[str] = Field(default_factory=list)
+    unchanged: List[str] = Field(default_factory=list)
+    removed: List[str] = Field(default_factory=list)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.changed and not self.removed
+
+
+class IngestLedger:
+    """
+    SQLite-backed map of (store, id) to the content hash last written.
+
+    Callers diff the hashes of the items they are about to write, write only
+    the changed ones, delete the removed ones and then record the new state.
+    Items may belong to a group (e.g. the chunks of one document); diffing a
+    group reports recorded ids missing from the new items as removed. Store
+    names should identify the actual store (backend, location, index), and
+    since the ledger lives apart from the stores, ``diff`` can verify that
+    unchanged items are still there. Recording an item also marks it as seen,
+    so items that stop appearing can be pruned with ``expired``.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or os.path.join(get_cache_dir("ledger"), "ledger.sqlite3")
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "store TEXT NOT NULL, id TEXT NOT NULL, grp TEXT, hash TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (store, id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_items_group ON items (store, grp)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def diff(
+        self,
+        store: str,
+        hashes: Dict[str, str],
+        group: Optional[str] = None,
+        verify: Optional[Callable[[Sequence[str]], Set[str]]] = None,
+    ) -> LedgerDiff:
+        """
+        Compare items with the ledger.
+
+        Args:
+            store: Identity of the target store, e.g. ``VectorStore.store_id``
+            hashes: Content hash of each item, by id
+            group: Group of the items; if given, recorded ids of the group not in ``hashes`` are removed
+            verify: Returns which of the given ids the store holds; unchanged ids it does not hold
+                (e.g. after the store was wiped or recreated) are reported as changed
+
+        Returns:
+            Changed (new or modified), unchanged and removed ids
+        """
+        ids = list(hashes)
+        recorded: Dict[str, str] = {}
+        with self._lock:
+            conn = self._connect()
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                rows = conn.execute(
+                    f"SELECT id, hash FROM items WHERE store = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (store, *chunk),
+                ).fetchall()
+                recorded.update(rows)
+            removed: List[str] = []
+            if group is not None:
+                rows = conn.execute("SELECT id FROM items WHERE store = ? AND grp = ?", (store, group)).fetchall()
+                removed = [r[0] for r in rows if r[0] not in hashes]
+        unchanged = [i for i in ids if recorded.get(i) == hashes[i]]
+        if verify is not None and unchanged:
+            present = verify(unchanged)
+            if len(present) < len(unchanged):
+                logger.warning(f"{len(unchanged) - len(present)} recorded items are missing from {store}")
+            unchanged = [i for i in unchanged if i in present]
+        kept = set(unchanged)
+        return LedgerDiff(changed=[i for i in ids if i not in kept], unchanged=unchanged, removed=removed)
+
+    def ids(self, store: str, group: str) -> List[str]:
+        """
+        Get the recorded ids of a group.
+
+        Args:
+            store: Identity of the store
+            group: Group of the items
+
+        Returns:
+            Recorded ids
+        """
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute("SELECT id FROM items WHERE store = ? AND grp = ?", (store, group)).fetchall()
+        return [r[0] for r in rows]
+
+    def expired(self, store: str, max_age_seconds: float) -> List[str]:
+        """
+        Get the ids not recorded (written or seen) for a while, e.g. items that left a feed.
+
+        Args:
+            store: Identity of the store
+            max_age_seconds: Age after which an item is expired
+
+        Returns:
+            Expired ids; delete them from the store, then pass them to ``record`` as ``removed``
+        """
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT id FROM items WHERE store = ? AND updated_at < ?", (store, time.time() - max_age_seconds)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def record(
+        self, store: str, hashes: Dict[str, str], group: Optional[str] = None, removed: Sequence[str] = ()
+    ) -> None:
+        """
+        Record items as written (or seen unchanged) and removed items as deleted.
+
+        Args:
+            store: Identity of the target store
+            hashes: Content hash of each written or seen item, by id
+            group: Group of the items
+            removed: Ids deleted from the store
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (store, id, grp, hash, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(store, i, group, h, now) for i, h in hashes.items()],
+            )
+            conn.executemany("DELETE FROM items WHERE store = ? AND id = ?", [(store, i) for i in removed])
+            conn.commit()
+
+    def clear(self, store: Optional[str] = None) -> None:
+        """
+        Forget recorded items, so they are written again.
+
+        Args:
+            store: Store to forget, None for all stores
+        """
+        with self._lock:
+            conn = self._connect()
+            if store is None:
+                conn.execute("DELETE FROM items")
+            else:
+                conn.execute("DELETE FROM items WHERE store = ?", (store,))
+            conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_ingest_ledger() -> IngestLedger:
+    """Get the process-wide ledger stored in the Alithia cache directory."""
+    return IngestLedger()
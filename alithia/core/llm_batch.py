@@ -0,0 +1,163 @@
+"""
+Offline LLM requests through the OpenAI Batch API.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from .researcher import LLMConnection
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_jsonl(requests: Mapping[str, List[Dict[str, str]]], model: str) -> str:
+    """
+    Serialize chat requests in the OpenAI Batch input format.
+
+    Args:
+        requests: Mapping of custom id to chat messages
+        model: Model name
+
+    Returns:
+        JSONL text with one request per line
+    """
+    lines = [
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": model, "messages": messages},
+            },
+            ensure_ascii=False,
+        )
+        for custom_id, messages in requests.items()
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def parse_batch_output(text: str) -> Dict[str, str]:
+    """
+    Extract the completion texts of successful requests from a Batch output file.
+
+    Args:
+        text: JSONL content of the output file
+
+    Returns:
+        Mapping of custom id to response text
+    """
+    results: Dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            logger.debug(f"Skipping malformed batch output line: {e}")
+            continue
+        if isinstance(content, str):
+            results[record["custom_id"]] = content
+    return results
+
+
+class BatchJobRunner:
+    """
+    Submit chat requests as one Batch job, poll it and collect the results.
+
+    Batch jobs trade latency for throughput and cost. When the job has not
+    finished by the deadline it is cancelled and whatever results are available
+    are returned; callers fall back to synchronous calls for the rest. A
+    cancelled job only publishes its partial output once it leaves the
+    ``cancelling`` state, so it is polled for up to ``cancel_timeout`` seconds.
+    """
+
+    def __init__(self, client: Any, model: str, poll_interval: float = 30.0, cancel_timeout: float = 60.0) -> None:
+        self.client = client
+        self.model = model
+        self.poll_interval = poll_interval
+        self.cancel_timeout = cancel_timeout
+        self.stats: Dict[str, Any] = {"submitted": 0, "completed": 0, "status": None}
+
+    @classmethod
+    def from_connection(cls, conn: LLMConnection, poll_interval: float = 30.0) -> "BatchJobRunner":
+        """
+        Create a runner from an LLM connection.
+
+        Args:
+            conn: LLMConnection instance
+            poll_interval: Seconds between status checks
+
+        Returns:
+            BatchJobRunner instance
+        """
+        from openai import OpenAI
+
+        from .llm_utils import get_http_client
+
+        client = OpenAI(api_key=conn.openai_api_key, base_url=conn.openai_api_base, http_client=get_http_client())
+        return cls(client, conn.model_name, poll_interval=poll_interval)
+
+    def run(self, requests: Mapping[str, List[Dict[str, str]]], deadline: Optional[float] = None) -> Dict[str, str]:
+        """
+        Run requests as a Batch job.
+
+        Args:
+            requests: Mapping of custom id to chat messages
+            deadline: Seconds to wait for the job before cancelling it, None to wait until it ends
+
+        Returns:
+            Mapping of custom id to response text for the requests that succeeded
+        """
+        if not requests:
+            return {}
+        end = None if deadline is None else time.monotonic() + deadline
+
+        payload = build_batch_jsonl(requests, self.model).encode("utf-8")
+        input_file = self.client.files.create(file=("alithia_batch.jsonl", payload), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+        self.stats["submitted"] = len(requests)
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} requests")
+
+        while batch.status not in _FINAL_STATUSES:
+            remaining = None if end is None else end - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                logger.warning(f"Batch {batch.id} did not finish in {deadline}s, cancelling")
+                batch = self._cancel(batch.id)
+                break
+            time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+            batch = self.client.batches.retrieve(batch.id)
+
+        self.stats["status"] = batch.status
+        results: Dict[str, str] = {}
+        # Cancelled and expired batches may still carry the results finished so far
+        if getattr(batch, "output_file_id", None):
+            results = parse_batch_output(self.client.files.content(batch.output_file_id).text)
+        self.stats["completed"] = len(results)
+        logger.info(f"Batch {batch.id} ended as {batch.status} with {len(results)}/{len(requests)} results")
+        return results
+
+    def _cancel(self, batch_id: str) -> Any:
+        """Cancel a batch and wait, within ``cancel_timeout``, for it to reach a final status."""
+        batch = self.client.batches.cancel(batch_id)
+        end = time.monotonic() + self.cancel_timeout
+        # The results finished so far are only attached once the batch is cancelled
+        while batch.status not in _FINAL_STATUSES:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Batch {batch_id} is still {batch.status} after {self.cancel_timeout}s")
+                break
+            time.sleep(min(self.poll_interval, 5.0, remaining))
+            batch = self.client.batches.retrieve(batch_id)
+        return batch
@@ -0,0 +1,285 @@
+"""
+Persistent cache for LLM chat completion responses.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(model: str, base_url: str, messages: List[Dict[str, Any]], **params: Any) -> str:
+    """
+    Build a cache key from the connection settings and normalized request.
+
+    Message contents are stripped and serialized with sorted keys, so
+    insignificant whitespace or dict ordering does not cause misses.
+
+    Args:
+        model: Model name
+        base_url: API base URL
+        messages: Chat messages
+        **params: Extra request parameters (e.g. temperature)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    normalized = [{"role": m.get("role"), "content": str(m.get("content", "")).strip()} for m in messages]
+    payload = json.dumps(
+        {"model": model, "base_url": (base_url or "").rstrip("/"), "messages": normalized, "params": params},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    SQLite-backed response cache with TTL and size-based (least recently used) eviction.
+
+    The database is opened lazily on first use and can be shared between threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 30 * 86400, max_entries: int = 20000) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or os.path.join(get_cache_dir("llm"), "responses.sqlite3")
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Cached response or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            return row[0]
+
+    def set(self, key: str, response: str, model: Optional[str] = None) -> None:
+        """
+        Store a response, evicting expired and least recently used entries when needed.
+
+        Args:
+            key: Cache key from make_cache_key
+            response: Response text
+            model: Model name, stored for inspection
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 1:
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> LLMResponseCache:
+    """Get the process-wide response cache stored in the Alithia cache directory."""
+    return LLMResponseCache()
+
+
+class CachedLLM:
+    """
+    Proxy over an LLM client that serves ``chat_completion`` and ``generate`` from an LLMResponseCache.
+
+    With ``refresh=True`` entries stored before this proxy was created are not
+    read; fresh responses are still stored, and those (e.g. batch results) are
+    served to later requests.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        cache: LLMResponseCache,
+        model: str,
+        base_url: str,
+        refresh: bool = False,
+        _fresh_keys: Optional[Set[str]] = None,
+    ) -> None:
+        self.client = client
+        self.cache = cache
+        self.model = model
+        self.base_url = base_url
+        self.refresh = refresh
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        # Keys stored through this proxy (or the proxies sharing its cache), readable despite refresh
+        self._fresh_keys: Set[str] = set() if _fresh_keys is None else _fresh_keys
+
+    def with_client(self, client: Any) -> "CachedLLM":
+        """
+        Get a proxy sharing this cache over another client (e.g. a throttled wrapper of this one's client).
+
+        Args:
+            client: LLM client to call on cache misses
+
+        Returns:
+            New CachedLLM instance with fresh stats
+        """
+        return CachedLLM(
+            client, self.cache, self.model, self.base_url, refresh=self.refresh, _fresh_keys=self._fresh_keys
+        )
+
+    def peek(self, messages: List[Dict[str, Any]], method: str = "chat_completion", **kwargs: Any) -> Optional[str]:
+        """
+        Look up the cached response of a request without calling the client or counting stats.
+
+        Args:
+            messages: Chat messages
+            method: Client method the request would be made with
+            **kwargs: Extra request parameters
+
+        Returns:
+            Cached response or None
+        """
+        key = make_cache_key(self.model, self.base_url, messages, method=method, **kwargs)
+        if self.refresh and key not in self._fresh_keys:
+            return None
+        try:
+            return self.cache.get(key)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    def store(
+        self, messages: List[Dict[str, Any]], response: str, method: str = "chat_completion", **kwargs: Any
+    ) -> None:
+        """
+        Store a response obtained outside this proxy (e.g. from a batch job) for a request.
+
+        Empty responses are not stored, so the request is made again next time.
+
+        Args:
+            messages: Chat messages
+            response: Response text
+            method: Client method the request would be made with
+            **kwargs: Extra request parameters
+        """
+        if not response.strip():
+            return
+        try:
+            key = make_cache_key(self.model, self.base_url, messages, method=method, **kwargs)
+            self.cache.set(key, response, model=self.model)
+            self._fresh_keys.add(key)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def _cached_call(self, method: str, messages: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        cached = self.peek(messages, method=method, **kwargs)
+        if cached is not None:
+            with self._stats_lock:
+                self.stats["hits"] += 1
+            return cached
+
+        with self._stats_lock:
+            self.stats["misses"] += 1
+        response = getattr(self.client, method)(messages=messages, **kwargs)
+        if isinstance(response, str):
+            self.store(messages, response, method=method, **kwargs)
+        return response
+
+    def stream(self, messages: List[Dict[str, Any]], **kwargs: Any) -> Iterator[str]:
+        """
+        Stream a completion, sharing cache entries with ``generate``.
+
+        A cached response is yielded as a single chunk; a fresh one is streamed
+        from the client and stored once complete.
+
+        Args:
+            messages: Chat messages
+            **kwargs: Extra request parameters
+
+        Yields:
+            Text chunks in generation order
+        """
+        from .llm_streaming import stream_completion
+
+        cached = self.peek(messages, method="generate", **kwargs)
+        if cached is not None:
+            with self._stats_lock:
+                self.stats["hits"] += 1
+            yield cached
+            return
+
+        with self._stats_lock:
+            self.stats["misses"] += 1
+        parts: List[str] = []
+        for chunk in stream_completion(self.client, messages, **kwargs):
+            parts.append(chunk)
+            yield chunk
+        self.store(messages, "".join(parts), method="generate", **kwargs)
+
+    def chat_completion(self, messages: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        return self._cached_call("chat_completion", messages, **kwargs)
+
+    def generate(self, messages: List[Dict[str, Any]], **kwargs: Any) -> Any:
+        return self._cached_call("generate", messages, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
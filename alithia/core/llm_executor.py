@@ -0,0 +1,261 @@
+"""
+Concurrent, rate-limited execution of LLM calls.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+from .llm_cache import CachedLLM
+from .token_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute (RPM) and tokens per minute (TPM).
+
+    A limit of None disables that dimension.
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0)
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request of ``tokens`` tokens fits into the limits.
+
+        Args:
+            tokens: Estimated tokens of the request
+
+        Returns:
+            Seconds spent waiting
+        """
+        if not self.rpm and not self.tpm:
+            return 0.0
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+                if wait == 0.0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    Whether an LLM call failure is transient (HTTP 429/5xx, connection errors or timeouts).
+
+    Args:
+        error: Exception raised by the LLM client
+
+    Returns:
+        True if the call should be retried
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (TimeoutError, ConnectionError)) or type(error).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+class LLMExecutor:
+    """
+    Run LLM-bound work for many items with bounded concurrency.
+
+    Individual LLM calls are throttled by a shared RateLimiter and retried with
+    jittered exponential backoff on transient errors. ``map`` returns results in
+    input order regardless of completion order.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats: Dict[str, float] = {"calls": 0, "retries": 0, "throttle_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, key: str, value: float) -> None:
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def call(self, fn: Callable[..., R], *args: Any, estimated_tokens: int = 0, **kwargs: Any) -> R:
+        """
+        Make one throttled LLM call, retrying transient failures.
+
+        Args:
+            fn: Callable performing the request
+            *args: Positional arguments for fn
+            estimated_tokens: Token estimate used for TPM throttling
+            **kwargs: Keyword arguments for fn
+
+        Returns:
+            Result of fn
+        """
+        attempt = 0
+        while True:
+            self._record("throttle_seconds", self.limiter.acquire(estimated_tokens))
+            self._record("calls", 1)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+                attempt += 1
+                self._record("retries", 1)
+                logger.debug(f"Retrying LLM call in {delay:.2f}s after error (attempt {attempt}): {e}")
+                time.sleep(delay)
+
+    def wrap(self, llm: Any) -> Any:
+        """
+        Wrap an LLM client so that its completion calls go through this executor.
+
+        For a CachedLLM, only the underlying client is wrapped so that cache hits
+        are neither throttled nor counted against the rate limits.
+
+        Args:
+            llm: LLM client instance
+
+        Returns:
+            Proxy routing LLM calls through this executor
+        """
+        if isinstance(llm, CachedLLM):
+            return llm.with_client(ThrottledLLM(llm.client, self))
+        return ThrottledLLM(llm, self)
+
+    def map(
+        self, fn: Callable[[T], R], items: Sequence[T], timeout: Optional[float] = None
+    ) -> List[Tuple[Optional[R], Optional[Exception]]]:
+        """
+        Apply fn to all items concurrently.
+
+        Args:
+            fn: Function processing one item
+            items: Items to process
+            timeout: Per-item timeout in seconds, counted from when the item starts running
+
+        Returns:
+            List of (result, None) or (None, error) pairs in input order
+        """
+        started: Dict[int, float] = {}
+
+        def run(index: int, item: T) -> R:
+            started[index] = time.monotonic()
+            return fn(item)
+
+        results: List[Tuple[Optional[R], Optional[Exception]]] = []
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-executor")
+        try:
+            futures = [pool.submit(run, i, item) for i, item in enumerate(items)]
+            for i, future in enumerate(futures):
+                try:
+                    results.append((self._wait(future, started, i, timeout), None))
+                except Exception as e:
+                    results.append((None, e))
+        finally:
+            # Timed-out calls cannot be interrupted; their late results are discarded
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    @staticmethod
+    def _wait(future: Any, started: Dict[int, float], index: int, timeout: Optional[float]) -> Any:
+        if timeout is None:
+            return future.result()
+        while True:
+            start = started.get(index)
+            wait = 0.1 if start is None else max(0.0, start + timeout - time.monotonic())
+            try:
+                return future.result(timeout=wait)
+            except FuturesTimeoutError:
+                if future.done():
+                    raise
+                if start is not None:
+                    raise TimeoutError(f"Timed out after {timeout}s")
+
+
+class ThrottledLLM:
+    """Proxy over an LLM client that routes ``chat_completion`` and ``generate`` through an LLMExecutor."""
+
+    def __init__(self, llm: Any, executor: LLMExecutor) -> None:
+        self._llm = llm
+        self._executor = executor
+
+    def _estimate_tokens(self, messages: List[Dict[str, str]]) -> int:
+        return sum(count_tokens(str(m.get("content", ""))) for m in messages)
+
+    def chat_completion(self, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        return self._executor.call(
+            self._llm.chat_completion, messages=messages, estimated_tokens=self._estimate_tokens(messages), **kwargs
+        )
+
+    def generate(self, messages: List[Dict[str, str]], **kwargs: Any) -> Any:
+        return self._executor.call(
+            self._llm.generate, messages=messages, estimated_tokens=self._estimate_tokens(messages), **kwargs
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_llm":
+            raise AttributeError(name)
+        return getattr(self._llm, name)
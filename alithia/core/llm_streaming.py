@@ -0,0 +1,81 @@
+"""
+Streaming of LLM completions with latency measurement.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .llm_cache import CachedLLM
+
+logger = logging.getLogger(__name__)
+
+
+def stream_completion(llm: Any, messages: List[Dict[str, str]], **kwargs: Any) -> Iterator[str]:
+    """
+    Stream the completion of chat messages as text chunks.
+
+    Cached responses are yielded at once and fresh streamed responses are cached.
+    Clients backed by the OpenAI SDK are streamed token by token; any other
+    client yields its complete ``generate`` result as a single chunk.
+
+    Args:
+        llm: LLM client instance, optionally wrapped in CachedLLM
+        messages: Chat messages
+        **kwargs: Extra request parameters
+
+    Yields:
+        Text chunks in generation order
+    """
+    if isinstance(llm, CachedLLM):
+        yield from llm.stream(messages, **kwargs)
+        return
+
+    try:
+        from openai import OpenAI
+    except ImportError:
+        OpenAI = None
+
+    sdk_client = getattr(llm, "client", None)
+    if OpenAI is None or not isinstance(sdk_client, OpenAI):
+        yield str(llm.generate(messages=messages, **kwargs))
+        return
+
+    stream = sdk_client.chat.completions.create(model=llm.chat_model, messages=messages, stream=True, **kwargs)
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+class TimedStream:
+    """
+    Iterator over text chunks that records time to first token and total generation time.
+
+    Timing starts when the stream is created; ``text`` holds everything yielded so far.
+    """
+
+    def __init__(self, chunks: Iterable[str]) -> None:
+        self._chunks = iter(chunks)
+        self._start = time.perf_counter()
+        self._parts: List[str] = []
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+
+    def __iter__(self) -> "TimedStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            if self.total is None:
+                self.total = time.perf_counter() - self._start
+            raise
+        if self.ttft is None and chunk:
+            self.ttft = time.perf_counter() - self._start
+        self._parts.append(chunk)
+        return chunk
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
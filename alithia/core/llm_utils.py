@@ -3,34 +3,118 @@ LLM utilities for content generation using cogents.common.llm.
 """
 
 import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from cogents.common.llm import get_llm_client
 
+from .llm_cache import CachedLLM, get_response_cache
 from .researcher import LLMConnection
 
 logger = logging.getLogger(__name__)
 
+# Long-lived clients keyed by connection settings
+_clients: Dict[Tuple[str, str, str], Any] = {}
+_clients_lock = threading.Lock()
 
-def get_llm(conn: LLMConnection):
+
+@lru_cache(maxsize=1)
+def get_http_client() -> Optional[Any]:
+    """
+    Get the process-wide HTTP client shared by all LLM clients.
+
+    Connections are kept alive and reused across calls and clients, and HTTP/2
+    is negotiated when the ``h2`` package is installed.
+
+    Returns:
+        httpx client for the OpenAI SDK, or None if the SDK is unavailable
+    """
+    try:
+        import httpx
+        from openai import DefaultHttpxClient
+    except ImportError:
+        return None
+    try:
+        import h2  # noqa: F401
+
+        http2 = True
+    except ImportError:
+        http2 = False
+    return DefaultHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=120.0),
+    )
+
+
+def _share_http_client(llm: Any) -> None:
+    # cogents keeps the OpenAI SDK client on ``client``; rebind a copy of it onto the shared pool
+    try:
+        from openai import OpenAI
+    except ImportError:
+        return
+    sdk_client = getattr(llm, "client", None)
+    http_client = get_http_client()
+    if isinstance(sdk_client, OpenAI) and http_client is not None:
+        llm.client = sdk_client.copy(http_client=http_client)
+
+
+def get_llm_client_for(conn: LLMConnection) -> Any:
+    """
+    Get the long-lived LLM client for a connection, creating it on first use.
+
+    Clients are shared by all callers with the same API key, base URL and
+    model, so connection setup and TLS handshakes are paid once per process.
+
+    Args:
+        conn: LLMConnection instance
+
+    Returns:
+        LLM client instance
+    """
+    key = (conn.openai_api_key, (conn.openai_api_base or "").rstrip("/"), conn.model_name)
+    with _clients_lock:
+        llm = _clients.get(key)
+        if llm is None:
+            try:
+                llm = get_llm_client(
+                    provider="openai",
+                    api_key=conn.openai_api_key,
+                    base_url=conn.openai_api_base,
+                    chat_model=conn.model_name,
+                )
+                # Set the chat_model attribute for testing purposes
+                llm.chat_model = conn.model_name
+            except Exception as e:
+                logger.warning(f"Failed to initialize LLM client: {e}")
+                raise e
+            _share_http_client(llm)
+            _clients[key] = llm
+    return llm
+
+
+def clear_llm_clients() -> None:
+    """Drop all registered LLM clients, e.g. after credentials changed."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def get_llm(conn: LLMConnection, use_cache: bool = False, refresh: bool = False):
     """
     Get LLM instance based on LLMConnection configuration.
 
     Args:
         conn: LLMConnection instance
+        use_cache: Serve repeated requests from the persistent response cache; only for
+            prompts whose answer may be reused, such as arxrec content generation
+        refresh: Bypass cached responses (fresh ones are still stored)
 
     Returns:
         LLM client instance
     """
-    try:
-        llm = get_llm_client(
-            provider="openai",
-            api_key=conn.openai_api_key,
-            base_url=conn.openai_api_base,
-            chat_model=conn.model_name,
+    llm = get_llm_client_for(conn)
+    if use_cache:
+        return CachedLLM(
+            llm, get_response_cache(), model=conn.model_name, base_url=conn.openai_api_base, refresh=refresh
         )
-        # Set the chat_model attribute for testing purposes
-        llm.chat_model = conn.model_name
-        return llm
-    except Exception as e:
-        logger.warning(f"Failed to initialize LLM client: {e}")
-        raise e
+    return llm
@@ -0,0 +1,346 @@
+"""
+Embedded vector store kept on local disk as memory-mapped numpy segments.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .cache_utils import get_cache_dir, safe_filename
+from .similarity import as_float32_matrix, top_k_similarity
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_MANIFEST = "manifest.json"
+
+
+def _compare(value: Any, op: str, operand: Any) -> bool:
+    if op == "$eq":
+        return value == operand
+    if op == "$ne":
+        return value != operand
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if op == "$exists":
+        return (value is not None) == bool(operand)
+    if value is None:
+        return False
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+def matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Evaluate a Pinecone-style metadata filter.
+
+    Supports ``$eq``, ``$ne``, ``$in``, ``$nin``, ``$gt``, ``$gte``, ``$lt``,
+    ``$lte``, ``$exists``, ``$and`` and ``$or``; a bare value means ``$eq``.
+
+    Args:
+        metadata: Metadata of a record
+        filter: Filter expression, None to match everything
+
+    Returns:
+        True if the record matches
+    """
+    if not filter:
+        return True
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class _Segment:
+    """One immutable batch of records: a float32 matrix file plus a JSONL file of ids and metadata."""
+
+    def __init__(self, directory: str, name: str, dim: int) -> None:
+        self.name = name
+        self.vectors_path = os.path.join(directory, f"{name}.f32")
+        self.records_path = os.path.join(directory, f"{name}.jsonl")
+        with open(self.records_path, encoding="utf-8") as f:
+            self.records: List[Dict[str, Any]] = [json.loads(line) for line in f if line.strip()]
+        # Records with a vector, in matrix row order; the rest are tombstones
+        self.rows = [r for r in self.records if not r.get("deleted")]
+        self.vectors = (
+            np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.rows), dim))
+            if self.rows
+            else np.empty((0, dim), dtype=np.float32)
+        )
+
+
+class LocalVectorStore:
+    """
+    Vector store embedded in the process, persisted under the Alithia cache directory.
+
+    Every upsert or delete appends an immutable segment and then atomically
+    replaces the manifest listing the live segments, so readers never see a
+    half-written batch. Later segments override earlier ones for the same id.
+    When segments pile up or most rows are superseded, they are compacted
+    into one. Queries score segments through memory maps with blockwise top-k
+    search and apply Pinecone-style metadata filters, and results have the
+    same shape as PineconeVectorStore's.
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        namespace: Optional[str] = None,
+        dimension: Optional[int] = None,
+        path: Optional[str] = None,
+        max_segments: int = 16,
+    ) -> None:
+        root = os.path.abspath(os.path.expanduser(path)) if path else get_cache_dir("vectors")
+        self.path = os.path.join(root, safe_filename(index_name), safe_filename(namespace or "__default__"))
+        os.makedirs(self.path, exist_ok=True)
+        self.namespace = namespace
+        self.dimension = dimension
+        self.max_segments = max(1, max_segments)
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._live_rows: Dict[str, Tuple[int, int]] = {}
+
+    # Storage
+
+    @contextlib.contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        # Serializes writers across threads and, where supported, processes
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, _MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"dim": self.dimension, "next": 0, "segments": []}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        target = os.path.join(self.path, _MANIFEST)
+        with open(f"{target}.tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{target}.tmp", target)
+
+    def _load(self) -> List[_Segment]:
+        # Segments are immutable, so only ones added since the last call (e.g. by another process) are read
+        manifest = self._read_manifest()
+        if [s.name for s in self._segments] != manifest["segments"]:
+            loaded = {s.name: s for s in self._segments}
+            self._segments = [
+                loaded.get(name) or _Segment(self.path, name, manifest["dim"]) for name in manifest["segments"]
+            ]
+            self._live_rows = self._live(self._segments)
+        return self._segments
+
+    @staticmethod
+    def _live(segments: Sequence[_Segment]) -> Dict[str, Tuple[int, int]]:
+        # Latest location (segment index, row) of every live id
+        live: Dict[str, Tuple[int, int]] = {}
+        for s, segment in enumerate(segments):
+            row = 0
+            for record in segment.records:
+                if record.get("deleted"):
+                    live.pop(record["id"], None)
+                    continue
+                live[record["id"]] = (s, row)
+                row += 1
+        return live
+
+    def _write_segment(self, manifest: Dict[str, Any], records: List[Dict[str, Any]], vectors: np.ndarray) -> str:
+        name = f"seg-{manifest['next']:08d}"
+        manifest["next"] += 1
+        vectors_path = os.path.join(self.path, f"{name}.f32")
+        records_path = os.path.join(self.path, f"{name}.jsonl")
+        with open(vectors_path, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        with open(records_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records)
+            f.flush()
+            os.fsync(f.fileno())
+        return name
+
+    def _append(self, records: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        if not records:
+            return
+        with self._write_lock():
+            manifest = self._read_manifest()
+            if len(vectors):
+                if manifest["dim"] is None:
+                    manifest["dim"] = int(vectors.shape[1])
+                elif vectors.shape[1] != manifest["dim"]:
+                    raise ValueError(
+                        f"Embeddings have {vectors.shape[1]} dimensions but the store has {manifest['dim']}"
+                    )
+            elif manifest["dim"] is None:
+                return
+            manifest["segments"].append(self._write_segment(manifest, records, vectors))
+            self._write_manifest(manifest)
+            self._maybe_compact(manifest)
+
+    def _maybe_compact(self, manifest: Dict[str, Any]) -> None:
+        segments = self._load()
+        total = sum(len(s.records) for s in segments)
+        if len(segments) > self.max_segments or (total > 1000 and len(self._live_rows) < total / 2):
+            self._compact(manifest)
+
+    def _compact(self, manifest: Dict[str, Any]) -> None:
+        segments = self._load()
+        records, vectors = [], []
+        for s, segment in enumerate(segments):
+            for row, record in enumerate(segment.rows):
+                if self._live_rows.get(record["id"]) == (s, row):
+                    records.append(record)
+                    vectors.append(segment.vectors[row])
+        old = list(manifest["segments"])
+        matrix = np.stack(vectors) if vectors else np.empty((0, manifest["dim"]), dtype=np.float32)
+        manifest["segments"] = [self._write_segment(manifest, records, matrix)] if records else []
+        self._write_manifest(manifest)
+        self._segments, self._live_rows = [], {}
+        for name in old:
+            for ext in (".f32", ".jsonl"):
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(self.path, f"{name}{ext}"))
+        logger.info(f"Compacted {len(old)} vector store segments into {len(manifest['segments'])}")
+
+    def compact(self) -> None:
+        """Merge all segments into one holding only the live records."""
+        with self._write_lock():
+            manifest = self._read_manifest()
+            if manifest["segments"]:
+                self._compact(manifest)
+
+    # VectorStore API
+
+    def _check_dimension(self, embeddings: np.ndarray) -> None:
+        size = embeddings.shape[-1] if getattr(embeddings, "ndim", 0) else 0
+        if self.dimension is not None and size and size != self.dimension:
+            raise ValueError(f"Embeddings have {size} dimensions but the vector store expects {self.dimension}")
+
+    def upsert_chunks(self, doc_id: str, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
+        self._check_dimension(embeddings)
+        records = [
+            {
+                "id": f"{doc_id}:{chunk['id']}",
+                "metadata": {
+                    "doc_id": doc_id,
+                    "page": chunk.get("page"),
+                    "offset": chunk.get("offset"),
+                    "text": chunk.get("text"),
+                },
+            }
+            for chunk in chunks
+        ]
+        self._append(records, as_float32_matrix(embeddings)[: len(records)] if records else np.empty((0, 0)))
+
+    def upsert_documents(
+        self, docs: List[Dict[str, Any]], embeddings: np.ndarray, id_key: str = "id", text_key: str = "text"
+    ) -> None:
+        self._check_dimension(embeddings)
+        records = []
+        for d in docs:
+            meta = {k: v for k, v in d.items() if k != text_key}
+            meta[text_key] = d.get(text_key)
+            records.append({"id": str(d[id_key]), "metadata": meta})
+        self._append(records, as_float32_matrix(embeddings)[: len(records)] if records else np.empty((0, 0)))
+
+    @property
+    def store_id(self) -> str:
+        return f"local:{self.path}"
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        """
+        Find which ids are stored.
+
+        Args:
+            ids: Ids to look up
+
+        Returns:
+            Subset of ``ids`` with a live record
+        """
+        with self._lock:
+            self._load()
+            return {i for i in ids if i in self._live_rows}
+
+    def delete(self, ids: Sequence[str]) -> None:
+        """
+        Delete records by id.
+
+        Args:
+            ids: Ids of the records to delete
+        """
+        if ids:
+            self._append([{"id": str(i), "deleted": True} for i in ids], np.empty((0, 0), dtype=np.float32))
+
+    def query(
+        self, query_embedding: np.ndarray, top_k: int = 12, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        self._check_dimension(query_embedding)
+        with self._lock:
+            segments, live = self._load(), self._live_rows
+        query = as_float32_matrix(query_embedding)
+
+        candidates: List[Tuple[float, str, Dict[str, Any]]] = []
+        for s, segment in enumerate(segments):
+            selected = [
+                row
+                for row, record in enumerate(segment.rows)
+                if live.get(record["id"]) == (s, row) and matches_filter(record.get("metadata") or {}, filter)
+            ]
+            if not selected:
+                continue
+            # Whole segments are scanned in place; filtered subsets are gathered first
+            matrix = segment.vectors if len(selected) == len(segment.rows) else segment.vectors[selected]
+            scores, indices = top_k_similarity(query, matrix, k=top_k)
+            for score, index in zip(scores[0], indices[0]):
+                record = segment.rows[selected[index]]
+                candidates.append((float(score), record["id"], record.get("metadata")))
+
+        candidates.sort(key=lambda c: -c[0])
+        return [{"id": i, "metadata": meta, "score": score} for score, i, meta in candidates[:top_k]]
+
+    def count(self) -> int:
+        """Number of live records."""
+        with self._lock:
+            self._load()
+            return len(self._live_rows)
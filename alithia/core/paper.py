@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from .tex_cache import LazyTex
+
 
 class ArxivPaper(BaseModel):
     """Represents an ArXiv paper with all relevant metadata."""
@@ -22,7 +24,9 @@ class ArxivPaper(BaseModel):
     tldr: Optional[str] = None
     score: Optional[float] = None
     published_date: Optional[datetime] = None
-    tex: Optional[Dict[str, str]] = None  # Store extracted LaTeX content
+    tex: Optional[Any] = Field(
+        default=None, exclude=True
+    )  # Extracted LaTeX content, usually a disk-backed LazyTex handle
     arxiv_result: Optional[Any] = Field(
         default=None, exclude=True
     )  # Store original arxiv.Result object for source access
@@ -48,6 +52,11 @@ class ArxivPaper(BaseModel):
             raise AttributeError("Cannot download source: no arxiv_result available")
         return self.arxiv_result.download_source(dirpath=dirpath)
 
+    def release_tex(self) -> None:
+        """Drop in-memory LaTeX content; disk-backed sources are reloaded on next access."""
+        if isinstance(self.tex, LazyTex):
+            self.tex.release()
+
 
 class ScoredPaper(BaseModel):
     """Represents a paper with relevance score."""
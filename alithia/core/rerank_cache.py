@@ -0,0 +1,145 @@
+"""
+Persistent cache of cross-encoder relevance scores.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash a text for use in cache keys.
+
+    Args:
+        text: Text to hash
+
+    Returns:
+        Hex SHA-1 digest of the UTF-8 text
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class RerankScoreCache:
+    """
+    SQLite-backed cache of (query, text) scores keyed by (model, query hash, text hash).
+
+    The model key should include every setting that changes scores (e.g. the
+    truncation length). Entries expire after ``ttl_seconds`` and the least
+    recently used ones are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 30 * 86400, max_entries: int = 200000) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            path = self.path or os.path.join(get_cache_dir("rerank"), "scores.sqlite3")
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "model TEXT NOT NULL, query_hash TEXT NOT NULL, text_hash TEXT NOT NULL, score REAL NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (model, query_hash, text_hash))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scores_accessed ON scores (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, query: str, texts: Sequence[str]) -> List[Optional[float]]:
+        """
+        Look up the scores of texts against a query.
+
+        Args:
+            model: Model key
+            query: Query text
+            texts: Candidate texts
+
+        Returns:
+            Cached score or None for each text, in input order
+        """
+        query_key = text_hash(query)
+        keys = [text_hash(t) for t in texts]
+        now = time.time()
+        found: Dict[str, float] = {}
+        with self._lock:
+            conn = self._connect()
+            unique = list(dict.fromkeys(keys))
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                chunk = unique[i : i + 500]
+                rows = conn.execute(
+                    f"SELECT text_hash, score FROM scores WHERE model = ? AND query_hash = ? AND created_at >= ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (model, query_key, now - self.ttl_seconds, *chunk),
+                ).fetchall()
+                found.update(rows)
+            if found:
+                conn.executemany(
+                    "UPDATE scores SET accessed_at = ? WHERE model = ? AND query_hash = ? AND text_hash = ?",
+                    [(now, model, query_key, k) for k in found],
+                )
+                conn.commit()
+        return [found.get(k) for k in keys]
+
+    def set_many(self, model: str, query: str, texts: Sequence[str], scores: Sequence[float]) -> None:
+        """
+        Store the scores of texts against a query.
+
+        Args:
+            model: Model key
+            query: Query text
+            texts: Candidate texts
+            scores: Score of each text
+        """
+        query_key = text_hash(query)
+        now = time.time()
+        rows = [(model, query_key, text_hash(t), float(s), now, now) for t, s in zip(texts, scores)]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO scores (model, query_hash, text_hash, score, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._writes += 1
+            if self._writes % 100 == 1:
+                self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM scores WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM scores WHERE rowid IN (SELECT rowid FROM scores ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self) -> None:
+        """Remove all cached scores."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM scores")
+            conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_rerank_score_cache() -> RerankScoreCache:
+    """Get the process-wide score cache stored in the Alithia cache directory."""
+    return RerankScoreCache()
@@ -0,0 +1,116 @@
+"""
+Blockwise top-k similarity search over embedding matrices.
+"""
+
+import contextlib
+import logging
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def as_float32_matrix(x: np.ndarray) -> np.ndarray:
+    """
+    Convert vectors to a C-contiguous float32 matrix, the layout BLAS handles fastest.
+
+    Args:
+        x: Vector or matrix (memory-mapped arrays are read, not copied, when already float32 and contiguous)
+
+    Returns:
+        Matrix with one vector per row
+    """
+    x = np.asarray(x)
+    if x.ndim == 1:
+        x = x.reshape(1, -1)
+    return np.ascontiguousarray(x, dtype=np.float32)
+
+
+@contextlib.contextmanager
+def blas_threads(limit: Optional[int]) -> Iterator[None]:
+    """
+    Cap the threads used by BLAS within the block, if threadpoolctl is installed.
+
+    Args:
+        limit: Maximum number of BLAS threads, None for no cap
+    """
+    if limit is None:
+        yield
+        return
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        logger.debug("threadpoolctl is not installed, BLAS threads are not capped")
+        yield
+        return
+    with threadpool_limits(limits=limit, user_api="blas"):
+        yield
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    # Column indices of the k largest scores of each row, unordered
+    if k >= scores.shape[1]:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def top_k_similarity(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    block_size: int = 65536,
+    query_batch_size: int = 1024,
+    max_threads: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the k corpus vectors with the highest dot product for each query.
+
+    The corpus is scanned in blocks of ``block_size`` rows and queries in
+    batches of ``query_batch_size``, so memory stays bounded by one
+    (batch x block) score matrix instead of the full (queries x corpus) one,
+    and only the running top k per query is kept. For normalized embeddings
+    the dot product is the cosine similarity.
+
+    Args:
+        queries: Query vector or matrix with one query per row
+        corpus: Matrix with one corpus vector per row (may be memory-mapped)
+        k: Number of results per query
+        block_size: Corpus rows scored at once
+        query_batch_size: Queries scored at once
+        max_threads: Maximum number of BLAS threads, None to leave the BLAS default
+
+    Returns:
+        Tuple of (scores, indices), each of shape (queries, min(k, corpus rows)),
+        sorted by descending score
+    """
+    queries = as_float32_matrix(queries)
+    if corpus.ndim == 1:
+        corpus = corpus.reshape(1, -1)
+    n = corpus.shape[0]
+    k = min(k, n)
+    if k <= 0 or queries.shape[0] == 0:
+        return np.empty((queries.shape[0], 0), dtype=np.float32), np.empty((queries.shape[0], 0), dtype=np.int64)
+
+    top_scores = np.empty((queries.shape[0], k), dtype=np.float32)
+    top_indices = np.empty((queries.shape[0], k), dtype=np.int64)
+    with blas_threads(max_threads):
+        for q_start in range(0, queries.shape[0], query_batch_size):
+            batch = queries[q_start : q_start + query_batch_size]
+            best_scores = np.empty((batch.shape[0], 0), dtype=np.float32)
+            best_indices = np.empty((batch.shape[0], 0), dtype=np.int64)
+            for start in range(0, n, block_size):
+                block = as_float32_matrix(corpus[start : start + block_size])
+                scores = batch @ block.T
+                local = _top_k_rows(scores, k)
+                # Merge the block's top k with the running top k
+                merged_scores = np.concatenate([best_scores, np.take_along_axis(scores, local, axis=1)], axis=1)
+                merged_indices = np.concatenate([best_indices, local + start], axis=1)
+                keep = _top_k_rows(merged_scores, k)
+                best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+                best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+            # Order the final k by descending score, ties by corpus position
+            order = np.lexsort((best_indices, -best_scores), axis=1)
+            top_scores[q_start : q_start + batch.shape[0]] = np.take_along_axis(best_scores, order, axis=1)
+            top_indices[q_start : q_start + batch.shape[0]] = np.take_along_axis(best_indices, order, axis=1)
+    return top_scores, top_indices
@@ -0,0 +1,111 @@
+"""
+Background download of arXiv sources ahead of content generation.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .arxiv_paper_utils import load_tex
+from .paper import ArxivPaper
+from .tex_cache import LazyTex
+
+logger = logging.getLogger(__name__)
+
+# Prefetchers of running workflows by run id, kept out of the (serializable) graph state
+_prefetchers: Dict[str, "SourcePrefetcher"] = {}
+_prefetchers_lock = threading.Lock()
+
+
+class SourcePrefetcher:
+    """
+    Download and parse paper sources in a bounded thread pool.
+
+    Downloads are spaced at least ``min_interval`` seconds apart to stay polite
+    to arXiv; papers already in the source cache are not throttled.
+    """
+
+    def __init__(self, max_workers: int = 4, min_interval: float = 3.0) -> None:
+        self.min_interval = min_interval
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="source-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._throttle_lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def submit(self, papers: List[ArxivPaper]) -> None:
+        """
+        Schedule source extraction for papers, in the given (ranked) order.
+
+        Args:
+            papers: Papers to prefetch
+        """
+        for paper in papers:
+            if paper.tex is not None or not paper.arxiv_id or paper.arxiv_id in self._futures:
+                continue
+            self._futures[paper.arxiv_id] = self._executor.submit(self._fetch, paper)
+
+    def wait(self, paper: ArxivPaper, timeout: Optional[float] = None) -> None:
+        """
+        Block until the prefetch of a paper has finished.
+
+        Failures are logged and swallowed; callers fall back to ``load_tex``.
+
+        Args:
+            paper: Paper to wait for
+            timeout: Maximum seconds to wait
+        """
+        future = self._futures.get(paper.arxiv_id)
+        if future is None:
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            logger.debug(f"Prefetching source of {paper.arxiv_id} failed: {e}")
+
+    def shutdown(self) -> None:
+        """Cancel pending downloads and release the thread pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _throttle(self) -> None:
+        with self._throttle_lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fetch(self, paper: ArxivPaper) -> None:
+        if LazyTex.open(paper.arxiv_id) is None:
+            self._throttle()
+        load_tex(paper)
+
+
+def register_prefetcher(run_id: str, prefetcher: SourcePrefetcher) -> None:
+    """
+    Register the prefetcher of a workflow run, shutting down any previous one of the run.
+
+    Args:
+        run_id: Workflow run id
+        prefetcher: Prefetcher owned by the run
+    """
+    with _prefetchers_lock:
+        previous = _prefetchers.get(run_id)
+        _prefetchers[run_id] = prefetcher
+    if previous is not None and previous is not prefetcher:
+        previous.shutdown()
+
+
+def get_prefetcher(run_id: str) -> Optional[SourcePrefetcher]:
+    """Get the prefetcher of a workflow run, None if it has none."""
+    with _prefetchers_lock:
+        return _prefetchers.get(run_id)
+
+
+def release_prefetcher(run_id: str) -> None:
+    """Shut down and forget the prefetcher of a workflow run, if any."""
+    with _prefetchers_lock:
+        prefetcher = _prefetchers.pop(run_id, None)
+    if prefetcher is not None:
+        prefetcher.shutdown()
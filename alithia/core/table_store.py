@@ -10,8 +10,13 @@ class SupabaseTableStore:
         key = os.getenv(key_env)
         if not url or not key:
             raise RuntimeError("SUPABASE_URL and SUPABASE_ANON_KEY are required in environment for table store")
+        self.url = url
         self.client: Client = create_client(url, key)
 
+    @property
+    def store_id(self) -> str:
+        return f"supabase:{self.url}"
+
     def upsert_document(self, table: str, doc: Dict[str, Any]) -> None:
         self.client.table(table).upsert(doc).execute()
 
@@ -20,6 +25,11 @@ class SupabaseTableStore:
             return
         self.client.table(table).upsert(rows).execute()
 
+    def delete_rows(self, table: str, ids: List[str]) -> None:
+        if not ids:
+            return
+        self.client.table(table).delete().in_("id", ids).execute()
+
     def get_document(self, table: str, doc_id: str) -> Optional[Dict[str, Any]]:
         res = self.client.table(table).select("*").eq("id", doc_id).limit(1).execute()
         data = getattr(res, "data", None) or res.get("data", None)
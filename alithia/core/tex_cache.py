@@ -0,0 +1,158 @@
+"""
+Disk-backed, lazily loaded storage for extracted LaTeX sources.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from tempfile import NamedTemporaryFile
+from typing import Dict, Iterator, Optional
+
+from .cache_utils import get_cache_dir, safe_filename
+
+logger = logging.getLogger(__name__)
+
+
+def _tex_path(arxiv_id: str, cache_dir: Optional[str] = None) -> str:
+    return os.path.join(cache_dir or get_cache_dir("tex"), f"{safe_filename(arxiv_id)}.json")
+
+
+class LazyTex(Mapping):
+    """
+    Read-only mapping of TeX file name to content, persisted in the source cache.
+
+    Content is read from disk on first access and dropped again by ``release()``,
+    so holding many handles (e.g. one per paper in the agent state) costs almost
+    no memory. It behaves like the plain ``Dict[str, str]`` returned by
+    ``extract_tex_content``, including the special ``"all"`` key.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._data: Optional[Dict[str, Optional[str]]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def spill(cls, arxiv_id: str, contents: Dict[str, Optional[str]], cache_dir: Optional[str] = None) -> "LazyTex":
+        """
+        Write extracted TeX content to the source cache and return a handle to it.
+
+        Args:
+            arxiv_id: Paper identifier used as cache key
+            contents: Mapping of TeX file name to content
+            cache_dir: Optional cache directory override
+
+        Returns:
+            LazyTex handle; nothing is kept in memory
+        """
+        path = _tex_path(arxiv_id, cache_dir)
+        directory = os.path.dirname(path)
+        with NamedTemporaryFile("w", encoding="utf-8", dir=directory, suffix=".tmp", delete=False) as f:
+            json.dump(contents, f)
+            tmp_name = f.name
+        os.replace(tmp_name, path)
+        return cls(path)
+
+    @classmethod
+    def open(cls, arxiv_id: str, cache_dir: Optional[str] = None) -> Optional["LazyTex"]:
+        """
+        Get a handle to previously cached TeX content.
+
+        Args:
+            arxiv_id: Paper identifier used as cache key
+            cache_dir: Optional cache directory override
+
+        Returns:
+            LazyTex handle or None if the paper is not cached
+        """
+        path = _tex_path(arxiv_id, cache_dir)
+        try:
+            # Reuse counts as recent use for prune_tex_cache
+            os.utime(path)
+        except OSError:
+            return None
+        return cls(path)
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the content is currently held in memory."""
+        return self._data is not None
+
+    def _load(self) -> Dict[str, Optional[str]]:
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    try:
+                        with open(self.path, "r", encoding="utf-8") as f:
+                            self._data = json.load(f)
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"Failed to load cached TeX from {self.path}: {e}")
+                        self._data = {}
+                data = self._data
+        return data
+
+    def release(self) -> None:
+        """Drop the in-memory copy; the next access reloads it from disk."""
+        with self._lock:
+            self._data = None
+
+    def __getitem__(self, key: str) -> Optional[str]:
+        return self._load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __repr__(self) -> str:
+        return f"LazyTex(path={self.path!r}, loaded={self.loaded})"
+
+
+def prune_tex_cache(max_bytes: int = 2 * 1024**3, max_age_days: float = 90.0, cache_dir: Optional[str] = None) -> int:
+    """
+    Remove cached TeX sources that were not used recently.
+
+    Entries unused for ``max_age_days`` are removed, then the least recently
+    used ones until the cache fits in ``max_bytes``. Removed papers are simply
+    downloaded again when needed.
+
+    Args:
+        max_bytes: Maximum total size of the cache
+        max_age_days: Maximum age since last use
+        cache_dir: Optional cache directory override
+
+    Returns:
+        Number of removed entries
+    """
+    directory = cache_dir or get_cache_dir("tex")
+    entries = []
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        try:
+            stat = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    entries.sort(reverse=True)
+
+    oldest = time.time() - max_age_days * 86400
+    removed = 0
+    total = 0
+    for mtime, size, name in entries:
+        total += size
+        if mtime >= oldest and total <= max_bytes:
+            continue
+        try:
+            os.remove(os.path.join(directory, name))
+            removed += 1
+        except OSError as e:
+            logger.debug(f"Failed to remove cached TeX {name}: {e}")
+    if removed:
+        logger.info(f"Pruned {removed} cached TeX sources from {directory}")
+    return removed
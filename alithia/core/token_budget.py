@@ -0,0 +1,125 @@
+"""
+Token counting and prompt budgeting shared by all LLM call sites.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from .cache_utils import get_cache_dir
+
+logger = logging.getLogger(__name__)
+
+# gpt-4o tokenizer, used for estimation regardless of the configured model
+DEFAULT_ENCODING = "o200k_base"
+
+# Upper bound on characters per token, used to avoid encoding text that cannot fit
+_MAX_CHARS_PER_TOKEN = 8
+
+
+class _ApproximateEncoder:
+    """Character-based stand-in used when no tiktoken encoding can be loaded offline."""
+
+    chars_per_token = 4
+
+    def encode(self, text: str) -> List[str]:
+        n = self.chars_per_token
+        return [text[i : i + n] for i in range(0, len(text), n)]
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=1)
+def get_encoder() -> Any:
+    """
+    Get the process-wide tokenizer.
+
+    The BPE file is cached under the Alithia cache directory (unless
+    ``TIKTOKEN_CACHE_DIR`` is set), so only the very first run needs network.
+    When the encoding cannot be loaded, a character-based approximation is used.
+
+    Returns:
+        Object with ``encode`` and ``decode`` methods
+    """
+    encoding_name = os.environ.get("ALITHIA_TOKENIZER_ENCODING", DEFAULT_ENCODING)
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", get_cache_dir("tiktoken"))
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"Failed to load tokenizer {encoding_name}, falling back to approximate counting: {e}")
+        return _ApproximateEncoder()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Number of tokens
+    """
+    return len(get_encoder().encode(text))
+
+
+def _truncate(text: str, max_tokens: int) -> Tuple[str, int]:
+    if max_tokens <= 0 or not text:
+        return "", 0
+    enc = get_encoder()
+    window = max_tokens * _MAX_CHARS_PER_TOKEN
+    while True:
+        head = text[:window]
+        tokens = enc.encode(head)
+        if len(tokens) > max_tokens:
+            return enc.decode(tokens[:max_tokens]), max_tokens
+        if len(head) == len(text):
+            return text, len(tokens)
+        window *= 2
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Truncate a text to at most ``max_tokens`` tokens.
+
+    Only a prefix that can possibly fit in the budget is encoded, so long texts
+    are not tokenized in full just to be thrown away.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+
+    Returns:
+        Truncated text
+    """
+    return _truncate(text, max_tokens)[0]
+
+
+def fit_sections(sections: Dict[str, str], max_tokens: int) -> Dict[str, str]:
+    """
+    Fit prompt sections into a token budget.
+
+    Sections are given in priority order (highest first). Each one takes what it
+    needs from the remaining budget, so the lowest-priority sections are trimmed
+    first and dropped entirely once the budget is exhausted.
+
+    Args:
+        sections: Mapping of section name to text, highest priority first
+        max_tokens: Total token budget for all sections
+
+    Returns:
+        Mapping of section name to (possibly truncated or empty) text, in the same order
+    """
+    remaining = max_tokens
+    fitted: Dict[str, str] = {}
+    for name, text in sections.items():
+        if remaining <= 0 or not text:
+            fitted[name] = ""
+            continue
+        fitted[name], used = _truncate(text, remaining)
+        remaining -= used
+    return fitted
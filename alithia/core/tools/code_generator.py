@@ -15,6 +15,7 @@ from alithia.core.researcher.connected import (
     ZoteroConnection,
 )
 from alithia.core.researcher.profile import ResearcherProfile
+from alithia.core.token_budget import count_tokens, fit_sections
 
 from .base import ToolInput, ToolOutput
 from .models import StructuredPaper
@@ -36,6 +37,8 @@ class CodeGeneratorTool(BaseTool):
     description: str = "Translate algorithmic pseudocode into executable Python using an LLM"
     args_schema: type[BaseModel] = CodeGeneratorInput
 
+    max_prompt_tokens: int = 8000
+
     def execute(self, inputs: CodeGeneratorInput, **kwargs: Any) -> CodeGeneratorOutput:
         profile = inputs.profile
         if profile is None:
@@ -51,7 +54,7 @@ class CodeGeneratorTool(BaseTool):
                 google_scholar=GoogleScholarConnection(google_scholar_id="", google_scholar_token=""),
                 x=XConnection(x_username="", x_token=""),
             )
-        llm = get_llm(profile)
+        llm = get_llm(profile.llm)
 
         prompt_messages = self._build_prompt(inputs)
         response = self._send_llm(llm, prompt_messages)
@@ -89,14 +92,26 @@ class CodeGeneratorTool(BaseTool):
                 [str(e.get("caption") or e.get("label") or e) for e in inputs.related_elements[:3]]
             )
 
-        user_content = (
+        template = (
             "You are an expert programmer. Convert the following pseudocode into functional, idiomatic Python.\n"
             "Use NumPy/PyTorch/TensorFlow if appropriate. Include comments explaining key steps.\n\n"
-            f"Label: {label}\n"
-            f"Caption: {caption}\n\n"
-            f"Pseudocode:\n{pseudo}\n\n"
-            f"Context from paper:\n{context_block}{vis_hints}"
+            "Label: {label}\n"
+            "Caption: {caption}\n\n"
+            "Pseudocode:\n{pseudo}\n\n"
+            "Context from paper:\n{context_block}{vis_hints}"
+        )
+        # Pseudocode matters most; paper context is trimmed first
+        parts = fit_sections(
+            {
+                "pseudo": pseudo,
+                "label": label,
+                "caption": caption,
+                "vis_hints": vis_hints,
+                "context_block": context_block,
+            },
+            self.max_prompt_tokens - count_tokens(template),
         )
+        user_content = template.format(**parts)
 
         return [
             {
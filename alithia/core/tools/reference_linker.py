@@ -3,10 +3,10 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
 from langchain_core.tools import BaseTool
 
-from alithia.core.embedding import EmbeddingService, cosine_similarity_matrix
+from alithia.core.embedding import EmbeddingService, get_embedding_service
+from alithia.core.similarity import top_k_similarity
 
 from .base import ToolInput, ToolOutput
 from .models import BibliographyEntry, ParagraphElement, StructuredPaper
@@ -56,13 +56,13 @@ class ReferenceLinkerTool(BaseTool):
             return ReferenceLinkerOutput(references=[])
 
         texts = [t for t, _ in paragraphs]
-        # Lazy init embedding service if needed
+        # Share the process-wide service; only its embedder is loaded here
         if self.embedding_service is None:
-            self.embedding_service = EmbeddingService()
+            self.embedding_service = get_embedding_service()
         query_embedding = self.embedding_service.embed_texts([inputs.query])  # shape (1, d)
         para_embeddings = self.embedding_service.embed_texts(texts)  # shape (n, d)
-        sims = cosine_similarity_matrix(query_embedding, para_embeddings).flatten()
-        top_indices = np.argsort(-sims)[: max(1, inputs.top_k)]
+        _, top = top_k_similarity(query_embedding, para_embeddings, k=max(1, inputs.top_k))
+        top_indices = top[0]
 
         keys: List[str] = []
         for idx in top_indices:
@@ -1,22 +1,180 @@
+import json
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Sequence, Set, Tuple
 
 import numpy as np
 from pinecone import Pinecone
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Rough JSON size of one float32 value, e.g. "-0.012345678918063641, "
+_BYTES_PER_VALUE = 22
+
+
+class VectorStore(Protocol):
+    """Interface shared by the vector store backends."""
+
+    def upsert_chunks(self, doc_id: str, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> None: ...
+
+    def upsert_documents(
+        self, docs: List[Dict[str, Any]], embeddings: np.ndarray, id_key: str = "id", text_key: str = "text"
+    ) -> None: ...
+
+    def query(
+        self, query_embedding: np.ndarray, top_k: int = 12, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]: ...
+
+    def delete(self, ids: Sequence[str]) -> None: ...
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]: ...
+
+    @property
+    def store_id(self) -> str:
+        """Identity of the backing store (backend, location, index and namespace), e.g. for ingest ledgers."""
+        ...
+
+
+class UpsertReport(BaseModel):
+    """Outcome and throughput of a batched upsert."""
+
+    upserted: int = 0
+    failed: int = 0
+    batches: int = 0
+    retries: int = 0
+    payload_bytes: int = 0
+    elapsed_seconds: float = 0.0
+    failures: List[str] = Field(default_factory=list)
+
+    @property
+    def vectors_per_second(self) -> float:
+        return self.upserted / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
 
 
 class PineconeVectorStore:
-    def __init__(self, index_name: str, namespace: Optional[str] = None) -> None:
+    """
+    Vector store backed by a Pinecone index.
+
+    Upserts are split into batches bounded by both vector count and estimated
+    payload size (Pinecone rejects requests over 2 MB), which are sent
+    concurrently by up to ``max_workers`` threads. Each batch is retried with
+    exponential backoff on throttling, server errors and connection failures;
+    a batch rejected with another 4xx status fails immediately. All batches
+    are attempted before failures are raised, and the outcome of the last
+    upsert is kept in ``last_report``.
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        namespace: Optional[str] = None,
+        dimension: Optional[int] = None,
+        host: Optional[str] = None,
+        batch_size: int = 100,
+        max_batch_bytes: int = 2_000_000,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
         api_key = os.getenv("PINECONE_API_KEY")
         if not api_key:
             raise RuntimeError("PINECONE_API_KEY is required in environment for vector store")
         self.pc = Pinecone(api_key=api_key)
-        self.index = self.pc.Index(index_name)
+        # A known index host skips the control-plane lookup
+        host = host or os.getenv("PINECONE_INDEX_HOST")
+        self.index = self.pc.Index(index_name, host=host) if host else self.pc.Index(index_name)
+        self.index_name = index_name
+        self.host = host
         self.namespace = namespace
+        # Expected vector size, e.g. a truncated Matryoshka dimension; None accepts any
+        self.dimension = dimension
+        self.batch_size = max(1, batch_size)
+        # The default leaves headroom below Pinecone's 2 MiB request limit for the envelope
+        self.max_batch_bytes = max_batch_bytes
+        self.max_workers = max(1, max_workers)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.last_report: Optional[UpsertReport] = None
+
+    def _check_dimension(self, embeddings: np.ndarray) -> None:
+        size = embeddings.shape[-1] if getattr(embeddings, "ndim", 0) else 0
+        if self.dimension is not None and size and size != self.dimension:
+            raise ValueError(f"Embeddings have {size} dimensions but the vector store expects {self.dimension}")
+
+    def _batches(self, items: List[Tuple[str, Dict[str, Any]]], dim: int) -> Iterator[Tuple[int, int, int]]:
+        # Consecutive (start, end, estimated bytes) ranges within the count and size limits
+        start, size = 0, 0
+        for i, (vector_id, meta) in enumerate(items):
+            item_size = len(vector_id) + len(json.dumps(meta, default=str)) + dim * _BYTES_PER_VALUE + 64
+            if i > start and (i - start >= self.batch_size or size + item_size > self.max_batch_bytes):
+                yield start, i, size
+                start, size = i, 0
+            size += item_size
+        if start < len(items):
+            yield start, len(items), size
+
+    def _send_batch(self, items: List[Tuple[str, Dict[str, Any]]], values: np.ndarray) -> Tuple[int, Optional[str]]:
+        # Values are converted per batch, in the worker, rather than for the whole upsert up front
+        vectors = [
+            {"id": vector_id, "values": row, "metadata": meta}
+            for (vector_id, meta), row in zip(items, np.asarray(values, dtype=np.float32).tolist())
+        ]
+        attempt = 0
+        while True:
+            try:
+                self.index.upsert(vectors=vectors, namespace=self.namespace)
+                return attempt, None
+            except Exception as e:
+                status = getattr(e, "status", None)
+                permanent = isinstance(status, int) and 400 <= status < 500 and status != 429
+                if permanent or attempt >= self.max_retries:
+                    return attempt, f"{type(e).__name__}: {e}"
+                delay = self.backoff * (2**attempt)
+                attempt += 1
+                logger.warning(f"Upsert batch of {len(vectors)} failed ({e}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _upsert(self, items: List[Tuple[str, Dict[str, Any]]], embeddings: np.ndarray) -> UpsertReport:
+        report = UpsertReport()
+        if not items:
+            self.last_report = report
+            return report
+        start_time = time.perf_counter()
+        batches = list(self._batches(items, embeddings.shape[-1]))
+        report.batches = len(batches)
+        report.payload_bytes = sum(size for _, _, size in batches)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            futures = {
+                pool.submit(self._send_batch, items[start:end], embeddings[start:end]): (start, end)
+                for start, end, _ in batches
+            }
+            for future in as_completed(futures):
+                start, end = futures[future]
+                retries, error = future.result()
+                report.retries += retries
+                if error is None:
+                    report.upserted += end - start
+                else:
+                    report.failed += end - start
+                    report.failures.append(f"vectors {start}-{end - 1}: {error}")
+                logger.debug(f"Upserted {report.upserted + report.failed}/{len(items)} vectors")
+        report.elapsed_seconds = time.perf_counter() - start_time
+        self.last_report = report
+        logger.info(
+            f"Upserted {report.upserted}/{len(items)} vectors in {report.batches} batches "
+            f"({report.vectors_per_second:.0f} vectors/s, {report.retries} retries)"
+        )
+        if report.failed:
+            raise RuntimeError(f"{report.failed} of {len(items)} vectors failed to upsert: {report.failures[0]}")
+        return report
 
     def upsert_chunks(self, doc_id: str, chunks: List[Dict[str, Any]], embeddings: np.ndarray) -> None:
-        vectors = []
-        for i, chunk in enumerate(chunks):
+        self._check_dimension(embeddings)
+        items = []
+        for chunk in chunks:
             chunk_id = f"{doc_id}:{chunk['id']}"
             meta = {
                 "doc_id": doc_id,
@@ -24,23 +182,56 @@ class PineconeVectorStore:
                 "offset": chunk.get("offset"),
                 "text": chunk.get("text"),
             }
-            vectors.append({"id": chunk_id, "values": embeddings[i].tolist(), "metadata": meta})
-        self.index.upsert(vectors=vectors, namespace=self.namespace)
+            items.append((chunk_id, meta))
+        self._upsert(items, embeddings)
 
     def upsert_documents(
         self, docs: List[Dict[str, Any]], embeddings: np.ndarray, id_key: str = "id", text_key: str = "text"
     ) -> None:
-        vectors = []
-        for i, d in enumerate(docs):
+        self._check_dimension(embeddings)
+        items = []
+        for d in docs:
             doc_id = str(d[id_key])
             meta = {k: v for k, v in d.items() if k != text_key}
             meta[text_key] = d.get(text_key)
-            vectors.append({"id": doc_id, "values": embeddings[i].tolist(), "metadata": meta})
-        self.index.upsert(vectors=vectors, namespace=self.namespace)
+            items.append((doc_id, meta))
+        self._upsert(items, embeddings)
+
+    @property
+    def store_id(self) -> str:
+        return f"pinecone:{self.host or self.index_name}/{self.namespace or ''}"
+
+    def existing_ids(self, ids: Sequence[str]) -> Set[str]:
+        """
+        Find which ids are stored.
+
+        Args:
+            ids: Ids to look up
+
+        Returns:
+            Subset of ``ids`` present in the index
+        """
+        found: Set[str] = set()
+        ids = list(ids)
+        # Ids travel in the query string, so keep requests short
+        for start in range(0, len(ids), 100):
+            res = self.index.fetch(ids=ids[start : start + 100], namespace=self.namespace)
+            vectors = getattr(res, "vectors", None)
+            if vectors is None:
+                vectors = res.get("vectors", {})
+            found.update(vectors)
+        return found
+
+    def delete(self, ids: Sequence[str]) -> None:
+        # Pinecone deletes at most 1000 ids per request
+        ids = list(ids)
+        for start in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[start : start + 1000], namespace=self.namespace)
 
     def query(
         self, query_embedding: np.ndarray, top_k: int = 12, filter: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
+        self._check_dimension(query_embedding)
         res = self.index.query(
             vector=query_embedding.tolist(),
             top_k=top_k,
@@ -61,3 +252,37 @@ class PineconeVectorStore:
                 }
             )
         return results
+
+
+def create_vector_store(
+    index_name: str, namespace: Optional[str] = None, dimension: Optional[int] = None, backend: Optional[str] = None
+) -> VectorStore:
+    """
+    Create the configured vector store backend.
+
+    The backend is ``pinecone`` (default) or ``local``, an embedded store
+    under the Alithia cache directory (or ``LOCAL_VECTOR_STORE_PATH``) that
+    needs no API key or network access.
+
+    Args:
+        index_name: Index name
+        namespace: Namespace within the index
+        dimension: Expected vector size, None to accept any
+        backend: Backend name, defaults to the ``VECTOR_STORE_BACKEND`` environment variable
+
+    Returns:
+        Vector store instance
+    """
+    backend = (backend or os.getenv("VECTOR_STORE_BACKEND") or "pinecone").lower()
+    if backend == "pinecone":
+        return PineconeVectorStore(index_name=index_name, namespace=namespace, dimension=dimension)
+    if backend == "local":
+        from .local_vector_store import LocalVectorStore
+
+        return LocalVectorStore(
+            index_name=index_name,
+            namespace=namespace,
+            dimension=dimension,
+            path=os.getenv("LOCAL_VECTOR_STORE_PATH") or None,
+        )
+    raise ValueError(f"Unknown vector store backend: {backend}")
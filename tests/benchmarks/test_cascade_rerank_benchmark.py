@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from alithia.core.cascade_ranker import CascadeRanker
+
+N_QUERIES = 200
+N_CANDIDATES = 50
+TOP_K = 20
+
+
+class _SyntheticCrossEncoder:
+    """Cross-encoder stand-in whose scores follow the bi-encoder up to per-query noise."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = 0
+
+    def score_pairs(self, query, texts):
+        self.calls += len(texts)
+        return np.array([self.scores[t] for t in texts], dtype=np.float32)
+
+
+def _run(noise, rng):
+    depths, recalls = [], []
+    for _ in range(N_QUERIES):
+        bi = np.sort(rng.beta(2, 5, size=N_CANDIDATES))[::-1]
+        cross = 8 * bi + rng.normal(scale=noise, size=N_CANDIDATES)
+        candidates = [{"text": f"c{i}", "score": float(s)} for i, s in enumerate(bi)]
+        ranker = CascadeRanker(_SyntheticCrossEncoder({f"c{i}": s for i, s in enumerate(cross)}))
+        ranked = ranker.rerank("q", candidates, top_k=TOP_K)
+        full = {f"c{i}" for i in np.argsort(-cross)[:TOP_K]}
+        depths.append(ranker.last_depth)
+        recalls.append(len(full & {c["text"] for c in ranked}) / TOP_K)
+    return float(np.mean(depths)), float(np.mean(recalls))
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_cascade_rerank_depth_benchmark():
+    rng = np.random.default_rng(0)
+    print(f"\n{N_QUERIES} queries, top {TOP_K} of {N_CANDIDATES} (Vigil settings)")
+    for label, noise in [("easy", 0.05), ("medium", 0.3), ("hard", 1.5)]:
+        depth, recall = _run(noise, rng)
+        print(
+            f"{label:<7} noise {noise:<4} mean depth {depth:5.1f}/{N_CANDIDATES}, recall@{TOP_K} vs full {recall:.3f}"
+        )
+        assert recall >= 0.95
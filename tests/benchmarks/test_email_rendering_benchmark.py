@@ -0,0 +1,58 @@
+import random
+import time
+
+import pytest
+
+from alithia.core.email_utils import EmailRenderer
+from alithia.core.paper import ArxivPaper, ScoredPaper
+
+N_RECIPIENTS = 1000
+N_PAPERS = 60
+PAPERS_PER_DIGEST = 10
+
+
+def _lab_digests():
+    rng = random.Random(0)
+    pool = [
+        ArxivPaper(
+            title=f"Paper {i}",
+            summary="Abstract",
+            authors=[f"Author {j}" for j in range(8)],
+            arxiv_id=f"2401.{i:05d}",
+            pdf_url=f"https://arxiv.org/pdf/2401.{i:05d}",
+            code_url=f"https://github.com/lab/repo{i}" if i % 2 else None,
+            affiliations=["University A", "Institute B"],
+            tldr=f"One-sentence summary of paper {i}. " * 3,
+        )
+        for i in range(N_PAPERS)
+    ]
+    # Lab members share most top papers, with per-member relevance scores
+    return [
+        [ScoredPaper(paper=p, score=round(rng.uniform(6, 10), 1)) for p in rng.sample(pool, PAPERS_PER_DIGEST)]
+        for _ in range(N_RECIPIENTS)
+    ]
+
+
+def _render_all(renderer, digests):
+    start = time.perf_counter()
+    htmls = [renderer.render_digest(d) for d in digests]
+    return time.perf_counter() - start, htmls
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_lab_digest_rendering_benchmark():
+    digests = _lab_digests()
+
+    uncached_seconds, uncached = _render_all(EmailRenderer(max_fragments=0), digests)
+    renderer = EmailRenderer()
+    cached_seconds, cached = _render_all(renderer, digests)
+
+    assert cached == uncached
+    print(
+        f"\n{N_RECIPIENTS} digests x {PAPERS_PER_DIGEST} papers: "
+        f"uncached {uncached_seconds * 1000:.1f} ms, cached fragments {cached_seconds * 1000:.1f} ms "
+        f"({uncached_seconds / cached_seconds:.1f}x), fragment hit rate "
+        f"{renderer.stats['hits'] / (renderer.stats['hits'] + renderer.stats['misses']):.1%}"
+    )
+    assert cached_seconds < uncached_seconds
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from alithia.core.embedding import EmbeddingService
+
+# Small models keep the benchmark quick; the ratio matters, not the absolute times
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-2-v2"
+
+# Models each call site needs on its first call
+CALL_SITES = {
+    "ReferenceLinkerTool": {"embedder": True, "reranker": False},
+    "Lens load_paper": {"embedder": True, "reranker": False},
+    "Lens process_query": {"embedder": True, "reranker": True},
+    "Vigil filter_results": {"embedder": True, "reranker": True},
+}
+
+
+def _cold_start(embedder, reranker):
+    service = EmbeddingService(EMBEDDING_MODEL, RERANKER_MODEL)
+    start = time.perf_counter()
+    if embedder:
+        service.embed_texts(["warm up"])
+    if reranker:
+        service.rerank("warm up", [{"text": "warm up"}], top_k=1)
+    return time.perf_counter() - start, service
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_embedding_cold_start_benchmark():
+    try:
+        # First load downloads the models; time the later, disk-cached loads only
+        EmbeddingService(EMBEDDING_MODEL, RERANKER_MODEL).warmup()
+    except Exception as e:
+        pytest.skip(f"Models unavailable: {e}")
+
+    eager_seconds, _ = _cold_start(embedder=True, reranker=True)
+    print(f"\nEager load of both models: {eager_seconds * 1000:.0f} ms")
+    for site, needs in CALL_SITES.items():
+        lazy_seconds, service = _cold_start(**needs)
+        assert service.is_loaded("reranker") == needs["reranker"]
+        print(
+            f"{site:<24} lazy cold start {lazy_seconds * 1000:.0f} ms, "
+            f"saves {(eager_seconds - lazy_seconds) * 1000:.0f} ms"
+        )
@@ -0,0 +1,78 @@
+import glob
+import os
+import re
+import time
+
+import numpy as np
+import pytest
+
+from alithia.core.embedding import EmbeddingService
+from alithia.core.similarity import top_k_similarity
+
+FULL_DIM = 1024
+DIMS = [1024, 512, 256, 128]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _truncate(vectors, dim):
+    v = np.ascontiguousarray(vectors[:, :dim])
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _recall(full_top, top):
+    return float(np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(full_top, top)]))
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_matryoshka_speed_and_storage_benchmark():
+    rng = np.random.default_rng(0)
+    corpus = _truncate(rng.standard_normal((200_000, FULL_DIM), dtype=np.float32), FULL_DIM)
+    queries = _truncate(rng.standard_normal((100, FULL_DIM), dtype=np.float32), FULL_DIM)
+
+    print(f"\n{len(queries)} queries x {len(corpus)} vectors, top 20")
+    for dim in DIMS:
+        c, q = _truncate(corpus, dim), _truncate(queries, dim)
+        start = time.perf_counter()
+        top_k_similarity(q, c, k=20)
+        seconds = time.perf_counter() - start
+        # Pinecone upserts send values as JSON floats, roughly 20 bytes each
+        print(
+            f"dim {dim:>4}: search {seconds * 1000:7.1f} ms, {dim * 4} B/vector stored, "
+            f"~{dim * 20 / 1024:.1f} KiB/vector upserted"
+        )
+
+
+def _documents():
+    # Paragraphs of the repository's own documentation stand in for paper chunks
+    paragraphs = []
+    for path in glob.glob(os.path.join(REPO_ROOT, "**", "*.md"), recursive=True):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            paragraphs.extend(p.strip() for p in re.split(r"\n\s*\n", f.read()) if len(p.split()) >= 12)
+    return paragraphs
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_matryoshka_quality_benchmark():
+    paragraphs = _documents()
+    if len(paragraphs) < 40:
+        pytest.skip("Not enough documentation paragraphs for a retrieval benchmark")
+    # Queries are each paragraph's first sentence, as in a Lens question about a passage
+    queries = [re.split(r"(?<=[.!?])\s", p)[0] for p in paragraphs]
+    try:
+        service = EmbeddingService()
+        corpus = service.embed_texts(paragraphs)
+        query_vectors = service.embed_texts(queries)
+    except Exception as e:
+        pytest.skip(f"mxbai-embed-large-v1 unavailable: {e}")
+
+    full_top = top_k_similarity(query_vectors, corpus, k=20)[1]
+    print(f"\n{len(queries)} queries x {len(paragraphs)} paragraphs")
+    for dim in DIMS:
+        top = top_k_similarity(_truncate(query_vectors, dim), _truncate(corpus, dim), k=20)[1]
+        own = float(np.mean(top[:, 0] == np.arange(len(queries))))
+        print(
+            f"dim {dim:>4}: recall@8 vs 1024 {_recall(full_top[:, :8], top[:, :8]):.3f} (Lens), "
+            f"recall@20 vs 1024 {_recall(full_top, top):.3f} (Vigil), own passage first {own:.3f}"
+        )
@@ -0,0 +1,48 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from alithia.core.similarity import top_k_similarity
+
+# 1M x 256 float32 is 1 GB; override for larger dimensions on bigger machines
+N_CORPUS = int(os.environ.get("ALITHIA_BENCH_CORPUS", 1_000_000))
+N_QUERIES = int(os.environ.get("ALITHIA_BENCH_QUERIES", 1_000))
+DIM = int(os.environ.get("ALITHIA_BENCH_DIM", 256))
+TOP_K = 10
+# The dense baseline needs a (queries x corpus) matrix, so it runs on a slice and is extrapolated
+BASELINE_CORPUS = 50_000
+
+
+def _normalized(rng, n):
+    x = rng.standard_normal((n, DIM), dtype=np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.benchmark
+@pytest.mark.slow
+def test_top_k_similarity_benchmark():
+    rng = np.random.default_rng(0)
+    corpus = _normalized(rng, N_CORPUS)
+    queries = _normalized(rng, N_QUERIES)
+
+    start = time.perf_counter()
+    scores, indices = top_k_similarity(queries, corpus, k=TOP_K)
+    blockwise_seconds = time.perf_counter() - start
+
+    # Dense baseline: full float64 similarity matrix, then a full argsort per query
+    sub = corpus[:BASELINE_CORPUS].astype(np.float64)
+    start = time.perf_counter()
+    dense = np.dot(queries.astype(np.float64), sub.T)
+    expected = np.argsort(-dense, axis=1)[:, :TOP_K]
+    baseline_seconds = (time.perf_counter() - start) * N_CORPUS / BASELINE_CORPUS
+
+    _, sub_indices = top_k_similarity(queries, corpus[:BASELINE_CORPUS], k=TOP_K)
+    assert (sub_indices == expected).mean() > 0.99
+    assert indices.shape == (N_QUERIES, TOP_K)
+    print(
+        f"\n{N_QUERIES} queries x {N_CORPUS} vectors x {DIM} dims, top {TOP_K}: "
+        f"blockwise {blockwise_seconds:.1f} s, dense + argsort ~{baseline_seconds:.1f} s (extrapolated), "
+        f"dense matrix would need {N_QUERIES * N_CORPUS * 8 / 1e9:.0f} GB"
+    )
@@ -0,0 +1,119 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from alithia.core.affiliation_index import AffiliationIndex
+from alithia.core.paper import ArxivPaper
+
+
+@pytest.fixture
+def index(tmp_path):
+    return AffiliationIndex(path=str(tmp_path / "authors.sqlite3"), max_age_days=30, min_confidence=0.7)
+
+
+@pytest.mark.unit
+def test_lookup_requires_all_authors_covered(index):
+    index.learn(["Alice Smith", "Bob Lee"], ["MIT"], per_author=True)
+    index.learn(["Alice Smith", "Bob Lee"], ["MIT"], per_author=True)
+    assert index.lookup(["alice  smith", "Bob Lee"]) == ["MIT"]
+    assert index.lookup(["Alice Smith", "Carol King"]) is None
+    assert index.lookup([]) is None
+
+
+@pytest.mark.unit
+def test_single_sighting_is_not_served(index):
+    index.learn(["Alice", "Bob"], ["MIT"], per_author=True)
+    assert index.lookup(["Alice"]) is None
+
+    index.learn(["Alice"], ["MIT"])
+    assert index.lookup(["Alice"]) == ["MIT"]
+    assert index.lookup(["Bob"]) is None
+
+
+@pytest.mark.unit
+def test_single_affiliation_needs_one_author_or_per_author_declarations(index):
+    # One affiliation for several authors may be a partial list or merged duplicates
+    assert index.learn(["Alice", "Bob"], ["MIT"]) == 0
+    assert index.learn(["Alice", "Bob"], ["MIT"], confidence_scale=0.8, author_order=True) == 0
+    assert index.learn(["Alice"], ["MIT"]) == 1
+    assert index.learn(["Alice", "Bob"], ["MIT"], per_author=True) == 2
+
+
+@pytest.mark.unit
+def test_positional_matches_need_author_order_and_confirmation(index):
+    # Parser output follows the declaration order of the affiliation macros, so it is not paired by position
+    assert index.learn(["Alice", "Bob"], ["MIT", "Stanford University"]) == 0
+
+    index.learn(["Alice", "Bob"], ["MIT", "Stanford University"], author_order=True)
+    assert index.lookup(["Alice"]) is None
+
+    index.learn(["Alice", "Bob"], ["MIT", "Stanford University"], author_order=True)
+    assert index.lookup(["Bob", "Alice"]) == ["Stanford University", "MIT"]
+
+    # Ambiguous papers are not learned from
+    assert index.learn(["Alice", "Bob", "Carol"], ["MIT", "CMU"], author_order=True) == 0
+
+
+@pytest.mark.unit
+def test_conflicting_affiliation_is_not_served_until_confirmed(index):
+    index.learn(["Wei Wang"], ["MIT"])
+    index.learn(["Wei Wang"], ["MIT"])
+    assert index.lookup(["Wei Wang"]) == ["MIT"]
+
+    # A conflict withdraws the entry instead of flipping it
+    index.learn(["Wei Wang"], ["ETH Zurich"])
+    assert index.lookup(["Wei Wang"]) is None
+    index.learn(["Wei Wang"], ["ETH Zurich"])
+    assert index.lookup(["Wei Wang"]) is None
+
+    # Repeated confirmation of the new affiliation makes it servable again
+    index.learn(["Wei Wang"], ["ETH Zurich"])
+    assert index.lookup(["Wei Wang"]) == ["ETH Zurich"]
+
+
+@pytest.mark.unit
+def test_stale_entries_are_not_served(index):
+    index.learn(["Alice"], ["MIT"])
+    index.learn(["Alice"], ["MIT"])
+    with patch("alithia.core.affiliation_index.time.time", return_value=time.time() + 31 * 86400):
+        assert index.lookup(["Alice"]) is None
+        index.learn(["Alice"], ["MIT"])
+        assert index.lookup(["Alice"]) == ["MIT"]
+
+
+@pytest.mark.unit
+def test_enrich_paper_answers_known_authors_from_index(index):
+    from alithia.agents.arxrec.nodes import _enrich_paper
+
+    index.learn(["Alice"], ["MIT"])
+    index.learn(["Alice"], ["MIT"])
+    paper = ArxivPaper(title="t", summary="s", authors=["Alice"], arxiv_id="x", pdf_url="http://x", tldr="done")
+    with patch("alithia.agents.arxrec.nodes.parse_paper_affiliations") as parse:
+        fields = _enrich_paper(paper, Mock(), None, affiliation_index=index)
+
+    parse.assert_not_called()
+    assert fields["affiliations"] == ["MIT"]
+    assert fields["affiliation_source"] == "index"
+
+
+@pytest.mark.unit
+def test_enrich_paper_learns_parser_output_per_author_declarations(index):
+    from alithia.agents.arxrec.nodes import _enrich_paper
+
+    paper = ArxivPaper(title="t", summary="s", authors=["Alice", "Bob"], arxiv_id="x", pdf_url="http://x", tldr="done")
+    block = r"\author{Alice}\affiliation{CSAIL, MIT}\author{Bob}\affiliation{LIDS, MIT}"
+    with patch("alithia.core.arxiv_paper_utils.extract_author_block", return_value=block):
+        fields = _enrich_paper(paper, Mock(), None, affiliation_index=index)
+        assert fields["affiliations"] == ["MIT"] and fields["affiliation_source"] == "parser"
+        # Parser evidence is scaled below the LLM's, so one paper is not enough to serve it
+        assert index.lookup(["Alice", "Bob"]) is None
+        _enrich_paper(paper, Mock(), None, affiliation_index=index)
+    assert index.lookup(["Alice", "Bob"]) == ["MIT"]
+
+    # A single declaration shared by two authors is not learned
+    paper = paper.model_copy(update={"authors": ["Carol", "Dan"]})
+    with patch("alithia.core.arxiv_paper_utils.extract_author_block", return_value=r"\affiliation{MIT}"):
+        _enrich_paper(paper, Mock(), None, affiliation_index=index)
+        _enrich_paper(paper, Mock(), None, affiliation_index=index)
+    assert index.lookup(["Carol"]) is None
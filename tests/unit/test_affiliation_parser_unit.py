@@ -0,0 +1,104 @@
+import pytest
+
+from alithia.core.affiliation_parser import normalize_affiliation, parse_affiliations
+
+
+@pytest.mark.unit
+def test_normalize_affiliation_keeps_top_level_institution():
+    assert (
+        normalize_affiliation("Department of Computer Science, Tsinghua University, Beijing") == "Tsinghua University"
+    )
+    assert normalize_affiliation("CSAIL, Massachusetts Institute of Technology, Cambridge, USA") == (
+        "Massachusetts Institute of Technology"
+    )
+    assert normalize_affiliation("Alice Smith") is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "author_block, expected",
+    [
+        # ACM acmart
+        (
+            r"\author{A}\affiliation{\institution{Stanford University}\city{Stanford}\country{USA}}"
+            r"\author{B}\affiliation{\institution{Google Research}\country{USA}}",
+            ["Stanford University", "Google Research"],
+        ),
+        # LNCS
+        (
+            r"\author{A\inst{1} \and B\inst{2}}"
+            r"\institute{Dept. of CS, University of Oxford, UK \email{a@ox.ac.uk} \and DeepMind, London, UK}",
+            ["University of Oxford", "DeepMind"],
+        ),
+        # authblk
+        (
+            r"\author[1]{A}\author[2]{B}\affil[1]{School of Computer Science, Peking University, China}"
+            r"\affil[2]{Microsoft Research Asia}",
+            ["Peking University", "Microsoft Research Asia"],
+        ),
+        # IEEEtran
+        (
+            r"\IEEEauthorblockN{A}\IEEEauthorblockA{\textit{Dept. of EE} \\ \textit{Tsinghua University}\\ Beijing}"
+            r"\IEEEauthorblockN{B}\IEEEauthorblockA{\textit{Dept. of CS} \\ \textit{Tsinghua University}\\ Beijing}",
+            ["Tsinghua University"],
+        ),
+        # NeurIPS
+        (
+            r"\author{Alice\thanks{Equal.} \\ Department of Computer Science \\ Carnegie Mellon University \\"
+            r" Pittsburgh, PA \\ \texttt{a@cmu.edu} \And Bob \\ Meta AI \\ \texttt{b@meta.com}}",
+            ["Carnegie Mellon University", "Meta AI"],
+        ),
+    ],
+)
+def test_parse_affiliations_templates(author_block, expected):
+    assert parse_affiliations(author_block) == expected
+
+
+@pytest.mark.unit
+def test_parse_affiliations_without_affiliations_returns_empty():
+    assert parse_affiliations(r"\author{Alice \and Bob} \maketitle") == []
+    assert parse_affiliations(None) == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "author_block",
+    [
+        r"\author{Alice$^{1}$, Bob$^{2}$ \\ $^1$University of Washington \quad $^2$Allen Institute for AI}",
+        r"\author{Alice$^{1}$, Bob$^{2}$ \\ $^1$University of Washington, $^2$Allen Institute for AI}",
+        r"\author{Alice\textsuperscript{1,*}, Bob\textsuperscript{2} \\ \textsuperscript{1}University of Washington"
+        r" \\ \textsuperscript{2}Allen Institute for AI}",
+    ],
+)
+def test_parse_affiliations_superscript_markers(author_block):
+    assert parse_affiliations(author_block) == ["University of Washington", "Allen Institute for AI"]
+
+
+@pytest.mark.unit
+def test_parse_affiliations_with_unresolved_markers_returns_empty():
+    # Three affiliation markers but only two recognizable institutions: leave it to the LLM
+    block = (
+        r"\author{Alice$^{1}$, Bob$^{2}$, Carol$^{3}$ \\ $^1$University of Washington \quad "
+        r"$^2$Allen Institute for AI \quad $^3$Seattle, WA}"
+    )
+    assert parse_affiliations(block) == []
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "author_block",
+    [
+        # The second affiliation names no recognizable institution
+        r"\author{A}\affiliation{Tsinghua University}\author{B}\affiliation{Zhipu AI, Beijing}"
+        r"\author{C}\affiliation{Peking University}",
+        r"\author{A\inst{1} \and B\inst{2}}\institute{University of Oxford, UK \and Wayve, London, UK}",
+    ],
+)
+def test_parse_affiliations_with_unrecognized_macro_returns_empty(author_block):
+    assert parse_affiliations(author_block) == []
+
+
+@pytest.mark.unit
+def test_parse_affiliations_splits_institute_on_and():
+    block = r"\author{A\inst{1} \and B\inst{2}}\institute{University of Oxford, UK \and ETH Zurich, Switzerland}"
+    assert parse_affiliations(block) == ["University of Oxford", "ETH Zurich"]
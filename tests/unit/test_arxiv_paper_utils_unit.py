@@ -2,7 +2,12 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from alithia.core.arxiv_paper_utils import extract_affiliations, extract_tex_content, generate_tldr
+from alithia.core.arxiv_paper_utils import (
+    extract_affiliations,
+    extract_tex_content,
+    generate_tldr,
+    generate_tldr_and_affiliations,
+)
 from alithia.core.paper import ArxivPaper
 
 
@@ -13,19 +18,20 @@ def test_extract_tex_content_no_arxiv_result_returns_none():
 
 
 @pytest.mark.unit
-def test_generate_tldr_uses_llm_and_truncates_prompt():
+def test_generate_tldr_uses_llm_and_truncates_prompt(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
     p = ArxivPaper(title="t" * 1000, summary="s" * 5000, authors=["a"], arxiv_id="x", pdf_url="http://x")
     fake_llm = Mock()
     fake_llm.chat_completion.return_value = "TLDR"
 
     with (
         patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=None),
-        patch("alithia.core.arxiv_paper_utils.tiktoken") as mock_tiktoken,
+        patch("alithia.core.token_budget.get_encoder") as mock_get_encoder,
     ):
         mock_enc = Mock()
         mock_enc.encode.side_effect = lambda s: list(range(min(len(s), 8000)))
         mock_enc.decode.side_effect = lambda toks: "x" * len(toks)
-        mock_tiktoken.encoding_for_model.return_value = mock_enc
+        mock_get_encoder.return_value = mock_enc
 
         res = generate_tldr(p, fake_llm)
         assert res == "TLDR"
@@ -33,7 +39,8 @@ def test_generate_tldr_uses_llm_and_truncates_prompt():
 
 
 @pytest.mark.unit
-def test_extract_affiliations_parses_list():
+def test_extract_affiliations_parses_list(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
     p = ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id="x", pdf_url="http://x")
 
     # Provide fake tex with author information
@@ -45,12 +52,55 @@ def test_extract_affiliations_parses_list():
 
     with (
         patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=fake_tex),
-        patch("alithia.core.arxiv_paper_utils.tiktoken") as mock_tiktoken,
+        patch("alithia.core.token_budget.get_encoder") as mock_get_encoder,
     ):
         mock_enc = Mock()
         mock_enc.encode.side_effect = lambda s: list(range(min(len(s), 8000)))
         mock_enc.decode.side_effect = lambda toks: "x" * len(toks)
-        mock_tiktoken.encoding_for_model.return_value = mock_enc
+        mock_get_encoder.return_value = mock_enc
 
         affs = extract_affiliations(p, fake_llm)
         assert set(affs) == {"Inst A", "Inst B"}
+
+
+@pytest.mark.unit
+def test_generate_tldr_and_affiliations_parses_json(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    p = ArxivPaper(title="t", summary="s", authors=["a", "b"], arxiv_id="x", pdf_url="http://x")
+    fake_tex = {"all": r"\author{Alice (Inst A) \and Bob (Inst B)} \maketitle \section{Introduction} intro"}
+    fake_llm = Mock()
+    fake_llm.chat_completion.return_value = (
+        '```json\n{"tldr": "A short summary.", "affiliations": ["Inst A", "Inst B", "Inst A"]}\n```'
+    )
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=fake_tex):
+        insights = generate_tldr_and_affiliations(p, fake_llm)
+
+    assert insights.tldr == "A short summary."
+    assert insights.affiliations == ["Inst A", "Inst B"]
+    assert fake_llm.chat_completion.call_count == 1
+    prompt = fake_llm.chat_completion.call_args.kwargs["messages"][1]["content"]
+    assert "Inst A" in prompt and "intro" in prompt
+
+
+@pytest.mark.unit
+def test_generate_tldr_and_affiliations_invalid_response_returns_none(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    p = ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id="y", pdf_url="http://x")
+    fake_llm = Mock()
+    fake_llm.chat_completion.return_value = "['Inst A']"
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=None):
+        assert generate_tldr_and_affiliations(p, fake_llm) is None
+
+
+@pytest.mark.unit
+def test_extract_affiliations_uses_parser_before_llm(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    p = ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id="z", pdf_url="http://x")
+    fake_tex = {"all": r"\author[1]{Alice}\affil[1]{Dept. of Physics, University of Tokyo, Japan} \maketitle"}
+    fake_llm = Mock()
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=fake_tex):
+        assert extract_affiliations(p, fake_llm) == ["University of Tokyo"]
+    fake_llm.chat_completion.assert_not_called()
@@ -0,0 +1,77 @@
+"""
+Unit tests for adaptive-depth cascade reranking.
+"""
+
+import numpy as np
+import pytest
+
+from alithia.core.cascade_ranker import CascadeRanker
+
+
+class _FakeService:
+    """Cross-encoder stand-in scoring texts from a lookup table and counting calls."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.scored = 0
+
+    def score_pairs(self, query, texts):
+        self.scored += len(texts)
+        return np.array([self.scores[t] for t in texts], dtype=np.float32)
+
+
+def _candidates(bi_scores):
+    return [{"text": f"c{i}", "id": i, "score": float(s)} for i, s in enumerate(bi_scores)]
+
+
+def _full_top(cross, top_k):
+    return sorted(range(len(cross)), key=lambda i: -cross[i])[:top_k]
+
+
+@pytest.mark.unit
+def test_easy_query_stops_early_with_same_top_k():
+    # A clear bi-encoder gap between the relevant head and the tail
+    bi = np.concatenate([np.linspace(0.9, 0.8, 8), np.linspace(0.3, 0.2, 42)])
+    cross = {f"c{i}": 10 * s for i, s in enumerate(bi)}
+    service = _FakeService(cross)
+    ranker = CascadeRanker(service, round_size=8)
+
+    ranked = ranker.rerank("q", _candidates(bi), top_k=5)
+
+    assert [c["id"] for c in ranked] == _full_top([cross[f"c{i}"] for i in range(50)], 5)
+    assert ranker.last_depth == service.scored < 50
+    assert ranker.history == [{"candidates": 50, "depth": ranker.last_depth}]
+
+
+@pytest.mark.unit
+def test_hard_query_goes_to_full_depth():
+    rng = np.random.default_rng(0)
+    bi = np.sort(rng.uniform(0.4, 0.5, size=30))[::-1]
+    # Cross-encoder disagrees with the bi-encoder: the best candidates sit at the bottom
+    cross = {f"c{i}": float(i) for i in range(30)}
+    service = _FakeService(cross)
+    ranker = CascadeRanker(service, round_size=8)
+
+    ranked = ranker.rerank("q", _candidates(bi), top_k=5)
+
+    assert ranker.last_depth == 30
+    assert [c["id"] for c in ranked] == [29, 28, 27, 26, 25]
+
+
+@pytest.mark.unit
+def test_candidates_are_scored_in_bi_encoder_order():
+    bi = [0.1, 0.9, 0.5]
+    service = _FakeService({"c0": 0.0, "c1": 2.0, "c2": 1.0})
+    ranker = CascadeRanker(service, round_size=1)
+
+    ranked = ranker.rerank("q", _candidates(bi), top_k=2)
+
+    assert [c["id"] for c in ranked] == [1, 2]
+    assert ranked[0]["rerank_score"] == 2.0
+
+
+@pytest.mark.unit
+def test_empty_candidates():
+    ranker = CascadeRanker(_FakeService({}))
+    assert ranker.rerank("q", [], top_k=3) == []
+    assert ranker.last_depth is None
@@ -0,0 +1,50 @@
+import pytest
+
+from alithia.core.code_link_extractor import extract_code_links, find_code_url
+from alithia.core.paper import ArxivPaper
+from alithia.core.tex_cache import LazyTex
+
+
+def _paper(summary="We propose a method.", arxiv_id="2401.00001"):
+    return ArxivPaper(title="t", summary=summary, authors=["a"], arxiv_id=arxiv_id, pdf_url="http://x")
+
+
+@pytest.mark.unit
+def test_extract_code_links_normalizes_repositories():
+    links = extract_code_links(
+        "see github.com/foo/bar/tree/main/src, https://gitlab.com/group/sub/repo/-/blob/main/x.py "
+        "and https://huggingface.co/spaces/owner/demo."
+    )
+    assert [c.url for c in links] == [
+        "https://github.com/foo/bar",
+        "https://gitlab.com/group/sub/repo",
+        "https://huggingface.co/spaces/owner/demo",
+    ]
+
+
+@pytest.mark.unit
+def test_find_code_url_prefers_abstract_link():
+    paper = _paper("We propose X. Code is available at https://github.com/foo/bar.")
+    tex = {"all": r"Our code: \url{https://github.com/foo/other}"}
+    assert find_code_url(paper, tex) == "https://github.com/foo/bar"
+
+
+@pytest.mark.unit
+def test_find_code_url_ranks_tex_links_by_context():
+    tex = {
+        "all": r"We build on \url{https://github.com/huggingface/transformers} and LoRA "
+        r"\url{https://github.com/microsoft/LoRA}. \footnote{Our code: \url{https://github.com/me/my\_repo/tree/main}}"
+    }
+    assert find_code_url(_paper(), tex) == "https://github.com/me/my_repo"
+    # Links to related work without code wording are not taken as the paper's code
+    assert find_code_url(_paper(), {"all": r"Baseline \cite{x} uses https://github.com/other/thing"}) is None
+
+
+@pytest.mark.unit
+def test_find_code_url_reads_cached_source(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    LazyTex.spill(
+        "2401.00001", {"all": r"The implementation is released at \href{https://github.com/me/repo}{GitHub}."}
+    )
+    assert find_code_url(_paper()) == "https://github.com/me/repo"
+    assert find_code_url(_paper(arxiv_id="2401.00002")) is None
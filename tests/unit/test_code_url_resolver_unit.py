@@ -0,0 +1,107 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from alithia.core.code_url_resolver import CodeURLResolver
+
+
+class _MockPapersWithCodeHandler(BaseHTTPRequestHandler):
+    """Stand-in for the paperswithcode papers and repositories endpoints."""
+
+    repos = {"1111.0001": "https://github.com/a/one", "1111.0002": "https://github.com/b/two"}
+    slow = {"1111.0009"}
+    failing = {"1111.0005"}
+    latency = 0.2
+    requests = []
+    lock = threading.Lock()
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.lock:
+            self.requests.append(self.path)
+        if "arxiv_id=" in self.path:
+            arxiv_id = self.path.split("arxiv_id=")[1]
+            time.sleep(2.0 if arxiv_id in self.slow else self.latency)
+            if arxiv_id in self.failing:
+                self._send(404, {})
+            elif arxiv_id in self.repos:
+                self._send(200, {"count": 1, "results": [{"id": f"paper-{arxiv_id}"}]})
+            else:
+                self._send(200, {"count": 0, "results": []})
+        else:
+            arxiv_id = self.path.split("/")[-3].replace("paper-", "")
+            self._send(200, {"count": 1, "results": [{"url": self.repos[arxiv_id]}]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def resolver(tmp_path):
+    _MockPapersWithCodeHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockPapersWithCodeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield CodeURLResolver(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        max_workers=8,
+        request_timeout=5.0,
+        negative_ttl_seconds=60,
+        cache_path=str(tmp_path / "code_urls.sqlite3"),
+    )
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_resolve_many_runs_concurrently_and_caches_results(resolver):
+    ids = ["1111.0001", "1111.0002", "1111.0003", "1111.0004"]
+
+    start = time.monotonic()
+    urls = resolver.resolve_many(ids, deadline=5)
+    assert time.monotonic() - start < 0.6  # four sequential lookups take at least 0.8s
+
+    assert urls == {
+        "1111.0001": "https://github.com/a/one",
+        "1111.0002": "https://github.com/b/two",
+        "1111.0003": None,
+        "1111.0004": None,
+    }
+    n_requests = len(_MockPapersWithCodeHandler.requests)
+    assert resolver.resolve_many(ids) == urls
+    assert len(_MockPapersWithCodeHandler.requests) == n_requests
+    assert resolver.stats["cache_hits"] == 4
+
+
+@pytest.mark.unit
+def test_negative_results_expire_before_positive_ones(resolver):
+    resolver.resolve_many(["1111.0001", "1111.0003"])
+    with patch("alithia.core.code_url_resolver.time.time", return_value=time.time() + 120):
+        resolver.resolve("1111.0001")
+        resolver.resolve("1111.0003")
+    assert resolver.stats["cache_hits"] == 1
+    assert resolver.stats["lookups"] == 3
+
+
+@pytest.mark.unit
+def test_resolve_many_honors_deadline_and_does_not_cache_errors(resolver):
+    start = time.monotonic()
+    urls = resolver.resolve_many(["1111.0001", "1111.0005", "1111.0009"], deadline=0.5)
+    assert time.monotonic() - start < 1.0
+
+    assert urls == {"1111.0001": "https://github.com/a/one", "1111.0005": None}
+    assert resolver.stats["timeouts"] == 1
+    assert resolver.stats["errors"] == 1
+    resolver.resolve("1111.0005")
+    assert resolver.stats["lookups"] == 4
@@ -0,0 +1,200 @@
+"""
+Unit tests for SMTP delivery against a local aiosmtpd server.
+"""
+
+import socket
+from unittest.mock import patch
+
+import pytest
+
+from alithia.core.email_delivery import DeliveryReport, OutgoingEmail, SMTPSender
+from alithia.core.researcher.connected import EmailConnection
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class _Handler:
+    """Accepts messages, optionally rejecting some by sequence number."""
+
+    def __init__(self, replies=None):
+        self.replies = replies or {}
+        self.attempts = 0
+        self.delivered = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.attempts += 1
+        self.sessions.add(id(session))
+        reply = self.replies.get(self.attempts)
+        if reply:
+            return reply
+        self.delivered.append((envelope.rcpt_tos[0], envelope.content.decode("utf-8", "replace")))
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(handler):
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=_free_port())
+        controller.start()
+        servers.append(controller)
+        return controller
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def _sender(controller, **kwargs):
+    kwargs.setdefault("backoff", 0.01)
+    return SMTPSender(controller.hostname, controller.port, "bot@example.com", "", security="none", **kwargs)
+
+
+def _emails(n):
+    return [
+        OutgoingEmail(receiver=f"user{i}@example.com", subject="Digest", html_content=f"<p>{i}</p>") for i in range(n)
+    ]
+
+
+@pytest.mark.unit
+def test_send_reuses_one_connection(smtp_server):
+    handler = _Handler()
+    controller = smtp_server(handler)
+
+    report = _sender(controller).send(_emails(5))
+
+    assert report.sent == 5 and report.failed == 0
+    assert report.reconnects == 0
+    assert len(handler.sessions) == 1
+    assert [rcpt for rcpt, _ in handler.delivered] == [f"user{i}@example.com" for i in range(5)]
+    assert report.messages_per_second > 0
+
+
+@pytest.mark.unit
+def test_send_recycles_connection_after_limit(smtp_server):
+    handler = _Handler()
+    controller = smtp_server(handler)
+
+    report = _sender(controller, max_messages_per_connection=2).send(_emails(5))
+
+    assert report.sent == 5
+    assert report.reconnects == 2
+    assert len(handler.sessions) == 3
+
+
+@pytest.mark.unit
+def test_send_retries_rate_limited_message(smtp_server):
+    handler = _Handler({1: "451 4.7.1 Rate limited, slow down"})
+    controller = smtp_server(handler)
+
+    report = _sender(controller).send(_emails(2))
+
+    assert report.sent == 2 and report.failed == 0
+    assert report.rate_limited == 1
+    assert report.reconnects == 0
+    assert len(handler.delivered) == 2
+
+
+@pytest.mark.unit
+def test_send_reconnects_after_server_closes(smtp_server):
+    handler = _Handler({2: "421 4.7.0 Too many messages, closing connection"})
+    controller = smtp_server(handler)
+
+    report = _sender(controller).send(_emails(3))
+
+    assert report.sent == 3
+    assert report.reconnects == 1
+    assert len(handler.sessions) == 2
+
+
+@pytest.mark.unit
+def test_send_records_permanent_failure_and_continues(smtp_server):
+    handler = _Handler({1: "550 5.1.1 Mailbox unavailable"})
+    controller = smtp_server(handler)
+
+    report = _sender(controller).send(_emails(3))
+
+    assert report.sent == 2 and report.failed == 1
+    assert "user0@example.com" in report.failures
+    assert "550" in report.failures["user0@example.com"]
+
+
+@pytest.mark.unit
+def test_send_gives_up_after_max_retries(smtp_server):
+    handler = _Handler({i: "451 4.7.1 Try again later" for i in range(1, 10)})
+    controller = smtp_server(handler)
+
+    report = _sender(controller, max_retries=2).send(_emails(1))
+
+    assert report.sent == 0 and report.failed == 1
+    assert handler.attempts == 3
+
+
+@pytest.mark.unit
+def test_send_reports_unreachable_server():
+    sender = SMTPSender("127.0.0.1", _free_port(), "bot@example.com", "", security="none", timeout=2)
+
+    report = sender.send(_emails(2))
+
+    assert report.sent == 0 and report.failed == 2
+
+
+@pytest.mark.unit
+def test_auto_security_falls_back_to_ssl_when_plain_connect_fails():
+    sender = SMTPSender("smtp.example.com", 465, "bot@example.com", "secret", security="auto")
+
+    with patch("alithia.core.email_delivery.smtplib") as smtplib:
+        smtplib.SMTP.side_effect = ConnectionResetError("connection reset by peer")
+        sender.connect()
+
+    smtplib.SMTP_SSL.assert_called_once_with("smtp.example.com", 465, timeout=sender.timeout)
+    smtplib.SMTP_SSL.return_value.login.assert_called_once_with("bot@example.com", "secret")
+
+
+@pytest.mark.unit
+def test_starttls_security_does_not_fall_back_to_ssl():
+    sender = SMTPSender("smtp.example.com", 465, "bot@example.com", "secret", security="starttls")
+
+    with patch("alithia.core.email_delivery.smtplib") as smtplib:
+        smtplib.SMTP.side_effect = ConnectionResetError("connection reset by peer")
+        with pytest.raises(ConnectionResetError):
+            sender.connect()
+
+    smtplib.SMTP_SSL.assert_not_called()
+
+
+@pytest.mark.unit
+def test_delivery_report_throughput():
+    assert DeliveryReport(sent=10, elapsed_seconds=2.0).messages_per_second == 5.0
+    assert DeliveryReport().messages_per_second == 0.0
+
+
+@pytest.mark.unit
+def test_sender_rejects_unknown_security():
+    with pytest.raises(ValueError):
+        SMTPSender("localhost", 25, "a@b.c", "", security="tls")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("field", ["smtp_server", "smtp_port", "sender", "sender_password"])
+def test_from_connection_rejects_incomplete_config(field):
+    values = {
+        "smtp_server": "smtp.example.com",
+        "smtp_port": 587,
+        "sender": "bot@example.com",
+        "sender_password": "secret",
+        "receiver": "you@example.com",
+    }
+    assert SMTPSender.from_connection(EmailConnection(**values)).password == "secret"
+
+    values[field] = 0 if field == "smtp_port" else ""
+    with pytest.raises(ValueError, match="not set correctly"):
+        SMTPSender.from_connection(EmailConnection(**values))
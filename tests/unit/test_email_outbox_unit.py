@@ -0,0 +1,154 @@
+"""
+Unit tests for the durable email outbox.
+"""
+
+import os
+import time
+
+import pytest
+
+from alithia.core.email_delivery import DeliveryReport, OutgoingEmail
+from alithia.core.email_outbox import EmailOutbox
+
+
+class _FakeSender:
+    """Records enqueued emails and fails the receivers it is told to."""
+
+    def __init__(self, failing=(), error=None):
+        self.failing = set(failing)
+        self.error = error
+        self.queue = []
+        self.sent = []
+
+    def enqueue(self, email):
+        self.queue.append(email)
+
+    def send_all(self):
+        if self.error:
+            raise self.error
+        report = DeliveryReport()
+        for email in self.queue:
+            if email.receiver in self.failing:
+                report.failed += 1
+                report.failures[email.id] = "451 try again later"
+            else:
+                report.sent += 1
+                self.sent.append(email)
+        self.queue = []
+        return report
+
+
+def _emails(*receivers):
+    return [OutgoingEmail(receiver=r, subject="Daily arXiv", html_content=f"<p>{r}</p>") for r in receivers]
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return EmailOutbox(path=str(tmp_path / "outbox"), max_attempts=3, backoff_seconds=60)
+
+
+@pytest.mark.unit
+def test_spool_persists_entries_in_order(outbox):
+    ids = outbox.spool(_emails("a@x.org", "b@x.org"))
+
+    reopened = EmailOutbox(path=outbox.path)
+    pending = reopened.pending()
+    assert [e.id for e in pending] == ids
+    assert [e.receiver for e in pending] == ["a@x.org", "b@x.org"]
+    assert pending[0].html_content == "<p>a@x.org</p>"
+
+
+@pytest.mark.unit
+def test_drain_removes_delivered_entries(outbox):
+    outbox.spool(_emails("a@x.org", "b@x.org"))
+    sender = _FakeSender()
+
+    report = outbox.drain(sender)
+
+    assert report.sent == 2
+    assert [e.receiver for e in sender.sent] == ["a@x.org", "b@x.org"]
+    assert outbox.pending() == []
+    assert os.listdir(os.path.join(outbox.path, "sending")) == []
+
+
+@pytest.mark.unit
+def test_drain_reschedules_failed_entries_with_backoff(outbox):
+    outbox.spool(_emails("a@x.org", "b@x.org"))
+
+    report = outbox.drain(_FakeSender(failing={"b@x.org"}))
+
+    assert report.sent == 1 and report.failed == 1
+    (entry,) = outbox.pending()
+    assert entry.receiver == "b@x.org"
+    assert entry.attempts == 1
+    assert entry.last_error == "451 try again later"
+    assert entry.next_attempt_at >= time.time() + 50
+
+    # Not due yet, so a second drain sends nothing
+    sender = _FakeSender()
+    assert outbox.drain(sender).sent == 0
+    assert sender.sent == []
+
+
+@pytest.mark.unit
+def test_drain_moves_exhausted_entries_to_dead(outbox):
+    outbox.spool(_emails("a@x.org"))
+    outbox.backoff_seconds = 0
+
+    for _ in range(3):
+        outbox.drain(_FakeSender(failing={"a@x.org"}))
+
+    assert outbox.pending() == []
+    (entry,) = outbox.dead()
+    assert entry.attempts == 3
+
+
+@pytest.mark.unit
+def test_drain_reschedules_entries_when_sender_crashes(outbox):
+    outbox.spool(_emails("a@x.org"))
+
+    report = outbox.drain(_FakeSender(error=RuntimeError("boom")))
+
+    assert report.failed == 1
+    (entry,) = outbox.pending()
+    assert entry.attempts == 1 and entry.last_error == "boom"
+
+
+@pytest.mark.unit
+def test_stale_recovery_uses_claim_time_not_mtime(outbox):
+    (entry_id,) = outbox.spool(_emails("a@x.org"))
+    # A rescheduled entry keeps the old mtime of its pending file when claimed
+    old = time.time() - outbox.stale_seconds - 10
+    os.utime(os.path.join(outbox.path, "pending", f"{entry_id}.json"), (old, old))
+    (entry,) = outbox.pending()
+    claimed = outbox._claim(entry)
+
+    outbox._recover_stale(time.time())
+    assert os.path.exists(claimed) and outbox.pending() == []
+
+    outbox._recover_stale(time.time() + outbox.stale_seconds + 10)
+    assert [e.id for e in outbox.pending()] == [entry_id]
+
+
+@pytest.mark.unit
+def test_drain_recovers_stale_claims(outbox):
+    # Claimed by an older version, without the claim time in the name
+    (entry_id,) = outbox.spool(_emails("a@x.org"))
+    claimed = os.path.join(outbox.path, "sending", f"{entry_id}.json")
+    os.replace(os.path.join(outbox.path, "pending", f"{entry_id}.json"), claimed)
+
+    sender = _FakeSender()
+    assert outbox.drain(sender).sent == 0
+
+    old = time.time() - outbox.stale_seconds - 10
+    os.utime(claimed, (old, old))
+    assert outbox.drain(sender).sent == 1
+    assert outbox.pending() == []
+
+
+@pytest.mark.unit
+def test_drain_respects_limit(outbox):
+    outbox.spool(_emails("a@x.org", "b@x.org", "c@x.org"))
+
+    assert outbox.drain(_FakeSender(), limit=2).sent == 2
+    assert [e.receiver for e in outbox.pending()] == ["c@x.org"]
@@ -1,6 +1,12 @@
 import pytest
 
-from alithia.core.email_utils import create_empty_email_html, create_paper_html, get_stars_html
+from alithia.core.email_utils import (
+    CompiledTemplate,
+    EmailRenderer,
+    create_empty_email_html,
+    create_paper_html,
+    get_stars_html,
+)
 from alithia.core.paper import ArxivPaper, ScoredPaper
 
 
@@ -39,3 +45,52 @@ def test_create_paper_html_includes_fields():
     assert "arXiv ID" in html
     assert "Relevance" in html
     assert "Code" in html
+
+
+def _scored(score=9.0, tldr="A summary", arxiv_id="1234.5678"):
+    paper = ArxivPaper(
+        title="An Interesting Paper",
+        summary="Summary",
+        authors=["Alice"],
+        arxiv_id=arxiv_id,
+        pdf_url="http://x",
+        tldr=tldr,
+    )
+    return ScoredPaper(paper=paper, score=score)
+
+
+@pytest.mark.unit
+def test_compiled_template_matches_str_format():
+    template = "<style>a {{ color: red; }}</style><p>{content}</p>"
+    assert CompiledTemplate(template).render(content="hi") == template.format(content="hi")
+
+
+@pytest.mark.unit
+def test_renderer_reuses_fragments_per_score_bucket_and_tldr():
+    renderer = EmailRenderer()
+    html = renderer.render_digest([_scored(score=9.0), _scored(score=9.5)])
+    assert renderer.stats == {"hits": 1, "misses": 1}
+    assert html.count("An Interesting Paper") == 2
+
+    renderer.render_paper(_scored(score=7.0))
+    renderer.render_paper(_scored(tldr="Another summary"))
+    assert renderer.stats["misses"] == 3
+    assert "Another summary" in renderer.render_paper(_scored(tldr="Another summary"))
+
+
+@pytest.mark.unit
+def test_renderer_renders_again_after_authors_change():
+    renderer = EmailRenderer()
+    sp = _scored()
+    renderer.render_paper(sp)
+
+    sp.paper.authors = ["Alice", "Bob"]
+    assert "Alice, Bob" in renderer.render_paper(sp)
+    assert renderer.stats == {"hits": 0, "misses": 2}
+
+
+@pytest.mark.unit
+def test_renderer_output_matches_paper_html():
+    sp = _scored()
+    assert create_paper_html(sp) in EmailRenderer().render_digest([sp])
+    assert "No Papers Today" in EmailRenderer().render_digest([])
@@ -0,0 +1,126 @@
+"""
+Unit tests for the two-tier embedding cache.
+"""
+
+import os
+import time
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from alithia.core.embedding import EmbeddingService
+from alithia.core.embedding_cache import EmbeddingCache
+
+
+def _vectors(n, dim=4, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+@pytest.mark.unit
+def test_cache_round_trip_in_input_order(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path))
+    vectors = _vectors(3)
+    cache.put_many("m", True, ["a", "b", "c"], vectors)
+
+    result = cache.get_many("m", True, ["c", "x", "a"])
+
+    np.testing.assert_array_equal(result[0], vectors[2])
+    assert result[1] is None
+    np.testing.assert_array_equal(result[2], vectors[0])
+    assert cache.stats == {"memory_hits": 2, "disk_hits": 0, "misses": 1}
+
+
+@pytest.mark.unit
+def test_cache_persists_across_instances(tmp_path):
+    vectors = _vectors(2)
+    EmbeddingCache(path=str(tmp_path)).put_many("m", True, ["a", "b"], vectors)
+    EmbeddingCache(path=str(tmp_path)).put_many("m", True, ["b", "c"], _vectors(2, seed=1))
+
+    cache = EmbeddingCache(path=str(tmp_path))
+    a, b, c = cache.get_many("m", True, ["a", "b", "c"])
+
+    np.testing.assert_array_equal(a, vectors[0])
+    # The first stored vector of a text is kept
+    np.testing.assert_array_equal(b, vectors[1])
+    np.testing.assert_array_equal(c, _vectors(2, seed=1)[1])
+    assert cache.stats["disk_hits"] == 3
+
+
+@pytest.mark.unit
+def test_cache_separates_models_and_normalization(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path))
+    cache.put_many("m", True, ["a"], _vectors(1))
+
+    assert cache.get_many("m", False, ["a"]) == [None]
+    assert cache.get_many("other", True, ["a"]) == [None]
+
+
+@pytest.mark.unit
+def test_memory_tier_is_bounded(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path), memory_entries=2)
+    cache.put_many("m", True, ["a", "b", "c"], _vectors(3))
+
+    cache.get_many("m", True, ["a", "b", "c"])
+
+    assert cache.stats["disk_hits"] == 1 and cache.stats["memory_hits"] == 2
+
+
+@pytest.mark.unit
+def test_disk_tier_is_compacted_to_recently_used_vectors(tmp_path):
+    vectors = _vectors(10)
+    writer = EmbeddingCache(path=str(tmp_path), memory_entries=0, max_entries=5)
+    reader = EmbeddingCache(path=str(tmp_path), memory_entries=0, max_entries=5)
+    writer.put_many("m", True, [f"t{i}" for i in range(4)], vectors[:4])
+    # Maps the first file generation
+    np.testing.assert_array_equal(reader.get_many("m", True, ["t3"])[0], vectors[3])
+
+    with patch("alithia.core.embedding_cache.time.time", return_value=time.time() + 7200):
+        reader.get_many("m", True, ["t0"])
+        writer.put_many("m", True, [f"t{i}" for i in range(4, 7)], vectors[4:7])
+
+    # 7 vectors exceed the cap, so the 4 most recently used are kept
+    result = reader.get_many("m", True, [f"t{i}" for i in range(7)])
+    assert [r is not None for r in result] == [True, False, False, False, True, True, True]
+    for i in (0, 4, 5, 6):
+        np.testing.assert_array_equal(result[i], vectors[i])
+    assert len([f for f in os.listdir(writer._store("m", True).directory) if f.endswith(".f32")]) == 1
+
+    writer.put_many("m", True, ["t7"], vectors[7:8])
+    np.testing.assert_array_equal(reader.get_many("m", True, ["t7"])[0], vectors[7])
+
+
+@pytest.mark.unit
+def test_embed_texts_encodes_only_misses(tmp_path):
+    service = EmbeddingService(embedding_cache=EmbeddingCache(path=str(tmp_path)))
+    service.embedder = Mock()
+    service.embedder.encode.side_effect = lambda texts, **kw: np.array(
+        [[float(len(t)), 1.0] for t in texts], dtype=np.float32
+    )
+
+    first = service.embed_texts(["aa", "b"])
+    second = service.embed_texts(["b", "ccc", "aa", "ccc"])
+
+    assert service.embedder.encode.call_count == 2
+    assert service.embedder.encode.call_args.args[0] == ["ccc"]
+    np.testing.assert_array_equal(first, [[2, 1], [1, 1]])
+    np.testing.assert_array_equal(second, [[1, 1], [3, 1], [2, 1], [3, 1]])
+    assert second.dtype == np.float32
+
+
+@pytest.mark.unit
+def test_output_dim_truncates_renormalizes_and_shares_cache(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path))
+    full = EmbeddingService(embedding_cache=cache)
+    small = EmbeddingService(embedding_cache=cache, output_dim=2)
+    for service in (full, small):
+        service.embedder = Mock()
+        service.embedder.encode.return_value = np.array([[0.6, 0.0, 0.8, 0.0]], dtype=np.float32)
+
+    vectors = small.embed_texts(["a"])
+    assert vectors.shape == (1, 2)
+    np.testing.assert_allclose(vectors, [[1.0, 0.0]])
+
+    # The full-size embedding was cached and serves the other service without encoding
+    np.testing.assert_allclose(full.embed_texts(["a"]), [[0.6, 0.0, 0.8, 0.0]])
+    full.embedder.encode.assert_not_called()
@@ -1,9 +1,10 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import numpy as np
 import pytest
 
 from alithia.core.embedding import EmbeddingService, cosine_similarity_matrix
+from alithia.core.rerank_cache import RerankScoreCache
 
 
 @pytest.mark.unit
@@ -18,7 +19,7 @@ def test_cosine_similarity_matrix_basic():
 
 @pytest.mark.unit
 def test_rerank_with_mock_reranker():
-    service = EmbeddingService.__new__(EmbeddingService)
+    service = EmbeddingService()
     service.reranker = Mock()
     # scores correspond to candidates in order
     service.reranker.predict.return_value = [0.1, 0.9, 0.5]
@@ -36,6 +37,97 @@ def test_rerank_with_mock_reranker():
 
 @pytest.mark.unit
 def test_rerank_with_empty_candidates():
-    service = EmbeddingService.__new__(EmbeddingService)
+    service = EmbeddingService()
     ranked = EmbeddingService.rerank(service, "q", [], top_k=3)
     assert ranked == []
+
+
+@pytest.mark.unit
+def test_models_load_lazily_and_independently():
+    with (
+        patch("sentence_transformers.SentenceTransformer") as embedder_cls,
+        patch("sentence_transformers.CrossEncoder") as reranker_cls,
+    ):
+        embedder_cls.return_value.encode.return_value = np.ones((1, 2))
+        service = EmbeddingService()
+        embedder_cls.assert_not_called()
+        reranker_cls.assert_not_called()
+
+        service.embed_texts(["hello"])
+        service.embed_texts(["again"])
+
+        embedder_cls.assert_called_once_with("mixedbread-ai/mxbai-embed-large-v1")
+        reranker_cls.assert_not_called()
+        assert service.is_loaded("embedder") and not service.is_loaded("reranker")
+        assert "embedder" in service.load_seconds
+
+
+@pytest.mark.unit
+def test_warmup_and_unload():
+    with (
+        patch("sentence_transformers.SentenceTransformer") as embedder_cls,
+        patch("sentence_transformers.CrossEncoder") as reranker_cls,
+    ):
+        reranker_cls.return_value.predict.return_value = [0.5]
+        service = EmbeddingService()
+        load_seconds = service.warmup(embedder=False)
+        assert set(load_seconds) == {"reranker"}
+        embedder_cls.assert_not_called()
+
+        service.warmup()
+        service.unload(embedder=False)
+        assert service.is_loaded("embedder") and not service.is_loaded("reranker")
+
+        service.rerank("q", [{"text": "c"}])
+        assert reranker_cls.call_count == 2
+
+
+@pytest.mark.unit
+def test_rerank_batches_and_truncates_pairs():
+    service = EmbeddingService(rerank_batch_size=2, rerank_max_tokens=4)
+    service.reranker = Mock()
+    service.reranker.predict.return_value = [0.3, 0.2]
+
+    service.rerank("q", [{"text": "x" * 1000}, {"text": "short"}], top_k=2)
+
+    pairs = service.reranker.predict.call_args.args[0]
+    assert service.reranker.predict.call_args.kwargs["batch_size"] == 2
+    assert pairs == [("q", "x" * 32), ("q", "short")]
+
+
+@pytest.mark.unit
+def test_rerank_reuses_cached_scores(tmp_path):
+    cache = RerankScoreCache(path=str(tmp_path / "scores.sqlite3"))
+    service = EmbeddingService(score_cache=cache)
+    service.reranker = Mock()
+    service.reranker.predict.return_value = [0.1, 0.9]
+    candidates = [{"text": "c0", "id": 0}, {"text": "c1", "id": 1}]
+
+    first = service.rerank("q", candidates, top_k=2)
+    service.reranker.predict.return_value = [0.5]
+    second = service.rerank("q", candidates + [{"text": "c2", "id": 2}], top_k=3)
+
+    assert [c["id"] for c in first] == [1, 0]
+    assert [c["id"] for c in second] == [1, 2, 0]
+    # Only the new candidate was scored on the second call
+    assert service.reranker.predict.call_args.args[0] == [("q", "c2")]
+    assert service.rerank_stats == {"cache_hits": 2, "scored": 3}
+
+    # Another query or truncation window does not share scores
+    assert cache.get_many(f"{service.reranker_model_name}@512", "other", ["c0"]) == [None]
+    assert cache.get_many(f"{service.reranker_model_name}@256", "q", ["c0"]) == [None]
+
+
+@pytest.mark.unit
+def test_rerank_top_k_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.normal(size=200)
+    service = EmbeddingService()
+    service.reranker = Mock()
+    service.reranker.predict.return_value = scores
+    candidates = [{"text": f"c{i}", "id": i} for i in range(200)]
+
+    ranked = service.rerank("q", candidates, top_k=10)
+
+    expected = sorted(range(200), key=lambda i: float(np.float32(scores[i])), reverse=True)[:10]
+    assert [c["id"] for c in ranked] == expected
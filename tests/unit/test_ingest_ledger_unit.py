@@ -0,0 +1,221 @@
+"""
+Unit tests for the content-hash ingest ledger.
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from alithia.core.ingest_ledger import IngestLedger, content_hash
+from alithia.core.local_vector_store import LocalVectorStore
+from alithia.core.paper import ArxivPaper
+
+
+@pytest.mark.unit
+def test_content_hash_is_canonical():
+    assert content_hash({"a": 1, "b": 2}, "m") == content_hash({"b": 2, "a": 1}, "m")
+    assert content_hash({"a": 1}, "m") != content_hash({"a": 1}, "other")
+
+
+@pytest.mark.unit
+def test_diff_reports_only_the_delta(tmp_path):
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    first = {"a": "1", "b": "2", "c": "3"}
+    assert ledger.diff("s", first).changed == ["a", "b", "c"]
+    ledger.record("s", first)
+
+    diff = ledger.diff("s", {"a": "1", "b": "changed", "d": "4"})
+
+    assert diff.changed == ["b", "d"]
+    assert diff.unchanged == ["a"]
+    assert diff.removed == []
+    assert ledger.diff("other", first).changed == ["a", "b", "c"]
+
+
+@pytest.mark.unit
+def test_group_diff_reports_removed_items(tmp_path):
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    ledger.record("s", {"doc:0": "x", "doc:1": "y"}, group="doc")
+    ledger.record("s", {"other:0": "z"}, group="other")
+
+    diff = ledger.diff("s", {"doc:0": "x"}, group="doc")
+    assert diff.is_empty is False
+    assert diff.removed == ["doc:1"]
+
+    ledger.record("s", {}, group="doc", removed=diff.removed)
+    assert ledger.diff("s", {"doc:0": "x"}, group="doc").is_empty
+
+
+def _unit(n, dim=4):
+    x = np.random.default_rng(n).normal(size=(n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def lens_env(tmp_path, monkeypatch):
+    """Lens services backed by a local vector store, a mocked table store and a fresh ledger."""
+    from alithia.agents.lens import nodes
+
+    monkeypatch.setenv("VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(tmp_path / "storeA"))
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(b"%PDF v1")
+    embed = MagicMock(embedding_model_name="m", output_dim=None)
+    embed.embed_texts.side_effect = lambda texts: _unit(len(texts))
+    processor = MagicMock()
+    processor.return_value.process.return_value = [
+        {"id": "c0", "text": "alpha", "page": 1},
+        {"id": "c1", "text": "beta", "page": 1},
+    ]
+    table_store = MagicMock()
+    table_store.return_value.store_id = "supabase:test"
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    with (
+        patch.object(nodes, "get_embedding_service", return_value=embed),
+        patch.object(nodes, "SupabaseTableStore", table_store),
+        patch.object(nodes, "PDFProcessor", processor),
+        patch.object(nodes, "get_ingest_ledger", return_value=ledger),
+    ):
+        yield {
+            "load": lambda: nodes.load_paper_node({"user_input": f"load {pdf_path}"}),
+            "pdf_path": pdf_path,
+            "embed": embed,
+            "processor": processor.return_value,
+            "table": table_store.return_value,
+            "store": lambda name: LocalVectorStore("alithia-lens", path=str(tmp_path / name)),
+        }
+
+
+@pytest.mark.unit
+def test_load_paper_writes_only_changed_chunks(lens_env):
+    lens_env["load"]()
+    assert lens_env["store"]("storeA").count() == 2
+    assert len(lens_env["table"].upsert_rows.call_args.args[1]) == 2
+
+    # Same file again: nothing is parsed, embedded or written
+    lens_env["processor"].process.reset_mock()
+    lens_env["embed"].embed_texts.reset_mock()
+    lens_env["table"].reset_mock()
+    result = lens_env["load"]()
+    assert result["current_paper"]["id"] == "paper"
+    lens_env["processor"].process.assert_not_called()
+    lens_env["embed"].embed_texts.assert_not_called()
+    lens_env["table"].upsert_rows.assert_not_called()
+
+    # New revision with one chunk edited and one dropped
+    lens_env["pdf_path"].write_bytes(b"%PDF v2")
+    lens_env["processor"].process.return_value = [{"id": "c0", "text": "alpha (revised)", "page": 1}]
+    lens_env["load"]()
+
+    assert lens_env["embed"].embed_texts.call_args.args[0] == ["alpha (revised)"]
+    store = lens_env["store"]("storeA")
+    assert store.existing_ids(["paper:c0", "paper:c1"]) == {"paper:c0"}
+    lens_env["table"].delete_rows.assert_called_once_with("lens_chunks", ["paper:c1"])
+    # Only the columns of the existing lens_documents table are written
+    assert set(lens_env["table"].upsert_document.call_args.kwargs["doc"]) == {"id", "source_path", "num_chunks"}
+
+
+@pytest.mark.unit
+def test_load_paper_writes_again_after_switching_or_wiping_stores(lens_env, monkeypatch):
+    lens_env["load"]()
+
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(lens_env["pdf_path"].parent / "storeB"))
+    lens_env["load"]()
+    assert lens_env["store"]("storeB").count() == 2
+
+    # The store lost the document behind the ledger's back (wiped, or an index recreated under the same name)
+    lens_env["store"]("storeB").delete(["paper:c0", "paper:c1"])
+    lens_env["embed"].embed_texts.reset_mock()
+    lens_env["load"]()
+    assert lens_env["store"]("storeB").count() == 2
+    assert lens_env["embed"].embed_texts.call_args.args[0] == ["alpha", "beta"]
+
+
+@pytest.mark.unit
+def test_verify_and_expired(tmp_path):
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    ledger.record("s", {"a": "1", "b": "2"})
+
+    diff = ledger.diff("s", {"a": "1", "b": "2"}, verify=lambda ids: {"a"} & set(ids))
+    assert (diff.changed, diff.unchanged) == (["b"], ["a"])
+
+    assert ledger.expired("s", 3600) == []
+    with patch("alithia.core.ingest_ledger.time.time", return_value=time.time() + 7200):
+        ledger.record("s", {"a": "1"})
+        assert ledger.expired("s", 3600) == ["b"]
+
+
+def _papers(*ids, summary="s"):
+    return [ArxivPaper(title=f"Paper {i}", summary=summary, authors=[], arxiv_id=i, pdf_url="") for i in ids]
+
+
+@pytest.mark.unit
+def test_vigil_scan_writes_only_changed_rows_and_prunes_expired(tmp_path):
+    from alithia.agents.vigil import nodes
+
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    state = MagicMock()
+    state.config.topics = ["cs.AI"]
+    with (
+        patch.object(nodes, "SupabaseTableStore") as table_store,
+        patch.object(nodes, "get_ingest_ledger", return_value=ledger),
+        patch.object(nodes, "_fetch_arxiv_by_topics") as fetch,
+    ):
+        table = table_store.return_value
+        table.store_id = "supabase:test"
+        fetch.return_value = _papers("1", "2", "3")
+        nodes.scan_sources_node(state)
+        assert [r["id"] for r in table.upsert_rows.call_args.args[1]] == ["1", "2", "3"]
+
+        table.reset_mock()
+        fetch.return_value = _papers("1", "2", "3")[:2] + _papers("3", summary="revised")
+        nodes.scan_sources_node(state)
+        assert [r["id"] for r in table.upsert_rows.call_args.args[1]] == ["3"]
+        table.delete_rows.assert_not_called()
+
+        # Items gone from the feed for longer than the retention period are deleted
+        fetch.return_value = _papers("3", summary="revised")
+        with patch("alithia.core.ingest_ledger.time.time", return_value=time.time() + 31 * 86400):
+            nodes.scan_sources_node(state)
+        table.delete_rows.assert_called_once()
+        assert sorted(table.delete_rows.call_args.args[1]) == ["1", "2"]
+        assert ledger.diff("supabase:test/vigil_items", {"1": "x"}).changed == ["1"]
+
+
+@pytest.mark.unit
+def test_vigil_filter_upserts_only_changed_papers(tmp_path, monkeypatch):
+    from alithia.agents.vigil import nodes
+
+    monkeypatch.setenv("VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    ledger = IngestLedger(path=str(tmp_path / "ledger.sqlite3"))
+    embed = MagicMock(embedding_model_name="m", output_dim=None)
+    embed.embed_texts.side_effect = lambda texts: _unit(len(texts))
+    embed.score_pairs.side_effect = lambda query, texts: np.ones(len(texts))
+    store = LocalVectorStore("alithia-research", namespace="vigil", path=str(tmp_path / "vectors"))
+
+    def run(papers):
+        state = MagicMock()
+        state.config.topics = ["cs.AI"]
+        state.get.side_effect = {"discovered_papers": papers}.get
+        return nodes.filter_results_node(state)["performance_metrics"]
+
+    with (
+        patch.object(nodes, "get_embedding_service", return_value=embed),
+        patch.object(nodes, "get_ingest_ledger", return_value=ledger),
+    ):
+        assert run(_papers("1", "2"))["vectors_upserted"] == 2
+        metrics = run(_papers("1", "2", "3"))
+        assert (metrics["vectors_upserted"], metrics["vectors_unchanged"]) == (1, 2)
+        assert store.count() == 3
+
+        # A wiped store is refilled even though the ledger remembers the papers
+        store.delete(["1"])
+        assert run(_papers("1", "2", "3"))["vectors_upserted"] == 1
+
+        with patch("alithia.core.ingest_ledger.time.time", return_value=time.time() + 31 * 86400):
+            metrics = run(_papers("3"))
+        assert metrics["vectors_pruned"] == 2
+        assert store.existing_ids(["1", "2", "3"]) == {"3"}
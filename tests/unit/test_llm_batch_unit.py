@@ -0,0 +1,219 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import pytest
+
+from alithia.core.llm_batch import BatchJobRunner, build_batch_jsonl, parse_batch_output
+from alithia.core.llm_cache import CachedLLM, LLMResponseCache
+from alithia.core.llm_executor import LLMExecutor
+from alithia.core.paper import ArxivPaper
+
+
+class _MockBatchHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the OpenAI Files and Batches endpoints."""
+
+    # Number of status polls before a batch completes, None to never complete
+    polls_to_complete = 1
+    # Number of status polls a cancelling batch takes to become cancelled, None to never
+    polls_to_cancel = 1
+    files = {}
+    batches = {}
+    lock = threading.Lock()
+
+    def _send(self, payload, content_type="application/json"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _batch(self, batch_id):
+        batch = self.batches[batch_id]
+        return {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "created_at": 0,
+            "status": batch["status"],
+            "output_file_id": batch.get("output_file_id"),
+        }
+
+    def _finish(self, batch_id, status, fraction=1.0):
+        batch = self.batches[batch_id]
+        lines = [json.loads(line) for line in self.files[batch["input_file_id"]].decode().splitlines() if line]
+        output = []
+        for request in lines[: int(len(lines) * fraction)]:
+            prompt = request["body"]["messages"][-1]["content"]
+            output.append(
+                {
+                    "id": f"req-{request['custom_id']}",
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": f"batch: {prompt}"}}]
+                        },
+                    },
+                    "error": None,
+                }
+            )
+        output_id = f"file-out-{batch_id}"
+        self.files[output_id] = "\n".join(json.dumps(o) for o in output).encode()
+        batch["output_file_id"] = output_id
+        batch["status"] = status
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.lock:
+            if self.path == "/v1/files":
+                content = re.search(rb'name="file".*?\r\n\r\n(.*?)\r\n--', body, flags=re.DOTALL).group(1)
+                file_id = f"file-{len(self.files)}"
+                self.files[file_id] = content
+                self._send(
+                    {
+                        "id": file_id,
+                        "object": "file",
+                        "bytes": len(content),
+                        "created_at": 0,
+                        "filename": "in.jsonl",
+                        "purpose": "batch",
+                        "status": "processed",
+                    }
+                )
+            elif self.path == "/v1/batches":
+                request = json.loads(body)
+                batch_id = f"batch-{len(self.batches)}"
+                self.batches[batch_id] = {"input_file_id": request["input_file_id"], "status": "validating", "polls": 0}
+                self._send(self._batch(batch_id))
+            elif self.path.endswith("/cancel"):
+                # Like the real API, partial output only appears once the batch is cancelled
+                batch_id = self.path.split("/")[-2]
+                self.batches[batch_id].update(status="cancelling", polls=0)
+                self._send(self._batch(batch_id))
+
+    def do_GET(self):
+        with self.lock:
+            if self.path.startswith("/v1/batches/"):
+                batch_id = self.path.split("/")[-1]
+                batch = self.batches[batch_id]
+                batch["polls"] += 1
+                if batch["status"] == "cancelling":
+                    if self.polls_to_cancel is not None and batch["polls"] >= self.polls_to_cancel:
+                        self._finish(batch_id, "cancelled", fraction=0.5)
+                elif self.polls_to_complete is not None and batch["polls"] >= self.polls_to_complete:
+                    self._finish(batch_id, "completed")
+                else:
+                    batch["status"] = "in_progress"
+                self._send(self._batch(batch_id))
+            elif self.path.endswith("/content"):
+                self._send(self.files[self.path.split("/")[-2]], content_type="application/octet-stream")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def batch_runner():
+    openai = pytest.importorskip("openai")
+    _MockBatchHandler.files = {}
+    _MockBatchHandler.batches = {}
+    _MockBatchHandler.polls_to_cancel = 1
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockBatchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", max_retries=0)
+    yield BatchJobRunner(client, "gpt-test", poll_interval=0.05)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.unit
+def test_batch_jsonl_round_trip():
+    jsonl = build_batch_jsonl({"a": [{"role": "user", "content": "hi"}]}, "gpt-test")
+    request = json.loads(jsonl.splitlines()[0])
+    assert request["custom_id"] == "a"
+    assert request["url"] == "/v1/chat/completions"
+    assert request["body"] == {"model": "gpt-test", "messages": [{"role": "user", "content": "hi"}]}
+
+    output = "\n".join(
+        [
+            json.dumps(
+                {
+                    "custom_id": "a",
+                    "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "ok"}}]}},
+                }
+            ),
+            json.dumps({"custom_id": "b", "response": {"status_code": 500, "body": {}}}),
+            "not json",
+        ]
+    )
+    assert parse_batch_output(output) == {"a": "ok"}
+
+
+@pytest.mark.unit
+def test_runner_polls_until_completed(batch_runner):
+    _MockBatchHandler.polls_to_complete = 3
+    requests = {f"p{i}": [{"role": "user", "content": f"paper {i}"}] for i in range(4)}
+
+    results = batch_runner.run(requests, deadline=5)
+
+    assert results == {f"p{i}": f"batch: paper {i}" for i in range(4)}
+    assert batch_runner.stats["status"] == "completed"
+
+
+@pytest.mark.unit
+def test_runner_cancels_after_deadline_and_keeps_partial_results(batch_runner):
+    _MockBatchHandler.polls_to_complete = None
+    requests = {f"p{i}": [{"role": "user", "content": f"paper {i}"}] for i in range(4)}
+
+    results = batch_runner.run(requests, deadline=0.2)
+
+    assert batch_runner.stats["status"] == "cancelled"
+    assert results == {"p0": "batch: paper 0", "p1": "batch: paper 1"}
+
+
+@pytest.mark.unit
+def test_runner_waits_for_cancellation_within_timeout(batch_runner):
+    _MockBatchHandler.polls_to_complete = None
+    _MockBatchHandler.polls_to_cancel = 3
+    requests = {f"p{i}": [{"role": "user", "content": f"paper {i}"}] for i in range(4)}
+    assert len(batch_runner.run(requests, deadline=0.2)) == 2
+
+    # A batch stuck in cancelling is given up on, without results
+    _MockBatchHandler.polls_to_cancel = None
+    batch_runner.cancel_timeout = 0.2
+    assert batch_runner.run(requests, deadline=0.2) == {}
+    assert batch_runner.stats["status"] == "cancelling"
+
+
+@pytest.mark.unit
+def test_prefill_from_batch_serves_enrichment_from_cache(batch_runner, tmp_path, monkeypatch):
+    from alithia.agents.arxrec.nodes import _enrich_paper, _prefill_from_batch
+
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    _MockBatchHandler.polls_to_complete = None
+    papers = [
+        ArxivPaper(
+            title=f"t{i}", summary="s", authors=["a"], arxiv_id=f"x{i}", pdf_url="http://x", affiliations=["MIT"]
+        )
+        for i in range(4)
+    ]
+    client = Mock(spec=["chat_completion"])
+    client.chat_completion.return_value = "sync"
+    llm = CachedLLM(client, LLMResponseCache(path=":memory:"), model="gpt-test", base_url="http://test")
+    config = Mock(combined_extraction=True, batch_deadline=0.2)
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value=None):
+        stats = _prefill_from_batch(papers, llm, batch_runner, LLMExecutor(), None, config)
+        tldrs = [_enrich_paper(p, llm, None)["tldr"] for p in papers]
+
+    # Half of the batch finished before the deadline; the rest fell back to synchronous calls
+    assert stats["submitted"] == 4 and stats["completed"] == 2
+    assert [t.startswith("batch:") for t in tldrs] == [True, True, False, False]
+    assert client.chat_completion.call_count == 2
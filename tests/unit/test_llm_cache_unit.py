@@ -0,0 +1,105 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from alithia.core.llm_cache import CachedLLM, LLMResponseCache, make_cache_key
+from alithia.core.llm_executor import LLMExecutor, ThrottledLLM
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "summarize this"}]
+
+
+@pytest.mark.unit
+def test_make_cache_key_normalizes_messages():
+    key = make_cache_key("gpt-4o", "https://api/v1", MESSAGES)
+    padded = [{"content": " sys\n", "role": "system"}, {"role": "user", "content": "summarize this  "}]
+    assert make_cache_key("gpt-4o", "https://api/v1/", padded) == key
+    assert make_cache_key("gpt-4o-mini", "https://api/v1", MESSAGES) != key
+    assert make_cache_key("gpt-4o", "https://other/v1", MESSAGES) != key
+
+
+@pytest.mark.unit
+def test_response_cache_roundtrip_and_ttl(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"), ttl_seconds=0.1)
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.15)
+    assert cache.get("k") is None
+
+
+@pytest.mark.unit
+def test_response_cache_evicts_least_recently_used(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache._writes = 100  # force eviction on the next write
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+@pytest.mark.unit
+def test_cached_llm_hits_and_refresh(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    client = Mock()
+    client.chat_completion.return_value = "TLDR"
+
+    llm = CachedLLM(client, cache, model="gpt-4o", base_url="https://api/v1")
+    assert llm.chat_completion(messages=MESSAGES) == "TLDR"
+    assert llm.chat_completion(messages=MESSAGES) == "TLDR"
+    assert client.chat_completion.call_count == 1
+    assert llm.stats == {"hits": 1, "misses": 1}
+
+    # A persisted cache serves a new process (new proxy) too
+    rerun = CachedLLM(client, LLMResponseCache(path=str(tmp_path / "cache.sqlite3")), "gpt-4o", "https://api/v1")
+    assert rerun.chat_completion(messages=MESSAGES) == "TLDR"
+    assert client.chat_completion.call_count == 1
+
+    forced = CachedLLM(client, cache, model="gpt-4o", base_url="https://api/v1", refresh=True)
+    client.chat_completion.return_value = "New TLDR"
+    assert forced.chat_completion(messages=MESSAGES) == "New TLDR"
+    assert client.chat_completion.call_count == 2
+    assert llm.chat_completion(messages=MESSAGES) == "New TLDR"
+
+
+@pytest.mark.unit
+def test_cached_llm_does_not_store_empty_responses(tmp_path):
+    client = Mock()
+    client.chat_completion.side_effect = ["", "TLDR", "other"]
+    llm = CachedLLM(client, LLMResponseCache(path=str(tmp_path / "cache.sqlite3")), "gpt-4o", "https://api/v1")
+
+    assert llm.chat_completion(messages=MESSAGES) == ""
+    assert llm.chat_completion(messages=MESSAGES) == "TLDR"
+    assert llm.chat_completion(messages=MESSAGES) == "TLDR"
+    assert client.chat_completion.call_count == 2
+
+
+@pytest.mark.unit
+def test_refresh_serves_only_responses_stored_in_this_run(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    other = [{"role": "user", "content": "Other paper"}]
+    stale = CachedLLM(Mock(), cache, model="gpt-4o", base_url="https://api/v1")
+    stale.store(MESSAGES, "stale")
+    stale.store(other, "stale")
+
+    client = Mock()
+    client.chat_completion.return_value = "fresh"
+    llm = CachedLLM(client, cache, model="gpt-4o", base_url="https://api/v1", refresh=True)
+    # e.g. a batch job answered this request
+    llm.store(MESSAGES, "from batch")
+
+    wrapped = LLMExecutor().wrap(llm)
+    assert wrapped.chat_completion(messages=MESSAGES) == "from batch"
+    assert wrapped.chat_completion(messages=other) == "fresh"
+    assert client.chat_completion.call_count == 1
+
+
+@pytest.mark.unit
+def test_executor_wraps_client_behind_cache(tmp_path):
+    cache = LLMResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    llm = CachedLLM(Mock(), cache, model="gpt-4o", base_url="https://api/v1")
+    wrapped = LLMExecutor().wrap(llm)
+    assert isinstance(wrapped, CachedLLM)
+    assert isinstance(wrapped.client, ThrottledLLM)
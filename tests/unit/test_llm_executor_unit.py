@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from alithia.core.llm_executor import LLMExecutor, RateLimiter, is_retryable_error
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _MockOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions endpoint with injected latency."""
+
+    latency = 0.2
+    fail_first = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        with self.lock:
+            should_fail = prompt in self.fail_first
+            self.fail_first.discard(prompt)
+        time.sleep(self.latency)
+        if should_fail:
+            payload = json.dumps({"error": {"message": "rate limited", "type": "rate_limit"}}).encode()
+            self.send_response(429)
+            self.send_header("retry-after", "0")
+        else:
+            payload = json.dumps(
+                {
+                    "id": "cmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": f"TLDR of {prompt}"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            ).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def mock_openai_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockOpenAIHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+class _OpenAIChatClient:
+    """Chat client exposing the cogents-style chat_completion interface on top of openai."""
+
+    def __init__(self, base_url: str):
+        openai = pytest.importorskip("openai")
+        self.client = openai.OpenAI(api_key="test", base_url=base_url, max_retries=0)
+
+    def chat_completion(self, messages):
+        res = self.client.chat.completions.create(model="gpt-test", messages=messages)
+        return res.choices[0].message.content
+
+
+@pytest.mark.unit
+def test_is_retryable_error():
+    assert is_retryable_error(_StatusError(429))
+    assert is_retryable_error(_StatusError(503))
+    assert is_retryable_error(TimeoutError())
+    assert not is_retryable_error(_StatusError(400))
+    assert not is_retryable_error(ValueError("bad"))
+
+
+@pytest.mark.unit
+def test_rate_limiter_waits_for_token_budget():
+    limiter = RateLimiter(tpm=60_000)
+    assert limiter.acquire(60_000) == 0.0
+    start = time.monotonic()
+    limiter.acquire(100)
+    assert time.monotonic() - start >= 0.05
+
+
+@pytest.mark.unit
+def test_call_retries_transient_errors_then_succeeds():
+    executor = LLMExecutor(max_retries=3, backoff_base=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise _StatusError(429)
+        return "ok"
+
+    assert executor.call(flaky) == "ok"
+    assert executor.stats["retries"] == 2
+
+
+@pytest.mark.unit
+def test_call_does_not_retry_client_errors():
+    executor = LLMExecutor(max_retries=3, backoff_base=0.01)
+    attempts = []
+
+    def bad_request():
+        attempts.append(1)
+        raise _StatusError(400)
+
+    with pytest.raises(_StatusError):
+        executor.call(bad_request)
+    assert len(attempts) == 1
+
+
+@pytest.mark.unit
+def test_map_keeps_input_order_and_times_out_slow_items():
+    executor = LLMExecutor(max_concurrency=4)
+
+    def work(i):
+        time.sleep(0.5 if i == 1 else 0.05 * (4 - i))
+        return i * 10
+
+    results = executor.map(work, [0, 1, 2, 3], timeout=0.3)
+    assert [r for r, _ in results] == [0, None, 20, 30]
+    assert isinstance(results[1][1], TimeoutError)
+
+
+@pytest.mark.unit
+def test_executor_against_mock_openai_server(mock_openai_server):
+    _MockOpenAIHandler.latency = 0.2
+    _MockOpenAIHandler.fail_first = {"paper-2"}
+    executor = LLMExecutor(max_concurrency=8, max_retries=2, backoff_base=0.01)
+    llm = executor.wrap(_OpenAIChatClient(mock_openai_server))
+    papers = [f"paper-{i}" for i in range(8)]
+    # Keep one-off client initialization out of the measurement
+    llm.chat_completion(messages=[{"role": "user", "content": "warmup"}])
+
+    start = time.monotonic()
+    results = executor.map(lambda p: llm.chat_completion(messages=[{"role": "user", "content": p}]), papers)
+    elapsed = time.monotonic() - start
+
+    assert [r for r, _ in results] == [f"TLDR of {p}" for p in papers]
+    assert all(e is None for _, e in results)
+    assert executor.stats["retries"] == 1
+    # 8 serial calls would take at least 1.6s
+    assert elapsed < 1.2
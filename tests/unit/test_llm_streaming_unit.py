@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, Mock, patch
+
+import numpy as np
+import pytest
+
+from alithia.core.llm_cache import CachedLLM, LLMResponseCache
+from alithia.core.llm_streaming import TimedStream, stream_completion
+
+
+class _MockStreamingHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions endpoint streaming one token per event."""
+
+    tokens = ["The ", "main ", "contribution."]
+    delay = 0.05
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert body["stream"] is True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for token in self.tokens:
+            time.sleep(self.delay)
+            chunk = {
+                "id": "chunk",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def streaming_client():
+    openai = pytest.importorskip("openai")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockStreamingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = Mock(spec=["client", "chat_model", "generate"])
+    client.client = openai.OpenAI(api_key="test", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+    client.chat_model = "gpt-test"
+    yield client
+    server.shutdown()
+    server.server_close()
+
+
+MESSAGES = [{"role": "user", "content": "What is the main contribution?"}]
+
+
+@pytest.mark.unit
+def test_timed_stream_records_latencies():
+    def chunks():
+        time.sleep(0.05)
+        yield "a"
+        time.sleep(0.05)
+        yield "b"
+
+    stream = TimedStream(chunks())
+    assert list(stream) == ["a", "b"]
+    assert stream.text == "ab"
+    assert 0.04 <= stream.ttft < stream.total
+
+
+@pytest.mark.unit
+def test_stream_completion_falls_back_to_generate():
+    llm = Mock(spec=["generate"])
+    llm.generate.return_value = "whole answer"
+    assert list(stream_completion(llm, MESSAGES)) == ["whole answer"]
+
+
+@pytest.mark.unit
+def test_stream_completion_yields_tokens_and_caches(streaming_client):
+    llm = CachedLLM(streaming_client, LLMResponseCache(path=":memory:"), model="gpt-test", base_url="http://test")
+
+    stream = TimedStream(stream_completion(llm, MESSAGES))
+    assert list(stream) == _MockStreamingHandler.tokens
+    # The first token arrives well before the whole answer
+    assert stream.ttft < stream.total - 0.05
+
+    assert list(stream_completion(llm, MESSAGES)) == ["The main contribution."]
+    assert llm.generate(messages=MESSAGES) == "The main contribution."
+    assert llm.stats == {"hits": 2, "misses": 1}
+    streaming_client.generate.assert_not_called()
+
+
+@pytest.mark.unit
+def test_process_query_node_streams_tokens_and_records_metrics(streaming_client):
+    from alithia.agents.lens import nodes
+
+    tokens = []
+    state = {
+        "user_input": "What is the main contribution?",
+        "current_paper": {"id": "doc"},
+        "profile": MagicMock(),
+        "on_token": tokens.append,
+    }
+    embed = MagicMock()
+    embed.score_pairs.return_value = np.array([1.0])
+    with (
+        patch.object(nodes, "get_embedding_service", return_value=embed),
+        patch.object(nodes, "create_vector_store") as vector_store,
+        patch.object(nodes, "get_llm", return_value=streaming_client),
+    ):
+        vector_store.return_value.query.return_value = [
+            {"id": "c0", "score": 0.8, "metadata": {"page": 1, "text": "context"}}
+        ]
+        result = nodes.process_query_node(state)
+
+    assert tokens == _MockStreamingHandler.tokens
+    assert result["last_response"] == "The main contribution."
+    metrics = result["performance_metrics"]
+    assert 0 < metrics["answer_ttft_seconds"] < metrics["answer_generation_seconds"]
+    assert metrics["rerank_depth"] == 1
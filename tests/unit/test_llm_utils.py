@@ -2,7 +2,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from alithia.core.llm_utils import get_llm
+from alithia.core.llm_utils import clear_llm_clients, get_http_client, get_llm, get_llm_client_for
 from alithia.core.researcher.connected import (
     EmailConnection,
     GithubConnection,
@@ -14,6 +14,13 @@ from alithia.core.researcher.connected import (
 from alithia.core.researcher.profile import ResearcherProfile
 
 
+@pytest.fixture(autouse=True)
+def _fresh_registry():
+    clear_llm_clients()
+    yield
+    clear_llm_clients()
+
+
 @pytest.mark.unit
 def test_get_llm_sets_env_and_model():
     profile = ResearcherProfile(
@@ -39,3 +46,34 @@ def test_get_llm_sets_env_and_model():
     assert fake_client.chat_model == "gpt-x"
     # called with provider openai and chat_model
     mock_get.assert_called_with(provider="openai", api_key="secret", base_url="http://base", chat_model="gpt-x")
+
+
+@pytest.mark.unit
+def test_get_llm_reuses_client_per_connection():
+    conn = LLMConnection(openai_api_key="secret", openai_api_base="http://base/", model_name="gpt-x")
+    other = LLMConnection(openai_api_key="secret", openai_api_base="http://base", model_name="gpt-y")
+
+    with patch("alithia.core.llm_utils.get_llm_client", side_effect=lambda **kw: MagicMock()) as mock_get:
+        first = get_llm_client_for(conn)
+        assert get_llm_client_for(conn.model_copy(update={"openai_api_base": "http://base"})) is first
+        assert get_llm(conn) is first
+        assert get_llm(conn, use_cache=True).client is first
+        assert get_llm_client_for(other) is not first
+
+    assert mock_get.call_count == 2
+
+
+@pytest.mark.unit
+def test_registered_clients_share_http_pool():
+    openai = pytest.importorskip("openai")
+
+    class _Client:
+        def __init__(self, **kwargs):
+            self.client = openai.OpenAI(api_key=kwargs["api_key"], base_url=kwargs["base_url"])
+
+    with patch("alithia.core.llm_utils.get_llm_client", side_effect=lambda **kw: _Client(**kw)):
+        a = get_llm_client_for(LLMConnection(openai_api_key="k", openai_api_base="http://a", model_name="m"))
+        b = get_llm_client_for(LLMConnection(openai_api_key="k", openai_api_base="http://b", model_name="m"))
+
+    assert a.client._client is get_http_client()
+    assert b.client._client is a.client._client
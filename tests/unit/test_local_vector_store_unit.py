@@ -0,0 +1,161 @@
+"""
+Unit tests for the embedded local vector store.
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from alithia.core.local_vector_store import LocalVectorStore, matches_filter
+from alithia.core.vector_store import create_vector_store
+
+
+def _unit(n, dim=8, seed=0):
+    x = np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+@pytest.mark.unit
+def test_query_matches_brute_force_across_segments(tmp_path):
+    store = LocalVectorStore("idx", path=str(tmp_path))
+    vectors = _unit(30)
+    for start in range(0, 30, 10):
+        docs = [{"id": f"d{i}", "text": f"text {i}", "n": i} for i in range(start, start + 10)]
+        store.upsert_documents(docs, vectors[start : start + 10])
+
+    query = _unit(1, seed=1)[0]
+    results = store.query(query, top_k=5)
+
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert [r["id"] for r in results] == [f"d{i}" for i in expected]
+    assert results[0]["metadata"] == {"id": f"d{expected[0]}", "n": int(expected[0]), "text": f"text {expected[0]}"}
+    assert results[0]["score"] == pytest.approx(float(vectors[expected[0]] @ query), abs=1e-5)
+
+
+@pytest.mark.unit
+def test_upsert_overrides_and_delete_hides_records(tmp_path):
+    store = LocalVectorStore("idx", path=str(tmp_path))
+    vectors = _unit(3)
+    store.upsert_documents([{"id": "a", "text": "old"}, {"id": "b", "text": "b"}], vectors[:2])
+    store.upsert_documents([{"id": "a", "text": "new"}], vectors[2:])
+    store.delete(["b"])
+
+    results = store.query(vectors[2], top_k=10)
+
+    assert [(r["id"], r["metadata"]["text"]) for r in results] == [("a", "new")]
+    assert store.count() == 1
+
+
+@pytest.mark.unit
+def test_metadata_filters(tmp_path):
+    store = LocalVectorStore("idx", path=str(tmp_path))
+    chunks = [{"id": f"c{i}", "text": f"chunk {i}", "page": i} for i in range(6)]
+    store.upsert_chunks("doc1", chunks[:3], _unit(3))
+    store.upsert_chunks("doc2", chunks[3:], _unit(3, seed=2))
+    query = _unit(1, seed=3)[0]
+
+    results = store.query(query, top_k=10, filter={"doc_id": {"$eq": "doc2"}})
+    assert sorted(r["id"] for r in results) == ["doc2:c3", "doc2:c4", "doc2:c5"]
+
+    results = store.query(query, top_k=10, filter={"$or": [{"page": {"$lt": 1}}, {"page": {"$in": [4, 5]}}]})
+    assert sorted(r["metadata"]["page"] for r in results) == [0, 4, 5]
+
+
+@pytest.mark.unit
+def test_matches_filter_operators():
+    meta = {"year": 2024, "tag": "ml", "doc_id": "x"}
+
+    assert matches_filter(meta, None)
+    assert matches_filter(meta, {"tag": "ml", "year": {"$gte": 2024, "$lt": 2025}})
+    assert matches_filter(meta, {"$and": [{"tag": {"$nin": ["cv"]}}, {"missing": {"$exists": False}}]})
+    assert not matches_filter(meta, {"year": {"$gt": 2024}})
+    assert not matches_filter(meta, {"missing": {"$gt": 1}})
+    with pytest.raises(ValueError):
+        matches_filter(meta, {"year": {"$regex": "2"}})
+
+
+@pytest.mark.unit
+def test_compaction_keeps_live_records_and_removes_old_segments(tmp_path):
+    store = LocalVectorStore("idx", namespace="ns", path=str(tmp_path), max_segments=4)
+    vectors = _unit(10)
+    for i in range(10):
+        store.upsert_documents([{"id": f"d{i % 5}", "text": str(i)}], vectors[i : i + 1])
+
+    segment_files = [f for f in os.listdir(store.path) if f.endswith(".f32")]
+    assert len(segment_files) <= 4
+    assert store.count() == 5
+
+    store.compact()
+    assert len([f for f in os.listdir(store.path) if f.endswith(".f32")]) == 1
+    results = store.query(vectors[9], top_k=1)
+    assert results[0]["id"] == "d4"
+    assert results[0]["metadata"]["text"] == "9"
+
+
+@pytest.mark.unit
+def test_store_is_shared_through_disk_and_checks_dimension(tmp_path):
+    writer = LocalVectorStore("idx", path=str(tmp_path), dimension=8)
+    reader = LocalVectorStore("idx", path=str(tmp_path))
+    assert reader.query(_unit(1)[0], top_k=3) == []
+
+    writer.upsert_documents([{"id": "a", "text": "a"}], _unit(1))
+    assert [r["id"] for r in reader.query(_unit(1)[0], top_k=3)] == ["a"]
+
+    with pytest.raises(ValueError):
+        writer.upsert_documents([{"id": "b", "text": "b"}], _unit(1, dim=4))
+    with pytest.raises(ValueError):
+        reader.upsert_documents([{"id": "b", "text": "b"}], _unit(1, dim=4))
+
+
+@pytest.mark.unit
+def test_create_vector_store_selects_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(tmp_path))
+
+    store = create_vector_store("idx", namespace="ns", dimension=8)
+
+    assert isinstance(store, LocalVectorStore)
+    assert store.path.startswith(str(tmp_path))
+    with pytest.raises(ValueError):
+        create_vector_store("idx", backend="unknown")
+
+
+@pytest.mark.unit
+def test_store_path_expands_user_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+
+    store = LocalVectorStore("idx", path="~/vectors")
+
+    assert store.path.startswith(os.path.join(str(tmp_path), "vectors"))
+    assert not os.path.exists(os.path.join(str(tmp_path), "~"))
+
+
+@pytest.mark.unit
+def test_lens_loads_paper_offline_without_supabase(tmp_path, monkeypatch):
+    from alithia.agents.lens import nodes
+    from alithia.core.ingest_ledger import IngestLedger
+
+    monkeypatch.setenv("VECTOR_STORE_BACKEND", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    for name in ("SUPABASE_URL", "SUPABASE_ANON_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    pdf_path = tmp_path / "paper.pdf"
+    pdf_path.write_bytes(b"%PDF")
+    embed = MagicMock(embedding_model_name="m", output_dim=None)
+    embed.embed_texts.side_effect = lambda texts: _unit(len(texts))
+    processor = MagicMock()
+    processor.return_value.process.return_value = [{"id": "c0", "text": "alpha", "page": 1}]
+
+    with (
+        patch.object(nodes, "get_embedding_service", return_value=embed),
+        patch.object(nodes, "PDFProcessor", processor),
+        patch.object(nodes, "get_ingest_ledger", return_value=IngestLedger(path=str(tmp_path / "ledger.sqlite3"))),
+    ):
+        result = nodes.load_paper_node({"user_input": f"load {pdf_path}"})
+
+    assert result["current_paper"]["id"] == "paper"
+    store = LocalVectorStore(os.getenv("PINECONE_INDEX", "alithia-lens"), path=str(tmp_path / "vectors"))
+    assert store.count() == 1
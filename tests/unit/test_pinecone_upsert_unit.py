@@ -0,0 +1,167 @@
+"""
+Unit tests for batched Pinecone upserts, run against a local stand-in for the index data plane.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pytest
+
+from alithia.core.vector_store import PineconeVectorStore
+
+
+class _FakeIndex(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.vectors = {}
+        self.requests = []
+        self.fetched = []
+        # Status codes returned by the next upsert requests, before succeeding
+        self.fail_with = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/vectors/fetch":
+            ids = parse_qs(url.query).get("ids", [])
+            with self.server.lock:
+                self.server.fetched.append(len(ids))
+                found = {i: self.server.vectors[i] for i in ids if i in self.server.vectors}
+            self._reply(200, {"vectors": found, "namespace": "ns"})
+        else:
+            self._reply(404, {"code": 5, "message": "not found"})
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw)
+        server = self.server
+        if self.path == "/vectors/upsert":
+            with server.lock:
+                server.requests.append((len(body["vectors"]), len(raw)))
+                status = server.fail_with.pop(0) if server.fail_with else None
+                if status is None:
+                    server.vectors.update({v["id"]: v for v in body["vectors"]})
+            if status is not None:
+                self._reply(status, {"code": status, "message": "injected failure"})
+            else:
+                self._reply(200, {"upsertedCount": len(body["vectors"])})
+        elif self.path == "/vectors/delete":
+            with server.lock:
+                for vector_id in body.get("ids", []):
+                    server.vectors.pop(vector_id, None)
+            self._reply(200, {})
+        else:
+            self._reply(404, {"code": 5, "message": "not found"})
+
+
+@pytest.fixture
+def fake_index(monkeypatch):
+    monkeypatch.setenv("PINECONE_API_KEY", "test-key")
+    server = _FakeIndex()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _store(server, **kwargs):
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+    return PineconeVectorStore(index_name="idx", namespace="ns", host=host, backoff=0.01, **kwargs)
+
+
+def _docs(n, text_size=10):
+    return [{"id": f"d{i}", "text": "x" * text_size, "n": i} for i in range(n)]
+
+
+@pytest.mark.unit
+def test_upsert_is_split_by_count(fake_index):
+    store = _store(fake_index, batch_size=10, max_workers=3)
+    embeddings = np.random.default_rng(0).normal(size=(35, 8)).astype(np.float32)
+
+    store.upsert_documents(_docs(35), embeddings)
+
+    assert sorted(n for n, _ in fake_index.requests) == [5, 10, 10, 10]
+    assert len(fake_index.vectors) == 35
+    np.testing.assert_allclose(fake_index.vectors["d7"]["values"], embeddings[7], rtol=1e-6)
+    assert fake_index.vectors["d7"]["metadata"] == {"id": "d7", "n": 7, "text": "xxxxxxxxxx"}
+    report = store.last_report
+    assert (report.upserted, report.failed, report.batches) == (35, 0, 4)
+    assert report.vectors_per_second > 0
+
+
+@pytest.mark.unit
+def test_upsert_is_split_by_payload_size(fake_index):
+    store = _store(fake_index, batch_size=1000, max_batch_bytes=20_000)
+    chunks = [{"id": f"c{i}", "text": "y" * 2000, "page": 1, "offset": i} for i in range(40)]
+
+    store.upsert_chunks("doc", chunks, np.ones((40, 64), dtype=np.float32))
+
+    assert len(fake_index.vectors) == 40
+    assert len(fake_index.requests) > 1
+    assert all(size <= 20_000 for _, size in fake_index.requests)
+
+
+@pytest.mark.unit
+def test_transient_failures_are_retried(fake_index):
+    fake_index.fail_with = [503, 429]
+    store = _store(fake_index, batch_size=10, max_workers=1)
+
+    store.upsert_documents(_docs(20), np.zeros((20, 4), dtype=np.float32))
+
+    assert len(fake_index.vectors) == 20
+    assert store.last_report.retries == 2
+
+
+@pytest.mark.unit
+def test_rejected_batch_fails_after_other_batches_are_sent(fake_index):
+    fake_index.fail_with = [400]
+    store = _store(fake_index, batch_size=10, max_workers=1)
+
+    with pytest.raises(RuntimeError, match="10 of 30 vectors failed"):
+        store.upsert_documents(_docs(30), np.zeros((30, 4), dtype=np.float32))
+
+    assert len(fake_index.vectors) == 20
+    report = store.last_report
+    assert (report.upserted, report.failed, report.retries) == (20, 10, 0)
+    assert report.failures[0].startswith("vectors 0-9")
+
+
+@pytest.mark.unit
+def test_delete_removes_vectors(fake_index):
+    store = _store(fake_index)
+    store.upsert_documents(_docs(3), np.zeros((3, 4), dtype=np.float32))
+
+    store.delete(["d0", "d2"])
+
+    assert sorted(fake_index.vectors) == ["d1"]
+
+
+@pytest.mark.unit
+def test_existing_ids_fetches_in_chunks(fake_index):
+    store = _store(fake_index)
+    store.upsert_documents(_docs(3), np.zeros((3, 4), dtype=np.float32))
+
+    ids = ["d1", "d2"] + [f"missing{i}" for i in range(150)]
+
+    assert store.existing_ids(ids) == {"d1", "d2"}
+    assert fake_index.fetched == [100, 52]
+    assert store.store_id == f"pinecone:http://127.0.0.1:{fake_index.server_address[1]}/ns"
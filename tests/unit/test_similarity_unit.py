@@ -0,0 +1,72 @@
+"""
+Unit tests for blockwise top-k similarity search.
+"""
+
+import numpy as np
+import pytest
+
+from alithia.core.similarity import as_float32_matrix, top_k_similarity
+
+
+def _brute_force(queries, corpus, k):
+    scores = queries.astype(np.float32) @ corpus.astype(np.float32).T
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, order, axis=1), order
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("block_size,query_batch_size", [(7, 2), (3, 1), (1000, 1000)])
+def test_top_k_matches_brute_force(block_size, query_batch_size):
+    rng = np.random.default_rng(0)
+    queries, corpus = rng.normal(size=(5, 16)), rng.normal(size=(50, 16))
+
+    scores, indices = top_k_similarity(queries, corpus, k=10, block_size=block_size, query_batch_size=query_batch_size)
+    expected_scores, expected_indices = _brute_force(queries, corpus, 10)
+
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+    assert scores.dtype == np.float32 and indices.dtype == np.int64
+
+
+@pytest.mark.unit
+def test_top_k_single_query_and_small_corpus():
+    corpus = np.array([[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]])
+
+    scores, indices = top_k_similarity(np.array([1.0, 0.0]), corpus, k=5)
+
+    assert indices.tolist() == [[0, 2, 1]]
+    np.testing.assert_allclose(scores, [[1.0, 0.6, 0.0]])
+
+
+@pytest.mark.unit
+def test_top_k_breaks_ties_by_corpus_position():
+    corpus = np.ones((6, 3))
+
+    _, indices = top_k_similarity(np.ones(3), corpus, k=4, block_size=4)
+
+    assert indices.tolist() == [[0, 1, 2, 3]]
+
+
+@pytest.mark.unit
+def test_top_k_over_memory_mapped_corpus(tmp_path):
+    rng = np.random.default_rng(1)
+    corpus = rng.normal(size=(40, 8)).astype(np.float32)
+    path = tmp_path / "corpus.f32"
+    corpus.tofile(path)
+    mapped = np.memmap(path, dtype=np.float32, mode="r", shape=corpus.shape)
+
+    _, indices = top_k_similarity(corpus[:2], mapped, k=3, block_size=16, max_threads=1)
+
+    np.testing.assert_array_equal(indices, _brute_force(corpus[:2], corpus, 3)[1])
+
+
+@pytest.mark.unit
+def test_top_k_empty_inputs():
+    scores, indices = top_k_similarity(np.ones((2, 3)), np.empty((0, 3)), k=5)
+    assert scores.shape == (2, 0) and indices.shape == (2, 0)
+
+
+@pytest.mark.unit
+def test_as_float32_matrix():
+    x = as_float32_matrix(np.arange(4, dtype=np.float64))
+    assert x.shape == (1, 4) and x.dtype == np.float32 and x.flags["C_CONTIGUOUS"]
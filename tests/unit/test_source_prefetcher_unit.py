@@ -0,0 +1,105 @@
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from alithia.core.paper import ArxivPaper
+from alithia.core.source_prefetcher import SourcePrefetcher, get_prefetcher, register_prefetcher, release_prefetcher
+
+
+def _paper(arxiv_id: str) -> ArxivPaper:
+    return ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id=arxiv_id, pdf_url="http://x")
+
+
+@pytest.mark.unit
+def test_prefetcher_populates_tex_before_wait_returns(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    papers = [_paper("2401.0000%d" % i) for i in range(3)]
+
+    def fake_extract(paper):
+        time.sleep(0.05)
+        return {"all": f"source of {paper.arxiv_id}"}
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", side_effect=fake_extract) as mock_extract:
+        prefetcher = SourcePrefetcher(max_workers=2, min_interval=0.0)
+        prefetcher.submit(papers)
+        for p in papers:
+            prefetcher.wait(p)
+            assert p.tex.get("all") == f"source of {p.arxiv_id}"
+        prefetcher.shutdown()
+
+    assert mock_extract.call_count == 3
+
+
+@pytest.mark.unit
+def test_prefetcher_swallows_download_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    paper = _paper("2401.00009")
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", side_effect=RuntimeError("boom")):
+        prefetcher = SourcePrefetcher(max_workers=1, min_interval=0.0)
+        prefetcher.submit([paper])
+        prefetcher.wait(paper)
+        prefetcher.shutdown()
+
+    assert paper.tex is None
+
+
+@pytest.mark.unit
+def test_prefetcher_spaces_out_downloads(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    papers = [_paper("2401.0001%d" % i) for i in range(3)]
+    starts = []
+
+    def fake_extract(paper):
+        starts.append(time.monotonic())
+        return {"all": "x"}
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", side_effect=fake_extract):
+        prefetcher = SourcePrefetcher(max_workers=3, min_interval=0.1)
+        prefetcher.submit(papers)
+        for p in papers:
+            prefetcher.wait(p)
+        prefetcher.shutdown()
+
+    starts.sort()
+    assert starts[-1] - starts[0] >= 0.18
+
+
+@pytest.mark.unit
+def test_registry_shuts_down_released_and_replaced_prefetchers():
+    first, second = Mock(), Mock()
+
+    register_prefetcher("run-1", first)
+    register_prefetcher("run-1", second)
+    first.shutdown.assert_called_once()
+    assert get_prefetcher("run-1") is second
+
+    release_prefetcher("run-1")
+    second.shutdown.assert_called_once()
+    assert get_prefetcher("run-1") is None
+    release_prefetcher("run-1")
+
+
+@pytest.mark.unit
+def test_agent_releases_prefetcher_when_workflow_fails(tmp_path, monkeypatch):
+    from alithia.agents.arxrec.arxrec_agent import ArxrecAgent
+    from alithia.agents.arxrec.state import ArxrecConfig
+
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    prefetcher = Mock()
+    run_ids = []
+
+    def invoke(state):
+        # Fails after relevance assessment started prefetching, before content generation
+        run_ids.append(state.run_id)
+        register_prefetcher(state.run_id, prefetcher)
+        raise RuntimeError("boom")
+
+    agent = ArxrecAgent()
+    agent.workflow = Mock(invoke=invoke)
+    config = ArxrecConfig.model_construct(user_profile=Mock())
+
+    assert agent.run(config)["success"] is False
+    prefetcher.shutdown.assert_called_once()
+    assert get_prefetcher(run_ids[0]) is None
@@ -72,3 +72,20 @@ def test_pinecone_vector_store_calls_upsert_and_query():
         res = store.query(embs[0], top_k=1)
         assert res[0]["id"] == "d0"
         assert res[0]["score"] == 0.99
+
+
+@pytest.mark.unit
+def test_pinecone_vector_store_rejects_wrong_dimension():
+    with (
+        patch("alithia.core.vector_store.os.getenv", return_value="abc"),
+        patch("alithia.core.vector_store.Pinecone") as mock_pc,
+    ):
+        store = PineconeVectorStore(index_name="idx", dimension=2)
+
+        with pytest.raises(ValueError):
+            store.upsert_chunks("doc", [{"id": "c0", "text": "hello"}], np.zeros((1, 3)))
+        with pytest.raises(ValueError):
+            store.query(np.zeros(3))
+
+        store.upsert_chunks("doc", [{"id": "c0", "text": "hello"}], np.zeros((1, 2)))
+        mock_pc.return_value.Index.return_value.upsert.assert_called_once()
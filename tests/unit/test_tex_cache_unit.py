@@ -0,0 +1,71 @@
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from alithia.core.arxiv_paper_utils import load_tex
+from alithia.core.paper import ArxivPaper
+from alithia.core.tex_cache import LazyTex, prune_tex_cache
+
+
+@pytest.mark.unit
+def test_lazy_tex_spill_and_reload(tmp_path):
+    tex = LazyTex.spill("2401.00001", {"main.tex": "body", "all": "body"}, cache_dir=str(tmp_path))
+    assert not tex.loaded
+
+    assert tex.get("all") == "body"
+    assert set(tex.keys()) == {"main.tex", "all"}
+    assert tex.loaded
+
+    tex.release()
+    assert not tex.loaded
+    assert tex["main.tex"] == "body"
+
+
+@pytest.mark.unit
+def test_lazy_tex_open_missing_returns_none(tmp_path):
+    assert LazyTex.open("hep-th/9901001", cache_dir=str(tmp_path)) is None
+    LazyTex.spill("hep-th/9901001", {"all": None}, cache_dir=str(tmp_path))
+    cached = LazyTex.open("hep-th/9901001", cache_dir=str(tmp_path))
+    assert cached is not None
+    assert cached.get("all") is None
+
+
+@pytest.mark.unit
+def test_load_tex_uses_source_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALITHIA_CACHE_DIR", str(tmp_path))
+    p = ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id="2401.00002", pdf_url="http://x")
+
+    with patch("alithia.core.arxiv_paper_utils.extract_tex_content", return_value={"all": "content"}) as mock_extract:
+        tex = load_tex(p)
+        assert isinstance(tex, LazyTex)
+        assert tex.get("all") == "content"
+
+        # A fresh paper object hits the cache instead of downloading again
+        p2 = ArxivPaper(title="t", summary="s", authors=["a"], arxiv_id="2401.00002", pdf_url="http://x")
+        assert load_tex(p2).get("all") == "content"
+        assert mock_extract.call_count == 1
+
+    p.release_tex()
+    assert not p.tex.loaded
+
+
+@pytest.mark.unit
+def test_prune_tex_cache_removes_old_and_least_recently_used(tmp_path):
+    now = time.time()
+    for i, age_days in enumerate([1, 2, 3, 120]):
+        tex = LazyTex.spill(f"2401.0000{i}", {"all": "x" * 100}, cache_dir=str(tmp_path))
+        os.utime(tex.path, (now - age_days * 86400, now - age_days * 86400))
+    # Opening an entry marks it as used
+    LazyTex.open("2401.00002", cache_dir=str(tmp_path))
+
+    removed = prune_tex_cache(max_bytes=250, max_age_days=90, cache_dir=str(tmp_path))
+
+    assert removed == 2
+    assert [LazyTex.open(f"2401.0000{i}", cache_dir=str(tmp_path)) is not None for i in range(4)] == [
+        True,
+        False,
+        True,
+        False,
+    ]
@@ -0,0 +1,58 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from alithia.core.token_budget import _ApproximateEncoder, count_tokens, fit_sections, get_encoder, truncate_to_tokens
+
+
+@pytest.fixture
+def char_encoder():
+    """One token per character, recording how much text gets encoded."""
+    enc = Mock()
+    enc.encode.side_effect = lambda s: list(s)
+    enc.decode.side_effect = lambda toks: "".join(toks)
+    with patch("alithia.core.token_budget.get_encoder", return_value=enc):
+        yield enc
+
+
+@pytest.mark.unit
+def test_get_encoder_is_cached():
+    assert get_encoder() is get_encoder()
+
+
+@pytest.mark.unit
+def test_get_encoder_falls_back_when_tiktoken_unavailable():
+    get_encoder.cache_clear()
+    try:
+        with patch.dict("sys.modules", {"tiktoken": None}):
+            enc = get_encoder()
+        assert isinstance(enc, _ApproximateEncoder)
+        assert enc.decode(enc.encode("hello world")) == "hello world"
+    finally:
+        get_encoder.cache_clear()
+
+
+@pytest.mark.unit
+def test_truncate_to_tokens_only_encodes_needed_prefix(char_encoder):
+    text = "a" * 100_000
+    out = truncate_to_tokens(text, 10)
+    assert out == "a" * 10
+    encoded_lengths = [len(call.args[0]) for call in char_encoder.encode.call_args_list]
+    assert max(encoded_lengths) < 1000
+
+
+@pytest.mark.unit
+def test_truncate_to_tokens_keeps_short_text(char_encoder):
+    assert truncate_to_tokens("short", 100) == "short"
+    assert truncate_to_tokens("short", 0) == ""
+    assert count_tokens("short") == 5
+
+
+@pytest.mark.unit
+def test_fit_sections_trims_lowest_priority_first(char_encoder):
+    fitted = fit_sections({"title": "t" * 5, "abstract": "a" * 10, "intro": "i" * 10, "conclusion": "c" * 10}, 20)
+    assert list(fitted) == ["title", "abstract", "intro", "conclusion"]
+    assert fitted["title"] == "t" * 5
+    assert fitted["abstract"] == "a" * 10
+    assert fitted["intro"] == "i" * 5
+    assert fitted["conclusion"] == ""